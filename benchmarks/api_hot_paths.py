@@ -0,0 +1,222 @@
+"""
+Latency, query and allocation benchmarks for the polls API hot paths.
+
+Drives these endpoints through the Django test client, in process:
+
+- list: ``GET /api/polls/``
+- retrieve: ``GET /api/polls/<id>/`` (ids drawn by poll popularity)
+- results: ``GET /api/polls/<id>/results/``
+- vote: ``POST /api/vote/`` (a fresh JWT user per request)
+
+It runs them at several dataset sizes, generated with ``seed_polls`` in a
+throwaway test database. Postgres is used when POSTGRES_* is configured; in
+all other cases (or with BENCH_DB=sqlite) an in-memory SQLite database
+stands in. For each size and endpoint it reports p50/p95/p99 latency, queries
+per request and the peak Python memory allocated per request (tracemalloc,
+measured in a separate pass so it does not skew the timings).
+
+Usage (from the repository root)::
+
+    python benchmarks/api_hot_paths.py --sizes 100,1000,10000 --output bench.json
+    python benchmarks/api_hot_paths.py --compare bench.json --threshold 0.2
+
+``--compare`` exits with status 1 when a p95 latency or the maximum query count got
+worse than the baseline by more than the threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from io import StringIO
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+from rest_framework_simplejwt.tokens import AccessToken  # noqa: E402
+
+from polls.models import Option, Poll, User  # noqa: E402
+from polls.results_cache import get_results_cache  # noqa: E402
+
+ENDPOINTS = ("list", "retrieve", "results", "vote")
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0.0
+
+
+def seed(size, votes_per_poll):
+    """Reset the database and generate ``size`` polls."""
+    call_command("flush", interactive=False, verbosity=0)
+    get_results_cache().clear()
+    users = max(50, min(size * votes_per_poll, 5000))
+    call_command(
+        "seed_polls", "--users", str(users), "--polls", str(size), "--options-per-poll", "4",
+        "--votes", str(size * votes_per_poll), "--seed", "1", "--prefix", f"bench{size}", stdout=StringIO(),
+    )
+
+
+class Requests:
+    """Builds the next request for each endpoint."""
+
+    def __init__(self, size, requests):
+        self.rng = random.Random(1)
+        # retrieve/results hit polls in popularity order, like real traffic
+        self.poll_ids = list(Poll.objects.order_by("-total_votes", "id").values_list("id", flat=True))
+        self.weights = [1 / rank for rank in range(1, len(self.poll_ids) + 1)]
+        # one poll receives the votes, each from a user who has not voted on it yet
+        self.vote_poll = Poll.objects.order_by("id").first()
+        self.vote_option = Option.objects.filter(poll=self.vote_poll).order_by("id").first()
+        voters = User.objects.bulk_create(
+            User(username=f"bench-voter-{size}-{i}") for i in range(requests * 3)
+        )
+        self.tokens = iter(str(AccessToken.for_user(user)) for user in voters)
+
+    def hot_poll(self):
+        return self.rng.choices(self.poll_ids, self.weights)[0]
+
+    def call(self, client, endpoint):
+        if endpoint == "list":
+            return client.get("/api/polls/")
+        if endpoint == "retrieve":
+            return client.get(f"/api/polls/{self.hot_poll()}/")
+        if endpoint == "results":
+            return client.get(f"/api/polls/{self.hot_poll()}/results/")
+        payload = {"poll": self.vote_poll.id, "option": self.vote_option.id}
+        return client.post(
+            "/api/vote/", payload, format="json", HTTP_AUTHORIZATION=f"Bearer {next(self.tokens)}"
+        )
+
+
+def measure(endpoint, source, requests, warmup):
+    client = APIClient()
+    for _ in range(warmup):
+        source.call(client, endpoint)
+
+    latencies, queries, statuses = [], [], {}
+    for _ in range(requests):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = source.call(client, endpoint)
+            latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(len(captured))
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    # allocations in a separate, shorter pass: tracemalloc slows everything down
+    peaks = []
+    tracemalloc.start()
+    for _ in range(max(1, requests // 5)):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        source.call(client, endpoint)
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+
+    return {
+        "requests": requests,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "queries": round(sum(queries) / len(queries), 2),
+        "max_queries": max(queries),
+        "alloc_peak_kb": round(sum(peaks) / len(peaks) / 1024, 1),
+        "statuses": statuses,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline, threshold):
+    """Print regressions of ``report`` against ``baseline``; return how many."""
+    regressions = 0
+    for size, endpoints in report["results"].items():
+        for endpoint, now in endpoints.items():
+            before = baseline.get("results", {}).get(size, {}).get(endpoint)
+            if before is None:
+                continue
+            # max_queries, not the mean: cache hit ratios make the mean noisy
+            for metric in ("p95_ms", "max_queries"):
+                if before[metric] and (now[metric] - before[metric]) / before[metric] > threshold:
+                    regressions += 1
+                    print(f"REGRESSION size={size} {endpoint} {metric}: {before[metric]} -> {now[metric]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000", help="comma-separated poll counts")
+    parser.add_argument("--votes-per-poll", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    parser.add_argument("--output", help="write the JSON report to this file (default: stdout)")
+    parser.add_argument("--compare", help="baseline JSON report to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative slowdown for --compare")
+    args = parser.parse_args()
+
+    endpoints = [e for e in args.endpoints.split(",") if e in ENDPOINTS]
+    sizes = [int(s) for s in args.sizes.split(",")]
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        results = {}
+        for size in sizes:
+            seed(size, args.votes_per_poll)
+            source = Requests(size, args.requests + args.warmup)
+            results[str(size)] = {}
+            for endpoint in endpoints:
+                result = measure(endpoint, source, args.requests, args.warmup)
+                results[str(size)][endpoint] = result
+                print(
+                    f"size={size:<7} {endpoint:<9} p50 {result['p50_ms']:8.2f}ms  p95 {result['p95_ms']:8.2f}ms  "
+                    f"p99 {result['p99_ms']:8.2f}ms  {result['queries']:5.1f} queries  "
+                    f"{result['alloc_peak_kb']:8.1f} KiB",
+                    file=sys.stderr,
+                )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text)
+    elif not args.compare:
+        print(text)
+
+    if args.compare:
+        if compare(report, json.loads(Path(args.compare).read_text()), args.threshold):
+            sys.exit(1)
+        print("No regressions.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Query plans of the poll hot paths before and after a migration.
+
+Builds a throwaway test database, seeds it with ``seed_polls``, then runs
+every query below twice: with ``polls`` migrated back to ``--before`` and
+with it migrated forward to ``--after`` (default: latest). For each query it
+prints the plans side by side, plus the median time of ``--repeat``
+executions. On Postgres the plans come from EXPLAIN ANALYZE (after ANALYZE);
+on the in-memory SQLite stand-in they come from EXPLAIN QUERY PLAN.
+
+Usage (from the repository root)::
+
+    python benchmarks/query_plans.py --polls 20000 --votes 500000
+    python benchmarks/query_plans.py --before 0007 --output plans.json
+
+The default ``--before 0007`` shows the index changes of migration 0008:
+``Poll.objects.active()``, date ranges, username search (trigram index,
+Postgres only) and the per-option vote counts of one poll.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.models import Count  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from polls.models import Poll, Vote  # noqa: E402
+
+
+def queries():
+    """name -> queryset, built against the seeded data."""
+    now = timezone.now()
+    hot = Poll.objects.order_by("-total_votes").values_list("id", flat=True).first()
+    voter = Vote.objects.filter(poll_id=hot).values_list("user_id", flat=True).first()
+    return {
+        "active_polls": Poll.objects.active().order_by("-created_at", "-id")[:20],
+        "expiry_range": Poll.objects.filter(expiry_date__gte=now + timedelta(days=3), expiry_date__lte=now + timedelta(days=4)),
+        "created_range": Poll.objects.filter(created_at__gte=now - timedelta(minutes=1)).order_by("-created_at")[:20],
+        "username_search": Poll.objects.filter(created_by__username__icontains="_42")[:20],
+        "option_counts": Vote.objects.filter(poll_id=hot).values("option_id").annotate(votes=Count("id")),
+        "duplicate_vote_check": Vote.objects.filter(poll_id=hot, user_id=voter).values("id")[:1],
+    }
+
+
+def explain(queryset):
+    if connection.vendor == "postgresql":
+        return queryset.explain(analyze=True, buffers=True)
+    return queryset.explain()
+
+
+def timed(queryset, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        list(queryset.all())
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 3)
+
+
+def measure(label, repeat):
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+    return {name: {"plan": explain(qs), "median_ms": timed(qs, repeat)} for name, qs in queries().items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--polls", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--votes", type=int, default=100000)
+    parser.add_argument("--before", default="0007", help="polls migration to compare against")
+    parser.add_argument("--after", default=None, help="polls migration with the change (default: latest)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="write plans and timings as JSON")
+    args = parser.parse_args()
+
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        call_command(
+            "seed_polls", "--users", str(args.users), "--polls", str(args.polls), "--votes", str(args.votes),
+            "--seed", "1", stdout=StringIO(),
+        )
+        call_command("migrate", "polls", args.before, verbosity=0)
+        before = measure("before", args.repeat)
+        call_command("migrate", "polls", *([args.after] if args.after else []), verbosity=0)
+        after = measure("after", args.repeat)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    report = {}
+    for name in before:
+        report[name] = {"before": before[name], "after": after[name]}
+        print(f"=== {name}: {before[name]['median_ms']}ms -> {after[name]['median_ms']}ms")
+        print(f"--- before ({args.before})\n{before[name]['plan']}")
+        print(f"--- after ({args.after or 'latest'})\n{after[name]['plan']}\n")
+    if args.output:
+        Path(args.output).write_text(json.dumps({"database": connection.vendor, "queries": report}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
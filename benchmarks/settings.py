@@ -0,0 +1,24 @@
+"""
+Settings for the benchmark suite: the project settings, with an in-memory
+SQLite stand-in when no Postgres database is configured.
+
+- BENCH_DB=sqlite forces SQLite even when POSTGRES_DB is set
+- request logs go to BENCH_LOG_FILE (default: discarded) instead of request_logs.log
+  and the console
+"""
+import os
+
+from online_poll_backend.settings import *  # noqa: F401,F403
+from online_poll_backend.settings import LOGGING, SECRET_KEY
+
+if os.getenv("BENCH_DB") == "sqlite" or not os.getenv("POSTGRES_DB"):
+    DATABASES = {"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}}
+
+# runs against a throwaway database, so any key will do when none is configured
+SECRET_KEY = SECRET_KEY or "benchmark-only-secret-key"
+
+# the test client talks plain HTTP
+SECURE_SSL_REDIRECT = False
+
+LOGGING["handlers"]["file"]["filename"] = os.getenv("BENCH_LOG_FILE", os.devnull)
+LOGGING["loggers"]["polls.middleware"]["handlers"] = ["file"]
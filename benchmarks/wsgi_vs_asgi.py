@@ -0,0 +1,219 @@
+"""
+Concurrent voting load test: WSGI (gunicorn) vs ASGI (uvicorn).
+
+Starts each server as a subprocess against the configured database, then has
+``--voters`` distinct users (one JWT each) vote concurrently on a fresh poll:
+
+- wsgi: ``gunicorn online_poll_backend.wsgi`` with sync workers + threads,
+  voting through ``POST /api/vote/``
+- asgi: ``uvicorn online_poll_backend.asgi:application``, voting through the
+  native async ``POST /api/async/vote/``
+
+Usage (from the repository root, with the database migrated)::
+
+    pip install uvicorn            # gunicorn is already in requirements.txt
+    python benchmarks/wsgi_vs_asgi.py --voters 2000 --concurrency 64 --workers 2
+    python benchmarks/wsgi_vs_asgi.py --only asgi --json asgi.json
+    python benchmarks/wsgi_vs_asgi.py --only wsgi --workers 1 --conn-modes fresh,persistent,pool
+
+Prints requests/second and p50/p95/p99 latency per server. ``--conn-modes``
+repeats each run per database connection mode (a new connection per
+request, persistent connections, or the psycopg 3 pool), and adds the connect
+and pool wait counters that ``/api/metrics/`` reports after the run. Each
+counter comes from the worker that answered the scrape, so use
+``--workers 1`` for exact numbers.
+"""
+import argparse
+import http.client
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "online_poll_backend.settings")
+# plain HTTP on localhost
+os.environ.setdefault("SECURE_SSL_REDIRECT", "False")
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework_simplejwt.tokens import AccessToken  # noqa: E402
+
+from polls.models import Option, Poll, User  # noqa: E402
+
+SERVERS = {
+    "wsgi": {
+        "command": lambda port, workers, threads: [
+            "gunicorn", "online_poll_backend.wsgi", "--bind", f"127.0.0.1:{port}",
+            "--workers", str(workers), "--threads", str(threads), "--log-level", "warning",
+        ],
+        "vote_path": "/api/vote/",
+    },
+    "asgi": {
+        "command": lambda port, workers, threads: [
+            "uvicorn", "online_poll_backend.asgi:application", "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning",
+        ],
+        "vote_path": "/api/async/vote/",
+    },
+}
+
+
+# environment of the server process per connection mode (see DATABASES in settings.py)
+CONN_MODES = {
+    "fresh": {"DB_CONN_MAX_AGE": "0", "DB_POOL": "False"},
+    "persistent": {"DB_CONN_MAX_AGE": "60", "DB_POOL": "False"},
+    "pool": {"DB_POOL": "True"},
+}
+DB_METRICS = ("polls_db_connects_total", "polls_db_pool_requests_queued_total", "polls_db_pool_wait_seconds_total")
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0.0
+
+
+def make_fixture(label, voters):
+    """A poll with four options and ``voters`` users with access tokens."""
+    run = f"{label}-{uuid.uuid4().hex[:8]}"
+    users = User.objects.bulk_create([User(username=f"bench-{run}-{i}") for i in range(voters)])
+    poll = Poll.objects.create(title=f"Benchmark {run}", created_by=users[0])
+    options = Option.objects.bulk_create([Option(poll=poll, text=f"Option {i}") for i in range(4)])
+    tokens = [str(AccessToken.for_user(user)) for user in users]
+    return poll, options, tokens
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with status {process.returncode} (see its output above)")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def drive(port, path, poll, options, tokens, concurrency):
+    """Fire one vote per token with ``concurrency`` client threads."""
+    local = threading.local()
+
+    def vote(i):
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = local.conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        body = json.dumps({"poll": poll.id, "option": options[i % len(options)].id})
+        headers = {"Content-Type": "application/json", "Authorization": f"Bearer {tokens[i]}"}
+        start = time.perf_counter()
+        try:
+            conn.request("POST", path, body, headers)
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            local.conn = None
+            status = "error"
+        return status, (time.perf_counter() - start) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(vote, range(len(tokens))))
+    elapsed = time.perf_counter() - started
+
+    latencies = [ms for _, ms in results]
+    statuses = {}
+    for status, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        "requests": len(results),
+        "seconds": round(elapsed, 3),
+        "rps": round(len(results) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "statuses": statuses,
+    }
+
+
+def db_metrics(port, token):
+    """Database counters (summed over aliases) from the server's /api/metrics/."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    conn.request("GET", "/api/metrics/", headers={"Authorization": f"Bearer {token}"})
+    body = conn.getresponse().read().decode()
+    values = {}
+    for line in body.splitlines():
+        name = line.split("{", 1)[0]
+        if name in DB_METRICS:
+            values[name] = round(values.get(name, 0) + float(line.rsplit(" ", 1)[1]), 6)
+    return values
+
+
+def run(kind, args, mode=None):
+    server = SERVERS[kind]
+    label = f"{kind}/{mode}" if mode else kind
+    command = server["command"](0, args.workers, args.threads)
+    if shutil.which(command[0]) is None:
+        print(f"[{label}] skipped: {command[0]} is not installed")
+        return None
+
+    poll, options, tokens = make_fixture(kind, args.voters)
+    port = free_port()
+    env = {**os.environ, **CONN_MODES.get(mode, {})}
+    # /api/metrics/ needs a token; give the server one if none is configured
+    env.setdefault("METRICS_TOKEN", uuid.uuid4().hex)
+    process = subprocess.Popen(server["command"](port, args.workers, args.threads), cwd=ROOT, env=env)
+    try:
+        wait_until_up(port, process)
+        result = drive(port, server["vote_path"], poll, options, tokens, args.concurrency)
+        if mode:
+            result["db"] = db_metrics(port, env["METRICS_TOKEN"])
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    print(
+        f"[{label}] {result['requests']} votes in {result['seconds']}s -> {result['rps']} req/s, "
+        f"p50 {result['p50_ms']}ms p95 {result['p95_ms']}ms p99 {result['p99_ms']}ms {result['statuses']} {result.get('db', '')}"
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--voters", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=2, help="server worker processes")
+    parser.add_argument("--threads", type=int, default=8, help="threads per gunicorn worker")
+    parser.add_argument("--only", choices=sorted(SERVERS), help="benchmark a single server")
+    parser.add_argument("--conn-modes", help=f"comma-separated database connection modes: {', '.join(CONN_MODES)}")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    kinds = [args.only] if args.only else ["wsgi", "asgi"]
+    modes = [m for m in args.conn_modes.split(",") if m in CONN_MODES] if args.conn_modes else [None]
+    results = {
+        f"{kind}/{mode}" if mode else kind: run(kind, args, mode) for kind in kinds for mode in modes
+    }
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -12,5 +12,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'online_poll_backend.settings')
+os.environ.setdefault('DJANGO_SERVING_ASGI', 'True')
 
 application = get_asgi_application()
@@ -1,5 +1,7 @@
 import os
+from importlib.util import find_spec
 from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -37,6 +39,9 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = "polls.User"
 
 MIDDLEWARE = [
+    # first, so its timings cover the whole stack
+    "polls.middleware.InstrumentationMiddleware",
+    "polls.middleware.PrimaryPinningMiddleware",
     "corsheaders.middleware.CorsMiddleware",  
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -69,6 +74,8 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "online_poll_backend.wsgi.application"
+# set by asgi.py, so settings can tell which server interface loads them
+SERVING_ASGI = os.getenv("DJANGO_SERVING_ASGI", "False") == "True"
 
 # Database
 DATABASES = {
@@ -79,9 +86,55 @@ DATABASES = {
         "PASSWORD": os.getenv("POSTGRES_PASSWORD"),
         "HOST": os.getenv("POSTGRES_HOST"),
         "PORT": os.getenv("POSTGRES_PORT"),
+        # persistent connections, pinged before reuse after an error or a request boundary;
+        # off by default under ASGI, where Django advises against them
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "0" if SERVING_ASGI else "60")),
+        "CONN_HEALTH_CHECKS": os.getenv("DB_CONN_HEALTH_CHECKS", "True") == "True",
     }
 }
 
+# Connection pool (Django's native pool; needs psycopg 3 and psycopg_pool, and
+# replaces persistent connections). Each process keeps DB_POOL_SIZE connections
+# and opens up to DB_POOL_OVERFLOW more under load; a request waits at most
+# DB_POOL_TIMEOUT seconds for one. Wait times are exported at /api/metrics/.
+# Django checks pooled connections on checkout when CONN_HEALTH_CHECKS is set.
+if os.getenv("DB_POOL", "False") == "True":
+    if not (find_spec("psycopg") and find_spec("psycopg_pool")):
+        raise ImproperlyConfigured('DB_POOL=True needs psycopg 3 and psycopg_pool: pip install "psycopg[pool]".')
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": DB_POOL_SIZE,
+            "max_size": DB_POOL_SIZE + int(os.getenv("DB_POOL_OVERFLOW", "8")),
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+            "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", "600")),
+            "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", "3600")),
+        },
+    }
+
+# Read replicas: comma-separated hosts sharing the primary's credentials, each
+# added as a "replica_<n>" alias. PollViewSet GETs read from them; writes and
+# everything else use the primary (see polls/routers.py). Tests mirror the primary.
+for index, host in enumerate(h.strip() for h in os.getenv("POSTGRES_REPLICA_HOSTS", "").split(",") if h.strip()):
+    DATABASES[f"replica_{index + 1}"] = {**DATABASES["default"], "HOST": host, "TEST": {"MIRROR": "default"}}
+
+DATABASE_ROUTERS = ["polls.routers.ReplicaRouter"]
+POLLS_READ_REPLICAS = {
+    "ALIASES": [alias for alias in DATABASES if alias != "default"],
+    # seconds a client's reads stay on the primary after it writes
+    "STICKY_SECONDS": int(os.getenv("REPLICA_STICKY_SECONDS", "5")),
+}
+
+# Shared cache: REDIS_URL selects Redis; otherwise a database table, created by
+# `manage.py createcachetable`. Counters kept in the cache (FixedWindowLimiter,
+# the "cache" vote buffer, the "django" results cache) need Redis: startup checks
+# refuse the database cache for them.
+if os.getenv("REDIS_URL"):
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": os.getenv("REDIS_URL")}}
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "polls_cache"}}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -120,6 +173,104 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": 10,
 }
 
+# Build list/retrieve responses from values() rows instead of PollSerializer
+# (same JSON output; see polls/fast_serializers.py)
+POLLS_FAST_READ_SERIALIZATION = os.getenv("POLLS_FAST_READ_SERIALIZATION", "True") == "True"
+
+# Poll list pagination default: "page" (page numbers) or "cursor" (keyset).
+# Either way, ?cursor= selects keyset pagination for a single request.
+POLLS_LIST_PAGINATION = os.getenv("POLLS_LIST_PAGINATION", "page")
+
+# Maximum number of polls a user may create per day (single and batch creation)
+POLLS_DAILY_POLL_LIMIT = int(os.getenv("POLLS_DAILY_POLL_LIMIT", "5"))
+
+# Rate limiters (see polls/ratelimit.py). CLASS is pluggable: FixedWindowLimiter
+# counts in CACHES[cache_alias], which must be Redis or Memcached; TokenBucketLimiter
+# keeps per-process buckets, so its limits apply per worker. Without REDIS_URL the
+# token bucket is the default.
+DEFAULT_POLL_CREATE_LIMITER = (
+    "polls.ratelimit.FixedWindowLimiter" if os.getenv("REDIS_URL") else "polls.ratelimit.TokenBucketLimiter"
+)
+POLLS_RATE_LIMITS = {
+    "poll_create": {
+        "CLASS": os.getenv("POLL_CREATE_LIMITER", DEFAULT_POLL_CREATE_LIMITER),
+        "RATE": f"{POLLS_DAILY_POLL_LIMIT}/day",
+    },
+}
+
+# Write-behind voting: accept votes into a buffer and persist them in batches
+# (see polls/vote_buffer.py). BACKEND is "local" (per process; only allowed with
+# SINGLE_PROCESS, since other workers cannot see its pending votes) or "cache"
+# (shared; needs REDIS_URL: the buffer counts with cache.incr). GAP_TIMEOUT: seconds
+# before a missing "cache" buffer item is skipped.
+POLLS_VOTE_WRITE_BEHIND = {
+    "ENABLED": os.getenv("VOTE_WRITE_BEHIND", "False") == "True",
+    "BACKEND": os.getenv("VOTE_BUFFER_BACKEND", "local"),
+    "SINGLE_PROCESS": os.getenv("VOTE_BUFFER_SINGLE_PROCESS", "False") == "True",
+    "CACHE_ALIAS": "default",
+    "BATCH_SIZE": int(os.getenv("VOTE_BUFFER_BATCH_SIZE", "500")),
+    "FLUSH_INTERVAL": float(os.getenv("VOTE_BUFFER_FLUSH_INTERVAL", "1.0")),
+    "GAP_TIMEOUT": int(os.getenv("VOTE_BUFFER_GAP_TIMEOUT", "10")),
+}
+
+# Vote counting (see polls/vote_events.py). MODE "sharded" counts each vote right
+# away in counter shards; "event_log" appends it to an event log and leaves counting
+# to the aggregator (manage.py aggregate_votes), so results lag by about INTERVAL
+# seconds.
+POLLS_VOTE_COUNTING = {
+    "MODE": os.getenv("VOTE_COUNTING_MODE", "sharded"),
+    "BATCH_SIZE": int(os.getenv("VOTE_AGGREGATOR_BATCH_SIZE", "5000")),
+    "INTERVAL": float(os.getenv("VOTE_AGGREGATOR_INTERVAL", "1.0")),
+    "GAP_TIMEOUT": int(os.getenv("VOTE_AGGREGATOR_GAP_TIMEOUT", "10")),
+    # "sharded" mode: also log each vote for the timeline rollups and
+    # `aggregate_votes --rebuild`. Off by default: it costs one more insert per vote,
+    # and the log grows by one row per vote (it is never pruned)
+    "LOG_SHARDED_VOTES": os.getenv("VOTE_LOG_SHARDED", "False") == "True",
+}
+
+# Per-poll results cache updated in place as votes are counted (see polls/results_cache.py).
+# BACKEND is "local" (per process, LRU) or "django" (uses CACHES[CACHE_ALIAS]; needs REDIS_URL).
+POLLS_RESULTS_CACHE = {
+    "BACKEND": os.getenv("RESULTS_CACHE_BACKEND", "local"),
+    "CACHE_ALIAS": "default",
+    "TTL": int(os.getenv("RESULTS_CACHE_TTL", "30")),
+    "MAX_ENTRIES": int(os.getenv("RESULTS_CACHE_MAX_ENTRIES", "1024")),
+}
+
+# Authenticators per view (see polls/authentication.py). The vote path only
+# accepts JWTs and resolves users from a short-TTL in-process cache; results
+# and the timeline are public, so no authenticator runs. Other views use DEFAULT_AUTHENTICATION_CLASSES.
+POLLS_AUTHENTICATION = {
+    "USER_CACHE_TTL": int(os.getenv("AUTH_USER_CACHE_TTL", "60")),
+    "VIEWS": {
+        "vote": ["polls.authentication.CachedJWTAuthentication"],
+        "results": [],
+        "timeline": [],
+    },
+}
+
+# Per-request query/timing instrumentation (see polls/instrumentation.py):
+# Server-Timing headers, per-route histograms at /api/metrics/ and slow request logs.
+# /api/metrics/ answers scrapers sending "Authorization: Bearer $METRICS_TOKEN"
+# and staff sessions; nobody else.
+POLLS_INSTRUMENTATION = {
+    "ENABLED": os.getenv("INSTRUMENTATION", "True") == "True",
+    "SERVER_TIMING": os.getenv("SERVER_TIMING_HEADER", "True") == "True",
+    "SLOW_REQUEST_MS": int(os.getenv("SLOW_REQUEST_MS", "500")),
+    "METRICS_TOKEN": os.getenv("METRICS_TOKEN", ""),
+}
+
+# Live results over Server-Sent Events (see polls/streaming.py). Votes are
+# coalesced per INTERVAL seconds and each dirty poll is computed once for all
+# its watchers. TRANSPORT "polls.streaming.PostgresNotifyTransport" shares
+# vote notifications between processes via LISTEN/NOTIFY.
+POLLS_RESULTS_STREAM = {
+    "TRANSPORT": os.getenv("RESULTS_STREAM_TRANSPORT", "polls.streaming.LocalTransport"),
+    "INTERVAL": float(os.getenv("RESULTS_STREAM_INTERVAL", "1.0")),
+    "KEEPALIVE": 15,
+    "MAX_DURATION": int(os.getenv("RESULTS_STREAM_MAX_DURATION", "300")),
+}
+
 # CORS
 # CORS_ALLOWED_ORIGINS = os.getenv("CORS_ALLOWED_ORIGINS", "").split(",")  
 CORS_ALLOW_ALL_ORIGINS = True  # allow all origins
@@ -128,17 +279,31 @@ CORS_ALLOW_CREDENTIALS = True
 # Security settings for HTTPS
 CSRF_COOKIE_SECURE = True
 SESSION_COOKIE_SECURE = True
-SECURE_SSL_REDIRECT = True
+SECURE_SSL_REDIRECT = os.getenv("SECURE_SSL_REDIRECT", "True") == "True"
+
+# Request logging (see polls/request_logging.py): records are handed to a
+# background QueueListener; sampling, body capture and redaction are tunable.
+POLLS_REQUEST_LOGGING = {
+    "QUEUE": os.getenv("REQUEST_LOG_QUEUE", "True") == "True",
+    "SAMPLE_RATE": float(os.getenv("REQUEST_LOG_SAMPLE_RATE", "1.0")),
+    "SKIP_BODY_PATHS": ["/api/auth/"],
+    "MAX_BODY_BYTES": 4096,
+    "REDACT_HEADERS": ["authorization", "proxy-authorization", "cookie", "x-csrftoken"],
+}
 
 # Logging
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
+    "formatters": {
+        "curl": {"()": "polls.request_logging.CurlFormatter"},
+    },
     "handlers": {
         "file": {
             "level": os.getenv("LOG_LEVEL", "INFO"),
             "class": "logging.FileHandler",
             "filename": BASE_DIR / "request_logs.log",
+            "formatter": "curl",
         },
         "console": {"class": "logging.StreamHandler"},
     },
@@ -148,6 +313,11 @@ LOGGING = {
             "level": os.getenv("LOG_LEVEL", "INFO"),
             "propagate": True,
         },
+        "polls.instrumentation": {
+            "handlers": ["file", "console"],
+            "level": "WARNING",
+            "propagate": False,
+        },
         "polls.middleware": {
             "handlers": ["file", "console"],
             "level": os.getenv("LOG_LEVEL", "INFO"),
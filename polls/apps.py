@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class PollsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'polls'
+
+    def ready(self):
+        from .request_logging import install_queue_handler
+        # registers the connection_created hook that times queries per request
+        from . import db, instrumentation
+        # register the rate limit, vote buffer and results cache checks
+        from . import ratelimit, results_cache, vote_buffer  # noqa: F401
+
+        instrumentation.metrics.add_collector(db.pool_metrics)
+
+        # the listener thread itself starts lazily, per process
+        install_queue_handler()
@@ -0,0 +1,146 @@
+# polls/async_views.py
+"""
+Native async versions of the hot endpoints, for ASGI deployments.
+
+- ``POST /api/async/vote/`` mirrors ``cast_vote``
+- ``GET /api/async/polls/<id>/results/`` mirrors ``PollViewSet.results``
+- ``GET /api/polls/<id>/results/stream/`` streams live results as
+  Server-Sent Events; idle watchers cost no thread, only a waiting
+  coroutine. There is no sync version: under WSGI each stream would hold a
+  worker, so the view answers 501 there.
+
+Reads go through Django's async ORM and the async cache API, so under ASGI
+a request is served on the event loop; only the vote write transaction runs
+through ``sync_to_async`` (Django has no async transactions). Responses are
+rendered with the same renderer as the DRF views, so bodies are identical.
+DRF views are sync-only, hence plain Django views with Bearer-JWT auth.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from . import streaming, vote_buffer
+from .authentication import get_user_cache
+from .models import Poll, User, Vote
+from .renderers import FastJSONRenderer
+from .results_cache import aget_results, etag_for, results_payload
+from .views import record_vote, vote_target, vote_target_missing
+
+
+def json_response(data, status=200):
+    return HttpResponse(FastJSONRenderer().render(data), status=status, content_type="application/json")
+
+
+async def authenticate_jwt(request):
+    """Resolve the user for a Bearer token (user cache, then async ORM); None if absent or invalid."""
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    if header is None:
+        return None
+    try:
+        raw_token = auth.get_raw_token(header)
+        if raw_token is None:
+            return None
+        token = auth.get_validated_token(raw_token)
+        user_id = token[jwt_settings.USER_ID_CLAIM]
+    except (AuthenticationFailed, KeyError):
+        return None
+    cache = get_user_cache()
+    user = cache.get(user_id)
+    if user is None:
+        user = await User.objects.filter(**{jwt_settings.USER_ID_FIELD: user_id}).afirst()
+        if user is None or not user.is_active:
+            return None
+        cache.set(user_id, user)
+    return user
+
+
+@csrf_exempt
+@require_POST
+async def cast_vote_async(request):
+    """Allow authenticated users to vote once per poll (async)."""
+    user = await authenticate_jwt(request)
+    if user is None:
+        return json_response({"detail": "Authentication credentials were not provided."}, status=401)
+
+    try:
+        data = json.loads(request.body or b"{}")
+        poll_id, option_id = int(data.get("poll")), int(data.get("option"))
+    except (ValueError, TypeError, AttributeError):
+        return json_response({"detail": "Not found."}, status=404)
+
+    option = await vote_target(poll_id, option_id).afirst()
+    if option is None:
+        missing = vote_target_missing(await Poll.objects.filter(pk=poll_id).aexists())
+        return json_response({"detail": str(missing)}, status=404)
+
+    # Prevent voting on expired polls
+    if not option.poll_open:
+        return json_response({"error": "This poll is closed."}, status=400)
+
+    # Write-behind mode: acknowledge now, persist in the next batched flush
+    if vote_buffer.is_enabled():
+        if await Vote.objects.filter(user=user, poll_id=poll_id).aexists() or not await sync_to_async(
+            vote_buffer.enqueue_vote
+        )(option.poll, option, user):
+            return json_response({"error": "You have already voted on this poll."}, status=400)
+        return json_response({"message": "Vote accepted."}, status=202)
+
+    # Prevent duplicate vote: the unique constraint decides, atomically
+    if not await sync_to_async(record_vote)(option.poll, option, user):
+        return json_response({"error": "You have already voted on this poll."}, status=400)
+    return json_response({"message": "Vote cast successfully."}, status=201)
+
+
+@require_GET
+async def poll_results_async(request, pk):
+    """Cached poll results with ETag/Last-Modified revalidation (async)."""
+    try:
+        entry = await aget_results(pk)
+    except Poll.DoesNotExist:
+        return json_response({"detail": "No Poll matches the given query."}, status=404)
+
+    etag = etag_for(entry)
+    last_modified = int(entry["last_modified"])
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    response = json_response(results_payload(entry))
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+def sse_response(body):
+    response = StreamingHttpResponse(body, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # stop nginx from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@require_GET
+async def poll_results_stream_async(request, pk):
+    """
+    Stream live results of a poll as Server-Sent Events:
+    - a "snapshot" event on connect, then "delta" events with changed options only
+    - votes are coalesced per POLLS_RESULTS_STREAM["INTERVAL"] and computed once for all watchers
+    """
+    if not isinstance(request, ASGIRequest):
+        return json_response(
+            {"detail": "Live results are only streamed under ASGI; poll the results endpoint instead."},
+            status=501,
+        )
+    if not await Poll.objects.filter(pk=pk).aexists():
+        return json_response({"detail": "No Poll matches the given query."}, status=404)
+    return sse_response(streaming.astream_results(pk, streaming.get_config()))
@@ -0,0 +1,157 @@
+# polls/authentication.py
+"""
+JWT authentication with an in-process user cache, and per-view authenticator
+lists.
+
+``CachedJWTAuthentication`` validates the token like ``JWTAuthentication``
+(signature and expiry are checked locally) but resolves the user from a
+short-TTL in-process cache, so a hot path like voting does not load
+``polls.User`` on every request. Saving or deleting a user drops it from the
+cache of the process that made the change; other processes pick the change
+up within ``USER_CACHE_TTL`` seconds.
+
+``POLLS_AUTHENTICATION["VIEWS"]`` sets the authenticators, in order, per view
+key; views without an entry use DRF's ``DEFAULT_AUTHENTICATION_CLASSES``::
+
+    POLLS_AUTHENTICATION = {
+        "VIEWS": {
+            "vote": ["polls.authentication.CachedJWTAuthentication"],
+            "results": [],  # public endpoint: no authenticator runs at all
+        },
+    }
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from .models import User
+
+DEFAULTS = {
+    "USER_CACHE_TTL": 60,
+    "USER_CACHE_MAX_ENTRIES": 10000,
+    "VIEWS": {},
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "POLLS_AUTHENTICATION", {})}
+
+
+class UserCache:
+    """
+    LRU of user instances by id, each entry valid for ``ttl`` seconds. Ids are
+    keyed as strings: tokens carry the id claim as a string, signals the pk.
+    """
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, user_id):
+        user_id = str(user_id)
+        with self._lock:
+            item = self._entries.get(user_id)
+            if item is None:
+                return None
+            expires, user = item
+            if expires < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+        # requests get their own copy; the cached instance is shared between threads
+        return copy.copy(user)
+
+    def set(self, user_id, user):
+        user_id = str(user_id)
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, copy.copy(user))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_user_cache = None
+_view_classes = {}
+_lock = threading.Lock()
+
+
+def get_user_cache():
+    global _user_cache
+    with _lock:
+        if _user_cache is None:
+            config = get_config()
+            _user_cache = UserCache(config["USER_CACHE_TTL"], config["USER_CACHE_MAX_ENTRIES"])
+        return _user_cache
+
+
+@receiver(setting_changed)
+def _reset(setting, **kwargs):
+    global _user_cache
+    if setting == "POLLS_AUTHENTICATION":
+        with _lock:
+            _user_cache = None
+            _view_classes.clear()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def _invalidate_user(sender, instance, **kwargs):
+    get_user_cache().invalidate(instance.pk)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` resolving users through the in-process user cache."""
+
+    def get_user(self, validated_token):
+        cache = get_user_cache()
+        user_id = validated_token.get(jwt_settings.USER_ID_CLAIM)
+        user = cache.get(user_id) if user_id is not None else None
+        if user is None:
+            # validates the claim, loads the user and rejects inactive ones
+            user = super().get_user(validated_token)
+            cache.set(user_id, user)
+        return user
+
+
+class ViewAuthentication:
+    """
+    Authenticator classes of one view key, read from settings on each request
+    (so ``override_settings`` and per-deployment config apply). Use it where
+    DRF expects ``authentication_classes``.
+    """
+
+    def __init__(self, key):
+        self.key = key
+
+    def __iter__(self):
+        with _lock:
+            classes = _view_classes.get(self.key)
+            if classes is None:
+                paths = get_config()["VIEWS"].get(self.key)
+                classes = (
+                    [import_string(path) for path in paths]
+                    if paths is not None
+                    else list(api_settings.DEFAULT_AUTHENTICATION_CLASSES)
+                )
+                _view_classes[self.key] = classes
+        return iter(classes)
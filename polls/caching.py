@@ -0,0 +1,22 @@
+# polls/caching.py
+"""
+Cache backends that can hold shared counters.
+
+The rate limiters, the "cache" vote buffer and the "django" results cache
+count with ``cache.incr``. That is only safe where the backend increments on
+the server: Redis and Memcached. Every other backend inherits
+``BaseCache.incr``, a ``get`` followed by a ``set``: concurrent increments
+are lost, and the ``set`` resets the key to the backend's default timeout
+(300 s), so counters meant to live for a day or forever expire after five
+quiet minutes. Local-memory caches increment atomically but only within
+one process.
+"""
+from django.core.cache.backends.memcached import BaseMemcachedCache
+from django.core.cache.backends.redis import RedisCache
+
+ATOMIC_COUNTER_BACKENDS = (RedisCache, BaseMemcachedCache)
+
+
+def counts_atomically(cache):
+    """True if ``cache.incr`` is atomic across processes and keeps the key's expiry."""
+    return isinstance(cache, ATOMIC_COUNTER_BACKENDS)
@@ -0,0 +1,67 @@
+# polls/counters.py
+"""
+Sharded vote counters.
+
+Each option's live vote total is ``Option.vote_count`` (the folded value)
+plus the sum of its ``OptionVoteShard`` rows. A vote increments one shard
+picked at random out of ``Poll.vote_counter_shards``, so voters for the
+same option spread their row locks instead of serialising on one row.
+
+In "event_log" counting mode a vote is only appended to the vote event log;
+in "sharded" mode it is logged as well only with ``LOG_SHARDED_VOTES`` (see
+polls/vote_events.py).
+"""
+import random
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import OptionVoteShard, Poll
+from .results_cache import get_results_cache
+from .streaming import results_changed
+from . import vote_events
+
+
+def increment_option(option_id, shards=1, amount=1):
+    """Add ``amount`` votes to a random shard of the option (creating it on first use)."""
+    shard = random.randrange(max(shards, 1))
+    updated = OptionVoteShard.objects.filter(option_id=option_id, shard=shard).update(
+        count=F("count") + amount
+    )
+    if updated:
+        return
+    try:
+        # savepoint so a lost creation race does not break the caller's transaction
+        with transaction.atomic():
+            OptionVoteShard.objects.create(option_id=option_id, shard=shard, count=amount)
+    except IntegrityError:
+        OptionVoteShard.objects.filter(option_id=option_id, shard=shard).update(
+            count=F("count") + amount
+        )
+
+
+def count_votes(poll_id, option_id, shards=1, amount=1):
+    """
+    Count ``amount`` new votes for an option: append them to the vote event
+    log (see ``vote_events.logs_votes()``) and, in "sharded" mode, bump a
+    counter shard and the poll's stored total_votes and, once the surrounding
+    transaction commits, the cached results for the poll and its live
+    results watchers. In "event_log" mode
+    the aggregator does the counting.
+
+    The poll row is updated after the shard so every voter takes the two
+    locks in the same order.
+    """
+    if vote_events.counting_mode() == "event_log":
+        vote_events.append(poll_id, option_id, amount)
+        return
+    increment_option(option_id, shards=shards, amount=amount)
+    Poll.objects.filter(pk=poll_id).update(total_votes=F("total_votes") + amount)
+    if vote_events.logs_votes():
+        vote_events.append(poll_id, option_id, amount, counted=True)
+
+    def after_commit():
+        get_results_cache().apply_vote(poll_id, option_id, amount)
+        results_changed(poll_id)
+
+    transaction.on_commit(after_commit)
@@ -0,0 +1,78 @@
+# polls/db.py
+"""
+Database connection helpers.
+
+- ``pool_metrics``: a collector for ``instrumentation.metrics`` exposing the
+  state and wait times of Django's native connection pools (psycopg 3), plus
+  how often each process connects
+- ``copy_from``: ``COPY ... FROM STDIN`` under both psycopg 2 and psycopg 3
+"""
+import threading
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_connects = {}
+_lock = threading.Lock()
+
+
+@receiver(connection_created)
+def count_connect(connection, **kwargs):
+    # a new connection, or a checkout when the alias is pooled
+    with _lock:
+        _connects[connection.alias] = _connects.get(connection.alias, 0) + 1
+
+
+def pooled_aliases():
+    return [
+        alias for alias in connections
+        if connections[alias].vendor == "postgresql"
+        and connections.settings[alias].get("OPTIONS", {}).get("pool")
+    ]
+
+
+# (metric, type, help, psycopg_pool stats key, scale)
+POOL_METRICS = (
+    ("polls_db_pool_size", "gauge", "Connections managed by the pool.", "pool_size", 1),
+    ("polls_db_pool_available", "gauge", "Idle connections in the pool.", "pool_available", 1),
+    ("polls_db_pool_max", "gauge", "Pool size limit (size + overflow).", "pool_max", 1),
+    ("polls_db_pool_requests_waiting", "gauge", "Requests waiting for a connection.", "requests_waiting", 1),
+    ("polls_db_pool_requests_total", "counter", "Connections requested from the pool.", "requests_num", 1),
+    ("polls_db_pool_requests_queued_total", "counter", "Requests that had to wait for a connection.",
+     "requests_queued", 1),
+    ("polls_db_pool_wait_seconds_total", "counter", "Time spent waiting for a connection.", "requests_wait_ms", 0.001),
+    ("polls_db_pool_timeouts_total", "counter", "Requests that timed out waiting for a connection.",
+     "requests_errors", 1),
+)
+
+
+def pool_metrics():
+    """Prometheus exposition lines for this process's pools and connects."""
+    with _lock:
+        connects = dict(_connects)
+    lines = ["# HELP polls_db_connects_total Database connects (pool checkouts for pooled aliases).",
+             "# TYPE polls_db_connects_total counter"]
+    for alias, count in sorted(connects.items()):
+        lines.append(f'polls_db_connects_total{{alias="{alias}"}} {count}')
+
+    stats = {alias: connections[alias].pool.get_stats() for alias in pooled_aliases()}
+    if not stats:
+        return lines
+    for name, kind, help_text, key, scale in POOL_METRICS:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        for alias, values in sorted(stats.items()):
+            value = values.get(key, 0)
+            value = round(value * scale, 6) if scale != 1 else value
+            lines.append(f'{name}{{alias="{alias}"}} {value}')
+    return lines
+
+
+def copy_from(cursor, sql, source, chunk_size=1 << 16):
+    """Run ``COPY ... FROM STDIN`` (``sql``) reading from file object ``source``."""
+    if hasattr(cursor, "copy_expert"):  # psycopg2
+        cursor.copy_expert(sql, source)
+        return
+    with cursor.copy(sql) as copy:
+        while data := source.read(chunk_size):
+            copy.write(data)
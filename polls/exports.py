@@ -0,0 +1,102 @@
+# polls/exports.py
+"""
+Streaming exports of votes and results as CSV or NDJSON.
+
+Rows come from ``values_list(...).iterator(chunk_size=...)``, which reads
+through a server-side cursor on Postgres, and are encoded into text chunks
+as they arrive. Memory stays constant however many rows are exported, and
+the header (CSV) or first rows are sent before the query is exhausted.
+
+Vote columns follow ``VoteSerializer``; rows are built from tuples rather
+than through the serializer, which would cost a model instance per vote.
+"""
+import csv
+import json
+
+from rest_framework import serializers
+
+from .models import Option, Vote
+from .serializers import VoteSerializer
+
+FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+DATASETS = ("votes", "results")
+
+RESULT_COLUMNS = ("poll", "poll_title", "option", "option_text", "vote_count")
+
+DEFAULT_CHUNK_SIZE = 2000
+
+_datetime = serializers.DateTimeField()
+
+
+def vote_rows(poll_id=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """(columns, row iterator) for the votes of one poll, or of all polls."""
+    columns = VoteSerializer.Meta.fields
+    queryset = Vote.objects.order_by("id")
+    if poll_id is not None:
+        queryset = queryset.filter(poll_id=poll_id)
+    # VoteSerializer renders the foreign keys as ids
+    fields = [f"{name}_id" if name in ("poll", "option", "user") else name for name in columns]
+    rows = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+    created_at = columns.index("created_at")
+    to_datetime = _datetime.to_representation
+
+    def formatted():
+        for row in rows:
+            row = list(row)
+            row[created_at] = to_datetime(row[created_at])
+            yield row
+
+    return columns, formatted()
+
+
+def result_rows(poll_id=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """(columns, row iterator) of per-option vote totals for one poll, or all polls."""
+    queryset = Option.objects.with_vote_totals().order_by("poll_id", "id")
+    if poll_id is not None:
+        queryset = queryset.filter(poll_id=poll_id)
+    rows = queryset.values_list("poll_id", "poll__title", "id", "text", "vote_count", "shard_votes")
+    return RESULT_COLUMNS, (
+        (poll, title, option, text, folded + shards)
+        for poll, title, option, text, folded, shards in rows.iterator(chunk_size=chunk_size)
+    )
+
+
+class _Echo:
+    """File-like object whose write() returns the line instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def encode_csv(columns, rows, rows_per_chunk=500):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    chunk = []
+    for row in rows:
+        chunk.append(writer.writerow(row))
+        if len(chunk) >= rows_per_chunk:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+def encode_ndjson(columns, rows, rows_per_chunk=500):
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps(dict(zip(columns, row)), separators=(",", ":")) + "\n")
+        if len(chunk) >= rows_per_chunk:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+def export(dataset="votes", fmt="csv", poll_id=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Text chunks of ``dataset`` ("votes" or "results") encoded as ``fmt``."""
+    columns, rows = (vote_rows if dataset == "votes" else result_rows)(poll_id, chunk_size)
+    encode = encode_csv if fmt == "csv" else encode_ndjson
+    return encode(columns, rows)
@@ -0,0 +1,57 @@
+# polls/fast_serializers.py
+"""
+Read-only fast path for poll listings.
+
+Builds the same structure as ``PollSerializer`` from ``values()`` rows with
+plain dict construction, skipping per-field serializer machinery and model
+instantiation. Key order and value formatting match ``PollSerializer``
+exactly, so the rendered JSON is byte-for-byte identical.
+"""
+from rest_framework import serializers
+
+from .models import Option
+
+# values() columns, in PollSerializer field order
+POLL_COLUMNS = ("id", "title", "description", "expiry_date", "created_by__username", "created_at", "total_votes")
+OPTION_COLUMNS = ("id", "poll_id", "text", "vote_count", "shard_votes")
+
+_datetime = serializers.DateTimeField()
+
+
+def poll_rows(queryset):
+    """Turn a Poll queryset into a values() queryset with the columns PollSerializer reads."""
+    return queryset.prefetch_related(None).values(*POLL_COLUMNS)
+
+
+def options_by_poll(poll_ids):
+    """{poll_id: [option dict, ...]} for the given polls, in one query."""
+    grouped = {poll_id: [] for poll_id in poll_ids}
+    rows = (
+        Option.objects.filter(poll_id__in=poll_ids)
+        .with_vote_totals()
+        .order_by("id")
+        .values_list(*OPTION_COLUMNS)
+    )
+    for option_id, poll_id, text, vote_count, shard_votes in rows:
+        grouped[poll_id].append({"id": option_id, "text": text, "vote_count": vote_count + shard_votes})
+    return grouped
+
+
+def serialize_polls(rows):
+    """Serialize poll rows from ``poll_rows()`` plus their options."""
+    rows = list(rows)
+    options = options_by_poll([row["id"] for row in rows])
+    to_datetime = _datetime.to_representation
+    return [
+        {
+            "id": row["id"],
+            "title": row["title"],
+            "description": row["description"],
+            "expiry_date": to_datetime(row["expiry_date"]),
+            "created_by": row["created_by__username"],
+            "created_at": to_datetime(row["created_at"]),
+            "options": options[row["id"]],
+            "total_votes": row["total_votes"],
+        }
+        for row in rows
+    ]
@@ -9,7 +9,12 @@ class PollFilter(filters.FilterSet):
     created_end = filters.DateFilter(field_name="created_at", lookup_expr="lte")
     created_by = filters.CharFilter(field_name="created_by__username", lookup_expr="icontains")
     id = filters.NumberFilter(field_name="id")
+    active = filters.BooleanFilter(method="filter_active")
 
     class Meta:
         model = Poll
-        fields = ['id', 'created_by', 'expiry_start', 'expiry_end', 'created_start', 'created_end']
+        fields = ['id', 'created_by', 'expiry_start', 'expiry_end', 'created_start', 'created_end', 'active']
+
+    def filter_active(self, queryset, name, value):
+        # evaluated in SQL, so it combines with ordering and pagination
+        return queryset.active() if value else queryset.expired()
@@ -0,0 +1,199 @@
+# polls/instrumentation.py
+"""
+Per-request database and timing instrumentation.
+
+``InstrumentationMiddleware`` opens a ``RequestStats`` for each request. An
+execute wrapper installed on every database connection (see
+``install_query_recorder``) adds each statement's duration to the stats of
+the request that runs it. The stats travel in a context variable, so they
+also follow queries that async views run through ``sync_to_async``.
+
+Per request, the middleware:
+
+- sets a ``Server-Timing`` header (``db``, ``app`` and ``total`` durations
+  plus the query count), readable in browser dev tools
+- adds the request to per-route histograms (duration, DB time, queries),
+  served in Prometheus text format at ``/api/metrics/``
+- logs requests slower than ``SLOW_REQUEST_MS`` with their slowest statements
+  on the ``polls.instrumentation`` logger
+
+Histograms are kept per process: scrape each worker, or rely on the logs.
+"""
+import bisect
+import contextvars
+import heapq
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": True,
+    "SERVER_TIMING": True,
+    # slowest statements kept per request (for the slow request log)
+    "SLOWEST": 3,
+    "SLOW_REQUEST_MS": 500,
+    # bearer token for /api/metrics/; without one, only staff sessions may read it
+    "METRICS_TOKEN": "",
+    "DURATION_BUCKETS": [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5],
+    "QUERY_BUCKETS": [0, 1, 2, 3, 5, 10, 20, 50],
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "POLLS_INSTRUMENTATION", {})}
+
+
+class RequestStats:
+    """Query count, DB time and slowest statements of one request."""
+
+    def __init__(self, keep_slowest):
+        self.queries = 0
+        self.db_time = 0.0
+        self.keep_slowest = keep_slowest
+        self._slowest = []
+        self._lock = threading.Lock()
+
+    def add(self, sql, duration):
+        with self._lock:
+            self.queries += 1
+            self.db_time += duration
+            if self.keep_slowest:
+                item = (duration, self.queries, sql)
+                if len(self._slowest) < self.keep_slowest:
+                    heapq.heappush(self._slowest, item)
+                elif duration > self._slowest[0][0]:
+                    heapq.heapreplace(self._slowest, item)
+
+    def slowest(self):
+        """[(seconds, sql), ...] slowest first."""
+        return [(duration, sql) for duration, _, sql in sorted(self._slowest, reverse=True)]
+
+
+_current = contextvars.ContextVar("polls_request_stats", default=None)
+
+
+def start_request(keep_slowest):
+    stats = RequestStats(keep_slowest)
+    return stats, _current.set(stats)
+
+
+def end_request(token):
+    if token is not None:
+        _current.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper timing statements run on behalf of an instrumented request."""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.add(sql, time.perf_counter() - start)
+
+
+@receiver(connection_created)
+def install_query_recorder(connection, **kwargs):
+    # wrappers belong to the DatabaseWrapper, which outlives reconnects
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def lines(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets + ["+Inf"], self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f"{name}_sum{{{labels}}} {self.sum:.6f}"
+        yield f"{name}_count{{{labels}}} {cumulative}"
+
+
+class MetricsRegistry:
+    """Per-route request histograms, rendered in Prometheus text format."""
+
+    METRICS = (
+        ("polls_http_request_duration_seconds", "Request duration.", "DURATION_BUCKETS"),
+        ("polls_http_request_db_seconds", "Time spent in database queries per request.", "DURATION_BUCKETS"),
+        ("polls_http_request_queries", "Database queries per request.", "QUERY_BUCKETS"),
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._responses = {}
+        self._collectors = []
+
+    def observe(self, route, method, status, duration, db_time, queries, config):
+        key = (route, method)
+        with self._lock:
+            histograms = self._routes.get(key)
+            if histograms is None:
+                histograms = self._routes[key] = [Histogram(config[buckets]) for _, _, buckets in self.METRICS]
+            for histogram, value in zip(histograms, (duration, db_time, queries)):
+                histogram.observe(value)
+            self._responses[(route, method, status)] = self._responses.get((route, method, status), 0) + 1
+
+    def add_collector(self, collector):
+        """Register a callable returning extra exposition lines (e.g. pool gauges)."""
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def render(self):
+        with self._lock:
+            routes = {key: list(histograms) for key, histograms in self._routes.items()}
+            responses = dict(self._responses)
+        lines = []
+        for index, (name, help_text, _) in enumerate(self.METRICS):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (route, method), histograms in sorted(routes.items()):
+                lines += histograms[index].lines(name, f'route="{route}",method="{method}"')
+        lines += ["# HELP polls_http_responses_total Responses by route and status.",
+                  "# TYPE polls_http_responses_total counter"]
+        for (route, method, status), count in sorted(responses.items()):
+            lines.append(f'polls_http_responses_total{{route="{route}",method="{method}",status="{status}"}} {count}')
+        for collector in self._collectors:
+            lines += collector()
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+            self._responses.clear()
+
+
+metrics = MetricsRegistry()
+
+
+def route_of(request):
+    """Low-cardinality route label: the URL name, or the pattern, of the matched view."""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.view_name or match.route
+
+
+def server_timing(stats, total):
+    db_ms = stats.db_time * 1000
+    total_ms = total * 1000
+    return (
+        f'db;dur={db_ms:.1f};desc="{stats.queries} queries", '
+        f"app;dur={max(total_ms - db_ms, 0):.1f}, total;dur={total_ms:.1f}"
+    )
@@ -0,0 +1,43 @@
+# polls/management/commands/aggregate_votes.py
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+from polls import vote_events
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold new vote events into option and poll tallies (\"event_log\" counting mode) "
+        "and into the minute/hour/day vote rollups (both modes). Runs as a worker until "
+        "interrupted; --once stops when caught up. --rebuild recomputes tallies and "
+        "rollups from the whole event log instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Fold pending events, then exit.")
+        parser.add_argument("--batch-size", type=int, default=None, help="Events per transaction.")
+        parser.add_argument("--interval", type=float, default=None, help="Seconds to sleep once caught up.")
+        parser.add_argument("--rebuild", action="store_true", help="Recompute tallies from the event log.")
+        parser.add_argument("--poll", type=int, action="append", dest="polls", help="Rebuild only this poll (repeatable).")
+
+    def handle(self, *args, **options):
+        mode = vote_events.counting_mode()
+        if options["rebuild"]:
+            try:
+                rebuilt = vote_events.rebuild(options["polls"])
+            except ImproperlyConfigured as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt tallies and rollups of {rebuilt} options from the event log."))
+            return
+        if options["once"]:
+            consumed = vote_events.aggregate_all(options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Aggregated {consumed} vote events."))
+            return
+
+        self.stdout.write(f"Aggregating vote events ({mode} mode); stop with Ctrl-C.")
+        stop = threading.Event()
+        try:
+            vote_events.run(options["interval"], options["batch_size"], stop)
+        except KeyboardInterrupt:
+            stop.set()
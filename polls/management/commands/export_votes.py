@@ -0,0 +1,30 @@
+# polls/management/commands/export_votes.py
+from django.core.management.base import BaseCommand, CommandError
+from polls.exports import DATASETS, DEFAULT_CHUNK_SIZE, FORMATS, export
+from polls.models import Poll
+
+class Command(BaseCommand):
+    help = (
+        "Stream the votes (or per-option results) of one poll or of all polls as CSV or NDJSON, "
+        "in constant memory, to stdout or a file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--poll", type=int, default=None, help="Export a single poll (default: all polls).")
+        parser.add_argument("--data", choices=DATASETS, default="votes")
+        parser.add_argument("--format", dest="fmt", choices=sorted(FORMATS), default="csv")
+        parser.add_argument("--output", "-o", default=None, help="File to write (default: stdout).")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows fetched per round trip.")
+
+    def handle(self, *args, **options):
+        poll_id = options["poll"]
+        if poll_id is not None and not Poll.objects.filter(pk=poll_id).exists():
+            raise CommandError(f"Poll {poll_id} does not exist.")
+
+        chunks = export(options["data"], options["fmt"], poll_id, options["chunk_size"])
+        if options["output"]:
+            with open(options["output"], "w", newline="", encoding="utf-8") as out:
+                out.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
@@ -0,0 +1,19 @@
+# polls/management/commands/flush_vote_buffer.py
+from django.core.management.base import BaseCommand
+from polls.vote_buffer import flush_vote_buffer, get_config
+
+class Command(BaseCommand):
+    help = (
+        "Drain the write-behind vote buffer into the database (run on shutdown). "
+        "Only the shared \"cache\" backend can be drained from another process; "
+        "the \"local\" backend drains itself at interpreter exit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None, help="Votes per bulk insert.")
+
+    def handle(self, *args, **options):
+        if get_config()["BACKEND"] != "cache":
+            self.stdout.write(self.style.WARNING("Vote buffer backend is process-local; nothing shared to drain."))
+        written = flush_vote_buffer(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Flushed {written} buffered votes."))
@@ -0,0 +1,127 @@
+# polls/management/commands/import_votes.py
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from polls import vote_events
+from polls.db import copy_from
+from polls.models import Option, OptionVoteShard, Poll, User, Vote, VoteEvent
+from polls.results_cache import get_results_cache
+
+# CSV columns understood in the header; "id" (as written by export_votes) is ignored
+COLUMNS = {"id": "bigint", "poll": "bigint", "option": "bigint", "user": "bigint", "created_at": "timestamptz"}
+REQUIRED = ("poll", "option", "user")
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-load votes from CSV (header with poll,option,user[,created_at], e.g. export_votes output) "
+        "with COPY into a staging table. Rows duplicating a (poll, user) vote or pointing at unknown "
+        "polls, options or users are skipped; vote counts of the affected polls and all their options are "
+        "then recomputed set-based. PostgreSQL only; run it while the affected polls are not taking votes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file to import, or - for stdin.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("import_votes needs PostgreSQL (it loads votes with COPY).")
+
+        source = sys.stdin if options["path"] == "-" else open(options["path"], newline="", encoding="utf-8")
+        try:
+            columns = self.read_header(source)
+            with transaction.atomic(), connection.cursor() as cursor:
+                staged = self.stage(cursor, source, columns)
+                # in "event_log" mode the aggregator counts the imported votes' events
+                counted = vote_events.counting_mode() != "event_log"
+                inserted, polls = self.insert_votes(cursor, "created_at" in columns, counted, vote_events.logs_votes())
+                if counted:
+                    self.recount(cursor)
+        finally:
+            if source is not sys.stdin:
+                source.close()
+
+        cache = get_results_cache()
+        for poll_id in polls:
+            cache.invalidate(poll_id)
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {inserted} of {staged} votes into {len(polls)} polls "
+            f"({staged - inserted} skipped as duplicates or unknown references)."
+        ))
+
+    def read_header(self, source):
+        columns = [name.strip() for name in source.readline().strip().split(",")]
+        unknown = [name for name in columns if name not in COLUMNS]
+        missing = [name for name in REQUIRED if name not in columns]
+        if unknown or missing:
+            raise CommandError(
+                f"Bad CSV header {columns}: expected {', '.join(REQUIRED)} and optionally id, created_at."
+            )
+        return columns
+
+    def stage(self, cursor, source, columns):
+        """COPY the CSV body into a temporary staging table; return the row count."""
+        definition = ", ".join(f'"{name}" {COLUMNS[name]}' for name in columns)
+        cursor.execute(f"CREATE TEMPORARY TABLE vote_import ({definition}) ON COMMIT DROP")
+        column_list = ", ".join(f'"{name}"' for name in columns)
+        copy_from(cursor, f"COPY vote_import ({column_list}) FROM STDIN WITH (FORMAT csv)", source)
+        cursor.execute("SELECT COUNT(*) FROM vote_import")
+        return cursor.fetchone()[0]
+
+    def insert_votes(self, cursor, has_created_at, counted, log_events):
+        """
+        Insert valid, first-seen (poll, user) rows and, if ``log_events``, their
+        vote events; record which options and polls gained votes in a second
+        temporary table.
+        """
+        created_at = 's."created_at"' if has_created_at else "NULL"
+        cursor.execute(
+            "CREATE TEMPORARY TABLE vote_import_affected "
+            "(option_id bigint, poll_id bigint, votes bigint) ON COMMIT DROP"
+        )
+        cursor.execute(f"""
+            WITH inserted AS (
+                INSERT INTO {Vote._meta.db_table} (poll_id, option_id, user_id, created_at)
+                SELECT DISTINCT ON (s."poll", s."user") s."poll", s."option", s."user", COALESCE({created_at}, NOW())
+                FROM vote_import s
+                JOIN {Option._meta.db_table} o ON o.id = s."option" AND o.poll_id = s."poll"
+                JOIN {User._meta.db_table} u ON u.id = s."user"
+                ORDER BY s."poll", s."user"
+                ON CONFLICT (poll_id, user_id) DO NOTHING
+                RETURNING option_id, poll_id, created_at
+            ), events AS (
+                INSERT INTO {VoteEvent._meta.db_table} (poll_id, option_id, amount, counted, created_at)
+                SELECT poll_id, option_id, 1, %s, created_at FROM inserted WHERE %s
+            )
+            INSERT INTO vote_import_affected (option_id, poll_id, votes)
+            SELECT option_id, poll_id, COUNT(*) FROM inserted GROUP BY option_id, poll_id
+        """, [counted, log_events])
+        cursor.execute("SELECT COALESCE(SUM(votes), 0), ARRAY_AGG(DISTINCT poll_id) FROM vote_import_affected")
+        inserted, polls = cursor.fetchone()
+        return inserted, polls or []
+
+    def recount(self, cursor):
+        """Set vote_count of the affected polls' options from their Vote rows, fold their shards, fix poll totals."""
+        # all options of the polls, not just those that got rows: the others may hold unfolded shards
+        cursor.execute(f"""
+            UPDATE {Option._meta.db_table} o SET vote_count = (
+                SELECT COUNT(*) FROM {Vote._meta.db_table} v WHERE v.option_id = o.id
+            )
+            WHERE o.poll_id IN (SELECT DISTINCT poll_id FROM vote_import_affected)
+        """)
+        cursor.execute(f"""
+            DELETE FROM {OptionVoteShard._meta.db_table}
+            WHERE option_id IN (
+                SELECT id FROM {Option._meta.db_table}
+                WHERE poll_id IN (SELECT DISTINCT poll_id FROM vote_import_affected)
+            )
+        """)
+        cursor.execute(f"""
+            UPDATE {Poll._meta.db_table} p SET total_votes = t.votes
+            FROM (
+                SELECT o.poll_id, SUM(o.vote_count) AS votes FROM {Option._meta.db_table} o
+                WHERE o.poll_id IN (SELECT DISTINCT poll_id FROM vote_import_affected)
+                GROUP BY o.poll_id
+            ) t
+            WHERE p.id = t.poll_id
+        """)
@@ -1,15 +1,162 @@
 # polls/management/commands/recompute_vote_counts.py
-from django.core.management.base import BaseCommand
-from django.db.models import Count
-from polls.models import Option
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from polls import vote_events
+from polls.models import Option, OptionVoteShard, Poll, Vote
+
+OPTION = Option._meta.db_table
+SHARD = OptionVoteShard._meta.db_table
+VOTE = Vote._meta.db_table
+POLL = Poll._meta.db_table
+
+
+def scope(column, chunk):
+    """SQL condition (and params) restricting ``column`` to a chunk of poll ids."""
+    lo, hi, ids = chunk
+    if ids is None:
+        return f"{column} BETWEEN %s AND %s", [lo, hi]
+    return f"{column} IN ({', '.join(['%s'] * len(ids))})", list(ids)
+
+
+def recount_chunk(chunk, dry_run=False):
+    """
+    Recount the options of the polls in ``chunk`` from their Vote rows, in one
+    transaction and a few set-based statements. Returns (options, drifted).
+    """
+    in_option, params = scope("o.poll_id", chunk)
+    in_vote, _ = scope("poll_id", chunk)
+    in_poll, _ = scope("p.id", chunk)
+    with transaction.atomic(), connection.cursor() as cursor:
+        # drift: stored total (vote_count + shards) vs real Vote rows
+        cursor.execute(f"""
+            SELECT COUNT(*), COALESCE(SUM(CASE WHEN o.vote_count + COALESCE(s.votes, 0) <> COALESCE(v.votes, 0)
+                                          THEN 1 ELSE 0 END), 0)
+            FROM {OPTION} o
+            LEFT JOIN (
+                SELECT sh.option_id, SUM(sh.count) AS votes FROM {SHARD} sh
+                JOIN {OPTION} o ON o.id = sh.option_id WHERE {in_option} GROUP BY sh.option_id
+            ) s ON s.option_id = o.id
+            LEFT JOIN (
+                SELECT option_id, COUNT(*) AS votes FROM {VOTE} WHERE {in_vote} GROUP BY option_id
+            ) v ON v.option_id = o.id
+            WHERE {in_option}
+        """, params * 3)
+        options, drifted = cursor.fetchone()
+        if dry_run:
+            return options, drifted
+
+        cursor.execute(f"""
+            UPDATE {OPTION} SET vote_count = c.votes
+            FROM (
+                SELECT o.id, COUNT(v.id) AS votes FROM {OPTION} o
+                LEFT JOIN {VOTE} v ON v.option_id = o.id
+                WHERE {in_option} GROUP BY o.id
+            ) c
+            WHERE {OPTION}.id = c.id AND {OPTION}.vote_count <> c.votes
+        """, params)
+        cursor.execute(f"""
+            DELETE FROM {SHARD} WHERE option_id IN (SELECT o.id FROM {OPTION} o WHERE {in_option})
+        """, params)
+        cursor.execute(f"""
+            UPDATE {POLL} SET total_votes = c.votes
+            FROM (
+                SELECT p.id, COALESCE(SUM(o.vote_count), 0) AS votes FROM {POLL} p
+                LEFT JOIN {OPTION} o ON o.poll_id = p.id
+                WHERE {in_poll} GROUP BY p.id
+            ) c
+            WHERE {POLL}.id = c.id AND {POLL}.total_votes <> c.votes
+        """, params)
+    return options, drifted
+
+
+def _recount_in_worker(args):
+    try:
+        return recount_chunk(*args)
+    finally:
+        connections.close_all()
+
 
 class Command(BaseCommand):
-    help = "Recompute Option.vote_count from real Vote rows (fix drift)."
+    help = (
+        "Recompute Option.vote_count from real Vote rows (fix drift), fold counter shards "
+        "and repair the denormalized Poll.total_votes. Works set-based in chunks of polls; "
+        "counts are exact for votes committed before each chunk starts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--poll", type=int, action="append", dest="polls", help="Only this poll (repeatable).")
+        parser.add_argument("--since", help="Only polls that received votes at or after this ISO date/datetime.")
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Polls per transaction.")
+        parser.add_argument("--dry-run", action="store_true", help="Report drift without writing.")
+        parser.add_argument("--parallel", type=int, default=1, help="Worker processes for chunks.")
 
     def handle(self, *args, **options):
-        qs = Option.objects.annotate(real_count=Count('votes')).values('id', 'real_count')
-        updated = 0
-        for row in qs:
-            Option.objects.filter(pk=row['id']).update(vote_count=row['real_count'])
-            updated += 1
-        self.stdout.write(self.style.SUCCESS(f"Recomputed vote_count for {updated} options."))
+        if vote_events.counting_mode() == "event_log":
+            # counts from Vote rows would include events the aggregator has yet to fold
+            raise CommandError("Vote counting uses the event log: run aggregate_votes --rebuild instead.")
+        chunks = self.chunks(options)
+        dry_run = options["dry_run"]
+        total = len(chunks)
+        checked = drifted = 0
+        for done, (chunk, (count, drift)) in enumerate(zip(chunks, self.run(chunks, dry_run, options["parallel"])), 1):
+            checked += count
+            drifted += drift
+            lo, hi, _ = chunk
+            self.stdout.write(f"[{done}/{total}] polls {lo}-{hi}: {count} options, {drift} drifted")
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f"Dry run: {drifted} of {checked} options have drifted."))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Recomputed vote_count for {checked} options ({drifted} had drifted) in {total} chunks."
+            ))
+
+    def chunks(self, options):
+        """[(lo, hi, ids or None), ...] covering the polls in scope."""
+        size = options["chunk_size"]
+        ids = None
+        if options["polls"]:
+            ids = sorted(set(options["polls"]))
+        elif options["since"]:
+            since = self.parse_since(options["since"])
+            ids = list(
+                Vote.objects.filter(created_at__gte=since).order_by("poll_id")
+                .values_list("poll_id", flat=True).distinct()
+            )
+        if ids is not None:
+            return [(batch[0], batch[-1], batch) for batch in (ids[i:i + size] for i in range(0, len(ids), size))]
+
+        bounds = Poll.objects.aggregate(lo=Min("id"), hi=Max("id"))
+        if bounds["lo"] is None:
+            return []
+        return [(lo, min(lo + size - 1, bounds["hi"]), None) for lo in range(bounds["lo"], bounds["hi"] + 1, size)]
+
+    def parse_since(self, value):
+        since = parse_datetime(value)
+        if since is None:
+            day = parse_date(value)
+            if day is None:
+                raise CommandError(f"--since: {value!r} is not an ISO date or datetime.")
+            since = datetime.combine(day, time.min)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return since
+
+    def run(self, chunks, dry_run, workers):
+        if workers <= 1 or len(chunks) <= 1:
+            return (recount_chunk(chunk, dry_run) for chunk in chunks)
+        # forked children must not share the parent's database connection
+        connections.close_all()
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"))
+        return self._drain(pool, pool.map(_recount_in_worker, [(chunk, dry_run) for chunk in chunks]))
+
+    def _drain(self, pool, results):
+        with pool:
+            yield from results
@@ -1,10 +1,129 @@
-from django.core.management.base import BaseCommand
-from polls.models import Poll, Option, User
+import io
+import multiprocessing
+import random
+import time
+from bisect import bisect
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections, transaction
+from django.utils import timezone
+from polls import vote_events
+from polls.db import copy_from
+from polls.models import Poll, Option, User, Vote, VoteEvent
+
+
+def zipf_weights(n, skew):
+    """Popularity weights 1/rank**skew for ranks 1..n (skew 0 is uniform)."""
+    return [1 / (rank ** skew) for rank in range(1, n + 1)]
+
+
+def allot(total, weights, cap):
+    """Split ``total`` votes over ``weights`` proportionally, at most ``cap`` each."""
+    scale = total / sum(weights)
+    return [min(cap, round(w * scale)) for w in weights]
+
+
+def write_votes(rows, use_copy):
+    """Insert (poll_id, option_id, user_id) rows with COPY or bulk_create."""
+    if use_copy:
+        now = timezone.now().isoformat()
+        buffer = io.StringIO("".join(f"{p},{o},{u},{now}\n" for p, o, u in rows))
+        with connection.cursor() as cursor:
+            copy_from(
+                cursor,
+                f"COPY {Vote._meta.db_table} (poll_id, option_id, user_id, created_at) FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+    else:
+        Vote.objects.bulk_create(Vote(poll_id=p, option_id=o, user_id=u) for p, o, u in rows)
+
+
+def seed_votes(polls, user_ids, skew, batch_size, use_copy, seed):
+    """
+    Cast votes for ``polls`` ([(poll_id, votes, [option ids])]) from distinct
+    users and store the resulting option/poll counts, with one counted vote
+    event per option (when votes are logged). Returns votes written.
+    """
+    rng = random.Random(seed)
+    counts = Counter()
+    batch = []
+    written = 0
+    for poll_id, votes, option_ids in polls:
+        option_cdf = list(accumulate(zipf_weights(len(option_ids), skew)))
+        for user_id in rng.sample(user_ids, votes):
+            option_id = option_ids[bisect(option_cdf, rng.random() * option_cdf[-1])]
+            batch.append((poll_id, option_id, user_id))
+            counts[option_id] += 1
+            if len(batch) >= batch_size:
+                write_votes(batch, use_copy)
+                written += len(batch)
+                batch = []
+    if batch:
+        write_votes(batch, use_copy)
+        written += len(batch)
+
+    poll_of = {option_id: poll_id for poll_id, _, option_ids in polls for option_id in option_ids}
+    with transaction.atomic():
+        if vote_events.logs_votes():
+            VoteEvent.objects.bulk_create(
+                (VoteEvent(poll_id=poll_of[option_id], option_id=option_id, amount=n, counted=True)
+                 for option_id, n in counts.items()),
+                batch_size=batch_size,
+            )
+        Option.objects.bulk_update(
+            [Option(id=option_id, vote_count=n) for option_id, n in counts.items()], ["vote_count"], batch_size=batch_size
+        )
+        Poll.objects.bulk_update(
+            [Poll(id=poll_id, total_votes=votes) for poll_id, votes, _ in polls if votes], ["total_votes"],
+            batch_size=batch_size,
+        )
+    return written
+
+
+def _seed_votes_in_worker(args):
+    try:
+        return seed_votes(*args)
+    finally:
+        connections.close_all()
+
 
 class Command(BaseCommand):
-    help = "Seed initial users, polls, and options"
+    help = (
+        "Seed initial users, polls, and options. With --users/--polls/--votes, generate a "
+        "load-test dataset instead: Zipf-skewed poll and option popularity, batched "
+        "bulk_create (or COPY on PostgreSQL) and optional parallel vote writers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=0, help="Users to create.")
+        parser.add_argument("--polls", type=int, default=0, help="Polls to create.")
+        parser.add_argument("--options-per-poll", type=int, default=4)
+        parser.add_argument("--votes", type=int, default=0, help="Total votes (each user votes once per poll).")
+        parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for popularity (0 = uniform).")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Rows per insert.")
+        parser.add_argument("--copy", action="store_true", help="Write votes with COPY (PostgreSQL only).")
+        parser.add_argument("--workers", type=int, default=1, help="Parallel vote writer processes.")
+        parser.add_argument("--seed", type=int, default=None, help="Random seed for a reproducible dataset.")
+        parser.add_argument("--prefix", default="load", help="Username prefix for generated users.")
+        parser.add_argument("--password", default="password123", help="Password of every generated user.")
 
-    def handle(self, *args, **kwargs):
+    def handle(self, *args, **options):
+        if not (options["users"] or options["polls"] or options["votes"]):
+            return self.seed_examples()
+        if options["copy"] and connection.vendor != "postgresql":
+            raise CommandError("--copy needs PostgreSQL.")
+        if options["polls"] and not options["users"]:
+            raise CommandError("--polls needs --users (polls are created by generated users).")
+        if options["votes"] and not (options["users"] and options["polls"] and options["options_per_poll"]):
+            raise CommandError("--votes needs --users, --polls and --options-per-poll.")
+        self.generate(options)
+
+    def seed_examples(self):
         user, created = User.objects.get_or_create(username='seeduser', email='seed@example.com')
         if created:
             user.set_password('password123')
@@ -29,3 +148,64 @@ class Command(BaseCommand):
                 Option.objects.create(poll=poll, text=opt)
 
         self.stdout.write(self.style.SUCCESS("Seeded users, polls, and options successfully!"))
+
+    def generate(self, options):
+        started = time.monotonic()
+        rng = random.Random(options["seed"])
+        batch_size = options["batch_size"]
+        run = f"{options['prefix']}{int(time.time())}"
+
+        # one hash shared by every user, so users can log in for benchmarks
+        password = make_password(options["password"])
+        users = User.objects.bulk_create(
+            (User(username=f"{run}_{i}", password=password) for i in range(options["users"])),
+            batch_size=batch_size,
+        )
+        user_ids = [user.id for user in users]
+        self.stdout.write(f"Created {len(user_ids)} users")
+
+        now = timezone.now()
+        polls = Poll.objects.bulk_create(
+            (
+                Poll(
+                    title=f"Load test poll {i}",
+                    created_by_id=rng.choice(user_ids),
+                    expiry_date=now + timedelta(days=rng.randint(1, 30)),
+                )
+                for i in range(options["polls"])
+            ),
+            batch_size=batch_size,
+        )
+        created = Option.objects.bulk_create(
+            (Option(poll_id=poll.id, text=f"Option {n}") for poll in polls for n in range(options["options_per_poll"])),
+            batch_size=batch_size,
+        )
+        option_ids = {}
+        for option in created:
+            option_ids.setdefault(option.poll_id, []).append(option.id)
+        self.stdout.write(f"Created {len(polls)} polls with {len(created)} options")
+
+        if options["votes"]:
+            plan = [
+                (poll.id, votes, option_ids[poll.id])
+                for poll, votes in zip(polls, allot(options["votes"], zipf_weights(len(polls), options["skew"]), len(user_ids)))
+            ]
+            written = self.write_all_votes(plan, user_ids, options, rng)
+            self.stdout.write(f"Created {written} votes")
+
+        self.stdout.write(self.style.SUCCESS(f"Generated dataset in {time.monotonic() - started:.1f}s"))
+
+    def write_all_votes(self, plan, user_ids, options, rng):
+        workers = max(1, options["workers"])
+        # deal polls round-robin so every worker gets a share of the hot ones
+        jobs = [
+            (plan[i::workers], user_ids, options["skew"], options["batch_size"], options["copy"], rng.random())
+            for i in range(workers)
+        ]
+        if workers == 1:
+            return seed_votes(*jobs[0])
+        # forked children must not share the parent's database connection
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            return sum(pool.map(_seed_votes_in_worker, jobs))
@@ -1,54 +1,79 @@
 # polls/middleware.py
 
+import random
 import time
-from django.utils.deprecation import MiddlewareMixin
-from django.utils.timezone import now
-from django.http import JsonResponse
-from polls.models import Poll
 import logging
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from polls import instrumentation, routers
+from polls.request_logging import capture_request, get_config as get_logging_config
 
 logger = logging.getLogger("polls.middleware")
 
 
-class PollsMiddleware(MiddlewareMixin):
+class AsyncCapableMiddleware:
+    """
+    Base for middleware that runs natively under both WSGI and ASGI: when the
+    next handler is a coroutine, ``__call__`` dispatches to ``__acall__`` so
+    async views are served without a thread hop.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+
+class PollsMiddleware(AsyncCapableMiddleware):
     """
     Custom middleware for:
     - Logging requests
     - Adding success/failure messages to responses
-    - Restricting number of polls created by a user per day
     """
 
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.process_request(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        request.start_time = time.time()
+        if logger.isEnabledFor(logging.DEBUG):
+            self.log_request(request, await request.auser())
+        response = await self.get_response(request)
+        return self.process_response(request, response)
+
     def process_request(self, request):
-        """Log every request and enforce poll creation limits."""
+        """Log every request."""
         request.start_time = time.time()
 
-        user = getattr(request, "user", None)
-        print(
-            f"[Request] {request.method} {request.path} by {user if user and user.is_authenticated else 'Anonymous'}"
-        )
+        # guarded: resolving request.user may hit the session store
+        if logger.isEnabledFor(logging.DEBUG):
+            self.log_request(request, getattr(request, "user", None))
 
-        # Restrict polls per day (e.g., max 5 per user per day)
-        if request.path.startswith("/api/polls/") and request.method == "POST":
-            if user and user.is_authenticated:
-                today = now().date()
-                poll_count = Poll.objects.filter(
-                    created_by=user, created_at__date=today
-                ).count()
-                if poll_count >= 5:  # limit
-                    return JsonResponse(
-                        {
-                            "error": "You have reached the daily poll creation limit (5 polls per day)."
-                        },
-                        status=403,
-                    )
+        # The per-user daily poll limit is enforced by PollViewSet through
+        # polls.ratelimit, after DRF has authenticated the request.
+
+    def log_request(self, request, user):
+        logger.debug(
+            "[Request] %s %s by %s",
+            request.method, request.path, user if user and user.is_authenticated else "Anonymous",
+        )
 
     def process_response(self, request, response):
         """Add success/failure messages depending on API actions."""
         duration = time.time() - getattr(request, "start_time", time.time())
-        print(
-            f"[Response] {request.method} {request.path} took {duration:.2f}s -> {response.status_code}"
+        logger.debug(
+            "[Response] %s %s took %.2fs -> %s", request.method, request.path, duration, response.status_code
         )
 
+        # Messages are merged into dict payloads only (the batch endpoint returns a list)
+        if not isinstance(getattr(response, "data", None), dict):
+            return response
+
         # Only attach custom messages for specific API endpoints
         if request.path.startswith("/api/polls/") and request.method == "POST":
             if response.status_code == 201:
@@ -86,39 +111,123 @@ class PollsMiddleware(MiddlewareMixin):
         return response
 
 
-class RequestLoggingMiddleware:
-    def __init__(self, get_response):
-        self.get_response = get_response
+class PrimaryPinningMiddleware(AsyncCapableMiddleware):
+    """
+    After a successful write, keep the client's reads on the primary for
+    POLLS_READ_REPLICAS["STICKY_SECONDS"] (see polls/routers.py) with a cookie,
+    so it reads its own writes despite replication lag.
+    """
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
 
     def __call__(self, request):
-        # Build curl command
-        curl_parts = [f"curl -X '{request.method}' '{request.build_absolute_uri()}'"]
-
-        # Headers
-        for header, value in request.headers.items():
-            if header.lower() == "cookie":
-                continue  # skip cookies (often huge + sensitive)
-            curl_parts.append(f"  -H '{header}: {value}'")
-
-        # Body (only for POST/PUT/PATCH)
-        if request.method in ["POST", "PUT", "PATCH"]:
-            try:
-                body = request.body.decode("utf-8")
-                if body.strip():
-                    curl_parts.append(f"  -d '{body}'")
-            except Exception:
-                pass
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.pin(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.pin(request, await self.get_response(request))
+
+    def pin(self, request, response):
+        if request.method in self.SAFE_METHODS or response.status_code >= 400:
+            return response
+        config = routers.get_config()
+        if config["ALIASES"]:
+            response.set_cookie(
+                config["COOKIE_NAME"], "1", max_age=config["STICKY_SECONDS"], httponly=True, samesite="Lax"
+            )
+        return response
 
-        curl_command = " \\\n  ".join(curl_parts)
 
-        # Log it
-        logger.info("[Incoming Request]\n%s", curl_command)
+class RequestLoggingMiddleware(AsyncCapableMiddleware):
+    """
+    Log one structured record per sampled request (see polls/request_logging.py).
+    Headers are redacted and bodies skipped per POLLS_REQUEST_LOGGING; rendering
+    and I/O happen on the queue listener thread.
+    """
 
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        record = self.start(request)
         response = self.get_response(request)
-
-        # Log response info too
+        return self.finish(record, response)
+
+    async def __acall__(self, request):
+        record = self.start(request)
+        response = await self.get_response(request)
+        return self.finish(record, response)
+
+    def start(self, request):
+        """Capture the request if it is sampled; None otherwise."""
+        config = get_logging_config()
+        if not logger.isEnabledFor(logging.INFO) or random.random() >= config["SAMPLE_RATE"]:
+            return None
+        record = capture_request(request, config)
+        record["start"] = time.perf_counter()
+        return record
+
+    def finish(self, record, response):
+        if record is None:
+            return response
+        record["status"] = response.status_code
+        record["duration_ms"] = round((time.perf_counter() - record.pop("start")) * 1000, 2)
         logger.info(
-            "[Response] %s %s -> %s", request.method, request.path, response.status_code
+            "[Request] %s %s -> %s (%.2fms)",
+            record["method"], record["path"], record["status"], record["duration_ms"],
+            extra={"http": record},
         )
+        return response
+
+
+class InstrumentationMiddleware(AsyncCapableMiddleware):
+    """
+    Collect query count, DB time and slowest statements per request (see
+    polls/instrumentation.py): Server-Timing header, per-route histograms
+    for /api/metrics/, and a log line for slow requests.
+    """
 
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        config, stats, token, start = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            instrumentation.end_request(token)
+        return self.finish(request, response, config, stats, start)
+
+    async def __acall__(self, request):
+        config, stats, token, start = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            instrumentation.end_request(token)
+        return self.finish(request, response, config, stats, start)
+
+    def start(self):
+        config = instrumentation.get_config()
+        if not config["ENABLED"]:
+            return config, None, None, None
+        stats, token = instrumentation.start_request(config["SLOWEST"])
+        return config, stats, token, time.perf_counter()
+
+    def finish(self, request, response, config, stats, start):
+        if stats is None:
+            return response
+        total = time.perf_counter() - start
+        if config["SERVER_TIMING"]:
+            response["Server-Timing"] = instrumentation.server_timing(stats, total)
+
+        route = instrumentation.route_of(request)
+        instrumentation.metrics.observe(
+            route, request.method, response.status_code, total, stats.db_time, stats.queries, config
+        )
+        if total * 1000 >= config["SLOW_REQUEST_MS"]:
+            slowest = [{"ms": round(d * 1000, 2), "sql": sql[:500]} for d, sql in stats.slowest()]
+            instrumentation.logger.warning(
+                "[Slow request] %s %s took %.1fms (%d queries, %.1fms in db)%s",
+                request.method, route, total * 1000, stats.queries, stats.db_time * 1000,
+                "".join(f"\n  {q['ms']}ms {q['sql']}" for q in slowest),
+                extra={"slowest_queries": slowest},
+            )
         return response
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-17 17:49
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0004_vote_polls_vote_user_id_4f723f_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='poll',
+            name='vote_counter_shards',
+            field=models.PositiveSmallIntegerField(default=1, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(64)]),
+        ),
+        migrations.CreateModel(
+            name='OptionVoteShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('count', models.IntegerField(default=0)),
+                ('option', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='counter_shards', to='polls.option')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('option', 'shard'), name='unique_option_shard')],
+            },
+        ),
+    ]
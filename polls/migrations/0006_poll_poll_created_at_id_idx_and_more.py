@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-17 17:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0005_poll_vote_counter_shards_optionvoteshard'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='poll',
+            index=models.Index(fields=['created_at', 'id'], name='poll_created_at_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='poll',
+            index=models.Index(fields=['expiry_date', 'id'], name='poll_expiry_date_id_idx'),
+        ),
+    ]
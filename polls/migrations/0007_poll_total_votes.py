@@ -0,0 +1,42 @@
+# Generated by Django 5.2.6 on 2026-10-17 17:54
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_total_votes(apps, schema_editor):
+    Poll = apps.get_model('polls', 'Poll')
+    Option = apps.get_model('polls', 'Option')
+    OptionVoteShard = apps.get_model('polls', 'OptionVoteShard')
+    option_totals = (
+        Option.objects.filter(poll=OuterRef('pk')).values('poll')
+        .annotate(total=Sum('vote_count')).values('total')
+    )
+    shard_totals = (
+        OptionVoteShard.objects.filter(option__poll=OuterRef('pk')).values('option__poll')
+        .annotate(total=Sum('count')).values('total')
+    )
+    Poll.objects.update(
+        total_votes=Coalesce(Subquery(option_totals), Value(0)) + Coalesce(Subquery(shard_totals), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0006_poll_poll_created_at_id_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='poll',
+            name='total_votes',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_total_votes, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='poll',
+            index=models.Index(fields=['total_votes', 'id'], name='poll_total_votes_id_idx'),
+        ),
+    ]
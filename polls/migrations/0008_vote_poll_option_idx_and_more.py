@@ -0,0 +1,46 @@
+# Generated by Django 5.2.6 on 2026-10-17 18:15
+
+from django.db import migrations, models
+
+USERNAME_TRGM_INDEX = 'polls_user_username_upper_trgm'
+
+
+def create_username_trigram_index(apps, schema_editor):
+    # PollFilter's created_by (username icontains) compiles to UPPER(username) LIKE UPPER('%...%');
+    # a trigram GIN index on that expression serves it. PostgreSQL only.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    table = schema_editor.quote_name(apps.get_model('polls', 'User')._meta.db_table)
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {USERNAME_TRGM_INDEX} ON {table} USING gin (UPPER("username") gin_trgm_ops)'
+    )
+
+
+def drop_username_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {USERNAME_TRGM_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0007_poll_total_votes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='vote',
+            name='polls_vote_user_id_4f723f_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='vote',
+            name='polls_vote_poll_id_cfe401_idx',
+        ),
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(fields=['poll', 'option'], name='vote_poll_option_idx'),
+        ),
+        migrations.RunPython(create_username_trigram_index, drop_username_trigram_index),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.6 on 2026-10-17 18:27
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def backfill_vote_events(apps, schema_editor):
+    # one counted event per existing vote (already in the counters), so the
+    # log can rebuild tallies and history from the start
+    qn = schema_editor.quote_name
+    event = qn(apps.get_model('polls', 'VoteEvent')._meta.db_table)
+    vote = qn(apps.get_model('polls', 'Vote')._meta.db_table)
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {event} (poll_id, option_id, amount, counted, created_at) '
+            f'SELECT poll_id, option_id, 1, %s, created_at FROM {vote} ORDER BY id',
+            [True],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0008_vote_poll_option_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AggregationCheckpoint',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('position', models.BigIntegerField(default=0)),
+                ('waiting_since', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VoteEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('amount', models.IntegerField(default=1)),
+                ('counted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('option', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vote_events', to='polls.option')),
+                ('poll', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vote_events', to='polls.poll')),
+            ],
+        ),
+        migrations.RunPython(backfill_vote_events, migrations.RunPython.noop),
+    ]
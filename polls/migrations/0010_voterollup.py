@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-17 18:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0009_voteevent_aggregationcheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoteRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.CharField(choices=[('minute', 'Minute'), ('hour', 'Hour'), ('day', 'Day')], max_length=6)),
+                ('start', models.DateTimeField()),
+                ('votes', models.IntegerField(default=0)),
+                ('option', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='vote_rollups', to='polls.option')),
+                ('poll', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='vote_rollups', to='polls.poll')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['poll', 'bucket', 'start'], name='rollup_poll_bucket_start_idx')],
+                'constraints': [models.UniqueConstraint(fields=('option', 'bucket', 'start'), name='unique_option_rollup')],
+            },
+        ),
+    ]
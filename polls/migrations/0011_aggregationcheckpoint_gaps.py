@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-17 19:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0010_voterollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aggregationcheckpoint',
+            name='gaps',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
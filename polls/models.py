@@ -1,7 +1,10 @@
 # polls/models.py
 
-from django.db import models
+from django.db import IntegrityError, connections, models, transaction
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Now
 from django.contrib.auth.models import AbstractUser
+from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 
 
@@ -10,6 +13,15 @@ class User(AbstractUser):
     pass
 
 
+class PollQuerySet(models.QuerySet):
+    def active(self):
+        """Polls still open for voting, evaluated in SQL (same rule as Poll.is_active)."""
+        return self.filter(models.Q(expiry_date__isnull=True) | models.Q(expiry_date__gt=Now()))
+
+    def expired(self):
+        return self.filter(expiry_date__lte=Now())
+
+
 class Poll(models.Model):
     """Poll model with expiry date and creator."""
     title = models.CharField(max_length=255)
@@ -17,6 +29,23 @@ class Poll(models.Model):
     expiry_date = models.DateTimeField(null=True, blank=True)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name="polls", default=1)
     created_at = models.DateTimeField(auto_now_add=True)
+    # number of counter rows each option's votes are spread over (see OptionVoteShard)
+    vote_counter_shards = models.PositiveSmallIntegerField(
+        default=1, validators=[MinValueValidator(1), MaxValueValidator(64)]
+    )
+    # denormalized sum of option votes, maintained on write (see counters.count_votes)
+    total_votes = models.IntegerField(default=0)
+
+    objects = PollQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["total_votes", "id"], name="poll_total_votes_id_idx"),
+            # keyset pagination: ordering key + id tie-breaker; the leading
+            # column also serves active()/expiry and created_at range filters
+            models.Index(fields=["created_at", "id"], name="poll_created_at_id_idx"),
+            models.Index(fields=["expiry_date", "id"], name="poll_expiry_date_id_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -27,14 +56,84 @@ class Poll(models.Model):
         return self.expiry_date is None or self.expiry_date > timezone.now()
 
 
+class OptionQuerySet(models.QuerySet):
+    def with_vote_totals(self):
+        """Annotate shard_votes so total_vote_count needs no extra query."""
+        shard_votes = (
+            OptionVoteShard.objects.filter(option=OuterRef("pk"))
+            .values("option")
+            .annotate(total=Sum("count"))
+            .values("total")
+        )
+        return self.annotate(shard_votes=Coalesce(Subquery(shard_votes), Value(0)))
+
+
 class Option(models.Model):
     """Options for each poll."""
     poll = models.ForeignKey(Poll, on_delete=models.CASCADE, related_name="options")
     text = models.CharField(max_length=255)
+    # folded count; live increments land in OptionVoteShard until recompute_vote_counts folds them
     vote_count = models.IntegerField(default=0)
 
+    objects = OptionQuerySet.as_manager()
+
     def __str__(self):
-        return f"{self.text} ({self.vote_count} votes)"
+        return f"{self.text} ({self.total_vote_count} votes)"
+
+    @property
+    def total_vote_count(self):
+        """Folded vote_count plus the sum of this option's counter shards."""
+        shard_votes = getattr(self, "shard_votes", None)
+        if shard_votes is None:
+            shard_votes = self.counter_shards.aggregate(total=Sum("count"))["total"] or 0
+        return self.vote_count + shard_votes
+
+
+class OptionVoteShard(models.Model):
+    """
+    One of N counter rows for an option. Votes increment a random shard so
+    concurrent voters on a popular option do not queue on a single row lock.
+    """
+    option = models.ForeignKey(Option, on_delete=models.CASCADE, related_name="counter_shards")
+    shard = models.PositiveSmallIntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["option", "shard"], name="unique_option_shard"),
+        ]
+
+    def __str__(self):
+        return f"{self.option_id}[{self.shard}] = {self.count}"
+
+
+class VoteQuerySet(models.QuerySet):
+    def create_once(self, poll_id, option_id, user_id):
+        """
+        Insert a vote unless the user already voted on the poll; True if a row
+        was inserted. The (poll, user) unique constraint decides, so concurrent
+        duplicates cannot both get in: one INSERT ... ON CONFLICT DO NOTHING
+        RETURNING on PostgreSQL and SQLite, an insert in a savepoint elsewhere.
+        """
+        connection = connections[self.db]
+        if connection.vendor not in ("postgresql", "sqlite"):
+            try:
+                with transaction.atomic(using=self.db):
+                    self.create(poll_id=poll_id, option_id=option_id, user_id=user_id)
+            except IntegrityError:
+                return False
+            return True
+
+        qn = connection.ops.quote_name
+        columns = ", ".join(qn(c) for c in ("poll_id", "option_id", "user_id", "created_at"))
+        created_at = self.model._meta.get_field("created_at").get_db_prep_save(timezone.now(), connection)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {qn(self.model._meta.db_table)} ({columns}) VALUES (%s, %s, %s, %s) "
+                f"ON CONFLICT ({qn('poll_id')}, {qn('user_id')}) DO NOTHING RETURNING {qn('id')}",
+                [poll_id, option_id, user_id, created_at],
+            )
+            return cursor.fetchone() is not None
 
 
 class Vote(models.Model):
@@ -44,9 +143,72 @@ class Vote(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="votes")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = VoteQuerySet.as_manager()
+
     class Meta:
         unique_together = ("poll", "user")  # prevent duplicate votes
+        # (poll, user) lookups use the unique constraint's index and user_id has
+        # its foreign key index; per-option counts and exports scan by poll
         indexes = [
-            models.Index(fields=["user"]),
-            models.Index(fields=["poll", "user"]),
+            models.Index(fields=["poll", "option"], name="vote_poll_option_idx"),
         ]
+
+
+class VoteEvent(models.Model):
+    """
+    Append-only log of counted votes: ``amount`` votes for ``option``, in id
+    order (see polls/vote_events.py). ``counted`` events were added to the
+    option counters when written ("sharded" mode); the others are folded in
+    by the aggregator ("event_log" mode).
+    """
+    id = models.BigAutoField(primary_key=True)
+    poll = models.ForeignKey(Poll, on_delete=models.CASCADE, related_name="vote_events")
+    option = models.ForeignKey(Option, on_delete=models.CASCADE, related_name="vote_events")
+    amount = models.IntegerField(default=1)
+    counted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"#{self.pk} option {self.option_id} +{self.amount}"
+
+
+class AggregationCheckpoint(models.Model):
+    """High-water mark of an aggregator: the last VoteEvent id it has folded."""
+    name = models.CharField(max_length=50, primary_key=True)
+    position = models.BigIntegerField(default=0)
+    # since when the aggregator has been waiting at a gap in the event ids
+    waiting_since = models.DateTimeField(null=True, blank=True)
+    # ids skipped after waiting, still folded if they commit: [[first, last, skipped at (ISO)], ...]
+    gaps = models.JSONField(default=list, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.position}"
+
+
+class VoteRollup(models.Model):
+    """
+    Votes for an option within one minute, hour or day (UTC), folded in from
+    the vote event log by the aggregator (see polls/vote_events.py).
+    """
+    MINUTE, HOUR, DAY = "minute", "hour", "day"
+    BUCKETS = [(MINUTE, "Minute"), (HOUR, "Hour"), (DAY, "Day")]
+
+    # both lookups are covered by the index and constraint below
+    poll = models.ForeignKey(Poll, on_delete=models.CASCADE, related_name="vote_rollups", db_index=False)
+    option = models.ForeignKey(Option, on_delete=models.CASCADE, related_name="vote_rollups", db_index=False)
+    bucket = models.CharField(max_length=6, choices=BUCKETS)
+    start = models.DateTimeField()
+    votes = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["option", "bucket", "start"], name="unique_option_rollup"),
+        ]
+        indexes = [
+            # the timeline of a poll: one range scan per bucket size
+            models.Index(fields=["poll", "bucket", "start"], name="rollup_poll_bucket_start_idx"),
+        ]
+
+    def __str__(self):
+        return f"option {self.option_id} {self.bucket} {self.start:%Y-%m-%d %H:%M}: {self.votes}"
@@ -0,0 +1,198 @@
+# polls/pagination.py
+"""
+Keyset (cursor) pagination for the poll list.
+
+``PollPagination`` keeps the default page-number behaviour and switches to
+``KeysetPagination`` when the request carries a ``cursor`` parameter (use an
+empty ``?cursor=`` for the first page) or when ``POLLS_LIST_PAGINATION`` is
+``"cursor"``.
+
+The keyset follows whatever ordering ``OrderingFilter`` applied, with ``id``
+appended as the tie-breaker, and seeks with
+``WHERE (a, b, id) > (cursor values)`` expanded into OR'ed comparisons. The
+OR alone gives the planner no range on the leading key, so a redundant
+``a >= cursor a`` (``<=`` when descending) is ANDed with it. Each page is
+then a bounded index range scan, however deep it is, and no ``COUNT(*)`` is
+run. NULLs sort as the largest value (PostgreSQL's default), so nullable
+keys such as ``expiry_date`` page correctly in both directions.
+"""
+import base64
+import json
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.model = queryset.model
+        self.base_url = request.build_absolute_uri()
+        self.keys = self.get_keys(queryset)
+        position, reverse = self.decode_cursor(request)
+
+        keys = [(name, not desc) for name, desc in self.keys] if reverse else self.keys
+        queryset = queryset.order_by(*[self.order_expression(name, desc) for name, desc in keys])
+        if position is not None:
+            queryset = queryset.filter(self.after(keys, position))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        self.next_position = self.previous_position = None
+        if results:
+            if has_more or reverse:
+                self.next_position = self.position_of(results[-1])
+            if (has_more and reverse) or (position is not None and not reverse):
+                self.previous_position = self.position_of(results[0])
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.encode_cursor(self.next_position, reverse=False),
+            "previous": self.encode_cursor(self.previous_position, reverse=True),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    # ---- keys -------------------------------------------------------------
+    def get_keys(self, queryset):
+        """[(name, descending)] from the queryset ordering, ending with id."""
+        keys = []
+        for term in queryset.query.order_by or queryset.model._meta.ordering or ():
+            if not isinstance(term, str):
+                raise NotFound("Cursor pagination needs field-name ordering.")
+            name = term.lstrip("-")
+            keys.append(("id" if name == "pk" else name, term.startswith("-")))
+        if not any(name == "id" for name, _ in keys):
+            keys.append(("id", keys[-1][1] if keys else False))
+        return keys
+
+    def is_nullable(self, name):
+        try:
+            return self.model._meta.get_field(name).null
+        except FieldDoesNotExist:
+            return False
+
+    def order_expression(self, name, desc):
+        if not self.is_nullable(name):
+            return f"-{name}" if desc else name
+        # NULLs sort as the largest value in both directions
+        return F(name).desc(nulls_first=True) if desc else F(name).asc(nulls_last=True)
+
+    def after(self, keys, position):
+        """Q matching rows strictly after ``position`` in the given key order."""
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (name, desc), value in zip(keys, position):
+            if value is None:
+                step = Q(**{f"{name}__isnull": False}) if desc else None
+                same = Q(**{f"{name}__isnull": True})
+            else:
+                step = Q(**{f"{name}__lt" if desc else f"{name}__gt": value})
+                if not desc and self.is_nullable(name):
+                    step |= Q(**{f"{name}__isnull": True})
+                same = Q(**{name: value})
+            if step is not None:
+                condition |= equal & step
+            equal &= same
+        bound = self.leading_bound(*keys[0], position[0])
+        return condition & bound if bound is not None else condition
+
+    def leading_bound(self, name, desc, value):
+        """Redundant range on the first key that an index can seek on, if one exists."""
+        if value is None:
+            return None
+        if desc:
+            # NULLs come first when descending, so every later row is <= value
+            return Q(**{f"{name}__lte": value})
+        if self.is_nullable(name):
+            # later rows include the NULLs: no plain range covers them
+            return None
+        return Q(**{f"{name}__gte": value})
+
+    def position_of(self, obj):
+        # rows may be model instances or values() dicts (fast read path)
+        if isinstance(obj, dict):
+            return [obj[name] for name, _ in self.keys]
+        return [getattr(obj, name) for name, _ in self.keys]
+
+    # ---- cursor encoding ----------------------------------------------------
+    def encode_cursor(self, position, reverse):
+        if position is None:
+            return None
+        payload = {
+            "k": [f"-{name}" if desc else name for name, desc in self.keys],
+            "p": [v.isoformat() if hasattr(v, "isoformat") else v for v in position],
+            "r": reverse,
+        }
+        token = base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+            keys = [f"-{name}" if desc else name for name, desc in self.keys]
+            if payload["k"] != keys or len(payload["p"]) != len(keys):
+                raise ValueError("cursor was issued for a different ordering")
+            position = [self.parse_value(name, value) for (name, _), value in zip(self.keys, payload["p"])]
+            return position, bool(payload["r"])
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def parse_value(self, name, value):
+        if value is None:
+            return None
+        try:
+            field = self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return value
+        return field.to_python(value)
+
+
+class PollPagination(PageNumberPagination):
+    """Page-number pagination that hands over to keyset pagination on request."""
+    keyset_class = KeysetPagination
+
+    def use_keyset(self, request):
+        if KeysetPagination.cursor_query_param in request.query_params:
+            return True
+        default = getattr(settings, "POLLS_LIST_PAGINATION", "page")
+        return default == "cursor" and self.page_query_param not in request.query_params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = self.keyset_class() if self.use_keyset(request) else None
+        if self.keyset is not None:
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
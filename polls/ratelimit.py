@@ -0,0 +1,141 @@
+# polls/ratelimit.py
+"""
+Pluggable rate limiters.
+
+Limits are configured per scope in ``POLLS_RATE_LIMITS``::
+
+    POLLS_RATE_LIMITS = {
+        "poll_create": {
+            "CLASS": "polls.ratelimit.FixedWindowLimiter",
+            "RATE": "5/day",
+            "OPTIONS": {"cache_alias": "default"},
+        },
+    }
+
+A limiter only needs ``consume(ident, amount=1) -> bool``. Checks never touch
+the database:
+
+- ``FixedWindowLimiter`` counts in Django's cache with ``add`` + ``incr``,
+  so it needs Redis or Memcached (see polls/caching.py). On other backends
+  workers count on their own or lose increments, and the window key's expiry
+  is reset on every ``incr``; ``check_rate_limit_caches`` refuses them at
+  startup.
+- ``TokenBucketLimiter`` keeps buckets in process memory; limits are per
+  worker process. Buckets that have refilled are dropped.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .caching import counts_atomically
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """'5/day' -> (5, 86400). Same format as DRF throttle rates."""
+    num, period = rate.split("/")
+    return int(num), PERIODS[period[0]]
+
+
+class FixedWindowLimiter:
+    """At most ``limit`` units per calendar window, counted in the cache."""
+
+    def __init__(self, scope, rate, cache_alias="default"):
+        self.scope = scope
+        self.limit, self.period = parse_rate(rate)
+        self.cache = caches[cache_alias]
+
+    def consume(self, ident, amount=1):
+        window = int(time.time() // self.period)
+        key = f"polls:ratelimit:{self.scope}:{ident}:{window}"
+        self.cache.add(key, 0, timeout=self.period)
+        count = self.cache.incr(key, amount)
+        if count > self.limit:
+            # give back what this request took so rejected attempts don't count
+            self.cache.decr(key, amount)
+            return False
+        return True
+
+
+class TokenBucketLimiter:
+    """Bucket of ``limit`` tokens refilled evenly over the period, per process."""
+    # seconds between sweeps for full buckets
+    sweep_interval = 60
+
+    def __init__(self, scope, rate):
+        self.scope = scope
+        self.limit, period = parse_rate(rate)
+        self.refill_per_second = self.limit / period
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._next_sweep = time.monotonic() + self.sweep_interval
+
+    def refilled(self, tokens, last, now):
+        return min(self.limit, tokens + (now - last) * self.refill_per_second)
+
+    def consume(self, ident, amount=1):
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._next_sweep:
+                self.sweep(now)
+            tokens, last = self._buckets.get(ident, (self.limit, now))
+            tokens = self.refilled(tokens, last, now)
+            if tokens < amount:
+                self._buckets[ident] = (tokens, now)
+                return False
+            self._buckets[ident] = (tokens - amount, now)
+            return True
+
+    def sweep(self, now):
+        # a full bucket behaves exactly like a missing one
+        self._buckets = {
+            ident: bucket for ident, bucket in self._buckets.items()
+            if self.refilled(*bucket, now) < self.limit
+        }
+        self._next_sweep = now + self.sweep_interval
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(scope):
+    with _limiters_lock:
+        if scope not in _limiters:
+            config = settings.POLLS_RATE_LIMITS[scope]
+            limiter_class = import_string(config["CLASS"])
+            _limiters[scope] = limiter_class(scope, config["RATE"], **config.get("OPTIONS", {}))
+        return _limiters[scope]
+
+
+@checks.register()
+def check_rate_limit_caches(app_configs, **kwargs):
+    """Cache-backed limiters need a cache with an atomic incr shared by all workers."""
+    errors = []
+    for scope, config in getattr(settings, "POLLS_RATE_LIMITS", {}).items():
+        if not issubclass(import_string(config["CLASS"]), FixedWindowLimiter):
+            continue
+        alias = config.get("OPTIONS", {}).get("cache_alias", "default")
+        cache = caches[alias]
+        if not counts_atomically(cache):
+            errors.append(checks.Error(
+                f"Rate limit {scope!r} counts in CACHES[{alias!r}], a {type(cache).__name__}, "
+                "whose incr is not atomic across processes and resets the window's expiry.",
+                hint="Configure a Redis or Memcached cache, or use TokenBucketLimiter.",
+                id="polls.E001",
+            ))
+    return errors
+
+
+@receiver(setting_changed)
+def _reset_limiters(setting, **kwargs):
+    if setting == "POLLS_RATE_LIMITS":
+        with _limiters_lock:
+            _limiters.clear()
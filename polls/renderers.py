@@ -0,0 +1,40 @@
+# polls/renderers.py
+"""
+JSON renderer that uses orjson when it is installed.
+
+orjson is in requirements.txt; without it, or whenever the output could
+differ from DRF's ``JSONRenderer`` (indented, ASCII-only or non-compact JSON),
+rendering falls back to the stock implementation. Types orjson has no
+encoding for and datetimes, which it would write with ``+00:00`` where DRF
+writes ``Z``, go through DRF's encoder. Decimals become floats there, written
+with Python's float repr as DRF does; plain floats keep orjson's, which
+differs only in the exponent of very small values (``1e-7``, not ``1e-07``).
+"""
+import json
+from decimal import Decimal
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def encode_default(obj, encode=encoders.JSONEncoder().default):
+    if isinstance(obj, Decimal):
+        return orjson.Fragment(json.dumps(float(obj)))
+    return encode(obj)
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=encode_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        # same strict-javascript-subset escaping as JSONRenderer
+        return ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
@@ -0,0 +1,310 @@
+# polls/results_cache.py
+"""
+Per-poll results cache.
+
+Entries hold the payload served by ``PollViewSet.results`` and are updated
+in place when votes are counted (``apply_vote``), so a hot poll is computed
+once and then kept current instead of being re-aggregated on every request.
+
+Backends (``POLLS_RESULTS_CACHE["BACKEND"]``):
+
+- ``"local"``: in-process dict with TTL and LRU eviction at ``MAX_ENTRIES``.
+  Votes counted in other processes are only picked up after the TTL.
+- ``"django"``: Django's cache framework. Counts live in separate keys and
+  are bumped with ``cache.incr``, so it needs Redis or Memcached (see
+  polls/caching.py); other backends are refused, at startup by the
+  ``polls.E004`` check. Eviction follows the cache backend's policy.
+
+An entry is computed, then stored. A vote counted in between can be missing
+from it, or counted twice, until the entry expires: keep ``TTL`` short.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .caching import counts_atomically
+from .models import Option, Poll
+
+DEFAULTS = {
+    "BACKEND": "local",
+    "CACHE_ALIAS": "default",
+    "TTL": 30,
+    "MAX_ENTRIES": 1024,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "POLLS_RESULTS_CACHE", {})}
+
+
+def compute_results(poll):
+    """Build a results entry for ``poll`` from its option counters."""
+    options = [
+        {"id": o.id, "text": o.text, "vote_count": o.total_vote_count}
+        for o in Option.objects.filter(poll=poll).with_vote_totals().order_by("id")
+    ]
+    return {
+        "poll_id": poll.id,
+        "title": poll.title,
+        "total_votes": sum(o["vote_count"] for o in options),
+        "options": options,
+        "last_modified": time.time(),
+    }
+
+
+async def acompute_results(poll):
+    """``compute_results`` on the async ORM."""
+    options = [
+        {"id": o.id, "text": o.text, "vote_count": o.total_vote_count}
+        async for o in Option.objects.filter(poll=poll).with_vote_totals().order_by("id")
+    ]
+    return {
+        "poll_id": poll.id,
+        "title": poll.title,
+        "total_votes": sum(o["vote_count"] for o in options),
+        "options": options,
+        "last_modified": time.time(),
+    }
+
+
+def results_payload(entry):
+    """The response body for a results entry (drops cache bookkeeping)."""
+    return {
+        "poll_id": entry["poll_id"],
+        "title": entry["title"],
+        "total_votes": entry["total_votes"],
+        "options": entry["options"],
+    }
+
+
+def etag_for(entry):
+    """Strong ETag derived from the served payload."""
+    body = json.dumps([entry["total_votes"], [(o["id"], o["vote_count"]) for o in entry["options"]], entry["title"]])
+    return '"%s"' % hashlib.md5(body.encode()).hexdigest()
+
+
+class LocalResultsCache:
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, poll_id):
+        with self._lock:
+            item = self._entries.get(poll_id)
+            if item is None:
+                return None
+            expires, entry = item
+            if expires < time.monotonic():
+                del self._entries[poll_id]
+                return None
+            self._entries.move_to_end(poll_id)
+            return {**entry, "options": [dict(o) for o in entry["options"]]}
+
+    async def aget(self, poll_id):
+        # in-memory and lock-protected for microseconds: safe on the event loop
+        return self.get(poll_id)
+
+    async def aset(self, poll_id, entry):
+        self.set(poll_id, entry)
+
+    def set(self, poll_id, entry):
+        with self._lock:
+            self._entries[poll_id] = (time.monotonic() + self.ttl, entry)
+            self._entries.move_to_end(poll_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def apply_vote(self, poll_id, option_id, amount=1):
+        with self._lock:
+            item = self._entries.get(poll_id)
+            if item is None:
+                return
+            entry = item[1]
+            for option in entry["options"]:
+                if option["id"] == option_id:
+                    option["vote_count"] += amount
+                    entry["total_votes"] += amount
+                    entry["last_modified"] = time.time()
+                    return
+            # unknown option: the cached option list is stale
+            del self._entries[poll_id]
+
+    def invalidate(self, poll_id):
+        with self._lock:
+            self._entries.pop(poll_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DjangoResultsCache:
+    """
+    Results cache on Django's cache framework.
+
+    The static part of an entry is stored under one key; each option count
+    and the total are separate integer keys so concurrent votes from any
+    process can ``incr`` them atomically (Redis and Memcached only).
+    """
+    prefix = "polls:results"
+
+    def __init__(self, alias, ttl):
+        self.cache = caches[alias]
+        if not counts_atomically(self.cache):
+            raise ImproperlyConfigured(
+                f"The \"django\" results cache needs Redis or Memcached; "
+                f"CACHES[{alias!r}] is {type(self.cache).__name__}."
+            )
+        self.ttl = ttl
+
+    def _key(self, poll_id, *parts):
+        return ":".join([self.prefix, str(poll_id), *map(str, parts)])
+
+    def _counter_keys(self, poll_id, base):
+        keys = [self._key(poll_id, "total"), self._key(poll_id, "modified")]
+        return keys + [self._key(poll_id, "option", o["id"]) for o in base["options"]]
+
+    def _assemble(self, poll_id, base, keys, values):
+        if len(values) != len(keys):
+            return None
+        return {
+            "poll_id": base["poll_id"],
+            "title": base["title"],
+            "total_votes": values[keys[0]],
+            "options": [
+                {**o, "vote_count": values[self._key(poll_id, "option", o["id"])]}
+                for o in base["options"]
+            ],
+            "last_modified": values[keys[1]],
+        }
+
+    def get(self, poll_id):
+        base = self.cache.get(self._key(poll_id))
+        if base is None:
+            return None
+        keys = self._counter_keys(poll_id, base)
+        return self._assemble(poll_id, base, keys, self.cache.get_many(keys))
+
+    async def aget(self, poll_id):
+        base = await self.cache.aget(self._key(poll_id))
+        if base is None:
+            return None
+        keys = self._counter_keys(poll_id, base)
+        return self._assemble(poll_id, base, keys, await self.cache.aget_many(keys))
+
+    def _split(self, poll_id, entry):
+        base = {
+            "poll_id": entry["poll_id"],
+            "title": entry["title"],
+            "options": [{"id": o["id"], "text": o["text"]} for o in entry["options"]],
+        }
+        values = {
+            self._key(poll_id, "total"): entry["total_votes"],
+            self._key(poll_id, "modified"): entry["last_modified"],
+        }
+        for o in entry["options"]:
+            values[self._key(poll_id, "option", o["id"])] = o["vote_count"]
+        return base, values
+
+    def set(self, poll_id, entry):
+        base, values = self._split(poll_id, entry)
+        self.cache.set_many(values, timeout=self.ttl)
+        # base last, so readers never see it without its counters
+        self.cache.set(self._key(poll_id), base, timeout=self.ttl)
+
+    async def aset(self, poll_id, entry):
+        base, values = self._split(poll_id, entry)
+        await self.cache.aset_many(values, timeout=self.ttl)
+        await self.cache.aset(self._key(poll_id), base, timeout=self.ttl)
+
+    def apply_vote(self, poll_id, option_id, amount=1):
+        try:
+            self.cache.incr(self._key(poll_id, "option", option_id), amount)
+            self.cache.incr(self._key(poll_id, "total"), amount)
+        except ValueError:
+            # entry (or part of it) expired: drop it so the next read recomputes
+            self.invalidate(poll_id)
+            return
+        self.cache.set(self._key(poll_id, "modified"), time.time(), timeout=self.ttl)
+
+    def invalidate(self, poll_id):
+        self.cache.delete(self._key(poll_id))
+
+    def clear(self):
+        # keys expire on their own TTL; nothing global to drop
+        pass
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_results_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            config = get_config()
+            if config["BACKEND"] == "django":
+                _cache = DjangoResultsCache(config["CACHE_ALIAS"], config["TTL"])
+            else:
+                _cache = LocalResultsCache(config["TTL"], config["MAX_ENTRIES"])
+        return _cache
+
+
+@checks.register()
+def check_results_cache(app_configs, **kwargs):
+    """The "django" backend bumps counts with ``cache.incr``."""
+    config = get_config()
+    if config["BACKEND"] != "django":
+        return []
+    cache = caches[config["CACHE_ALIAS"]]
+    if counts_atomically(cache):
+        return []
+    return [checks.Error(
+        f"The results cache counts votes in CACHES[{config['CACHE_ALIAS']!r}], a {type(cache).__name__}, "
+        "whose incr is not atomic across processes and resets the counters' expiry.",
+        hint="Point POLLS_RESULTS_CACHE[\"CACHE_ALIAS\"] at a Redis or Memcached cache, or use BACKEND \"local\".",
+        id="polls.E004",
+    )]
+
+
+@receiver(setting_changed)
+def _reset_cache(setting, **kwargs):
+    global _cache
+    if setting == "POLLS_RESULTS_CACHE":
+        _cache = None
+
+
+def get_results(poll_id):
+    """
+    Return the cached results entry for a poll, computing it on a miss.
+
+    Raises ``Poll.DoesNotExist`` for unknown polls.
+    """
+    cache = get_results_cache()
+    entry = cache.get(poll_id)
+    if entry is None:
+        entry = compute_results(Poll.objects.only("id", "title").get(pk=poll_id))
+        cache.set(poll_id, entry)
+    return entry
+
+
+async def aget_results(poll_id):
+    """``get_results`` for async views: async ORM and async cache calls."""
+    cache = get_results_cache()
+    entry = await cache.aget(poll_id)
+    if entry is None:
+        entry = await acompute_results(await Poll.objects.only("id", "title").aget(pk=poll_id))
+        await cache.aset(poll_id, entry)
+    return entry
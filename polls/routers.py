@@ -0,0 +1,106 @@
+# polls/routers.py
+"""
+Read-replica routing.
+
+``ReplicaRouter`` sends every write to ``default`` (the primary). Reads go to
+the primary as well, except inside ``replica_reads()``, where they go to one
+of ``POLLS_READ_REPLICAS["ALIASES"]``, chosen at random. ``PollViewSet`` opens
+that scope for its GET requests (list, retrieve, results, export), so read
+traffic stops competing with votes on the primary.
+
+Read-your-writes: ``PrimaryPinningMiddleware`` sets a short-lived cookie on
+the response to any successful write (a poll created, a vote cast, ...).
+While the client sends it back, its reads stay on the primary, which covers
+the replication lag. Clients that drop cookies may read slightly stale data
+for up to that lag. The same goes for results-cache misses, which are
+filled from a replica: a fill can miss the latest votes until the entry
+expires (``POLLS_RESULTS_CACHE["TTL"]``).
+
+Replicas are configured in ``settings.DATABASES`` with ``"TEST": {"MIRROR":
+"default"}``, so tests run against the primary alone. Migrations only run
+on the primary; replicas receive the schema through replication.
+"""
+import contextvars
+import random
+from contextlib import contextmanager
+
+from django.conf import settings
+
+DEFAULTS = {
+    # DATABASES aliases of the replicas; empty means all reads use the primary
+    "ALIASES": [],
+    # how long reads stay on the primary after a client's write
+    "STICKY_SECONDS": 5,
+    "COOKIE_NAME": "polls_primary",
+}
+
+PRIMARY = "default"
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "POLLS_READ_REPLICAS", {})}
+
+
+_replica_reads = contextvars.ContextVar("polls_replica_reads", default=False)
+
+
+def pick_replica(aliases):
+    return random.choice(aliases)
+
+
+def start_replica_reads():
+    return _replica_reads.set(True)
+
+
+def end_replica_reads(token):
+    if token is not None:
+        _replica_reads.reset(token)
+
+
+@contextmanager
+def replica_reads():
+    """Route the reads of this block to a replica."""
+    token = start_replica_reads()
+    try:
+        yield
+    finally:
+        end_replica_reads(token)
+
+
+def replica_iterator(iterable):
+    """
+    Iterate ``iterable`` inside ``replica_reads()``. Streaming response bodies
+    run their queries after the view returned, outside the view's scope.
+    """
+    with replica_reads():
+        yield from iterable
+
+
+def is_pinned(request):
+    """True if the client wrote recently and must read from the primary."""
+    return get_config()["COOKIE_NAME"] in request.COOKIES
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        # the database cache table stays on the primary: shared counters must not lag
+        if _replica_reads.get() and model._meta.app_label != "django_cache":
+            aliases = get_config()["ALIASES"]
+            if aliases:
+                return pick_replica(aliases)
+        return None
+
+    def db_for_write(self, model, **hints):
+        # explicit: Django would otherwise save instances where they were read from
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *get_config()["ALIASES"]}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_config()["ALIASES"]:
+            return False
+        return None
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from .models import Poll, Option, Vote
+from django.db import transaction
 from django.db.models import Sum
 from django.utils import timezone
 
@@ -24,37 +25,90 @@ class UserSerializer(serializers.ModelSerializer):
 
 class OptionSerializer(serializers.ModelSerializer):
     """Serializer for poll options with vote count."""
+    # live total (folded vote_count + counter shards)
+    vote_count = serializers.IntegerField(source="total_vote_count", read_only=True)
+
     class Meta:
         model = Option
         fields = ("id", "text", "vote_count")
 
 
+def attach_options(poll, options):
+    """Prime poll.options with freshly created rows so serializing needs no query."""
+    for option in options:
+        option.shard_votes = 0
+    queryset = poll.options.all()
+    queryset._result_cache = list(options)
+    queryset._prefetch_done = True
+    poll._prefetched_objects_cache = {"options": queryset}
+
+
+class PollListSerializer(serializers.ListSerializer):
+    """Create many polls with one INSERT for the polls and one for all their options."""
+
+    def create(self, validated_data):
+        option_texts = [attrs.pop("option_texts", []) for attrs in validated_data]
+        with transaction.atomic():
+            polls = Poll.objects.bulk_create([Poll(**attrs) for attrs in validated_data])
+            options = Option.objects.bulk_create([
+                Option(poll=poll, text=text)
+                for poll, texts in zip(polls, option_texts)
+                for text in texts
+            ])
+        by_poll = {}
+        for option in options:
+            by_poll.setdefault(option.poll_id, []).append(option)
+        for poll in polls:
+            attach_options(poll, by_poll.get(poll.pk, []))
+        return polls
+
+
 class PollSerializer(serializers.ModelSerializer):
     """Serializer for polls with nested options."""
     options = OptionSerializer(many=True, read_only=True)
     created_by = serializers.SerializerMethodField()
     # provide expiry_date as-is (keeps original name) and created_at already exists
-    # total_votes will be provided by queryset annotation
+    # total_votes is the denormalized column maintained when votes are counted
     total_votes = serializers.IntegerField(read_only=True, required=False)
+    # how many counter rows each option's votes are spread over (raise for viral polls)
+    vote_counter_shards = serializers.IntegerField(write_only=True, required=False, min_value=1, max_value=64)
 
     class Meta:
         model = Poll
-        fields = ("id", "title", "description", "expiry_date", "created_by", "created_at", "options", "total_votes")
+        fields = ("id", "title", "description", "expiry_date", "created_by", "created_at", "options", "total_votes", "vote_counter_shards")
         read_only_fields = ("created_by",)
+        list_serializer_class = PollListSerializer
 
     def get_created_by(self, obj):
         if obj.created_by:
             return getattr(obj.created_by, "username", None)
         return None
 
+    def to_internal_value(self, data):
+        # "options" is read as a list of option texts on write, nested objects on read
+        attrs = super().to_internal_value(data)
+        if self.instance is None and hasattr(data, "get"):
+            texts = data.getlist("options") if hasattr(data, "getlist") else data.get("options", [])
+            field = serializers.ListField(child=serializers.CharField(max_length=255))
+            try:
+                attrs["option_texts"] = field.run_validation(texts)
+            except serializers.ValidationError as exc:
+                raise serializers.ValidationError({"options": exc.detail})
+        return attrs
+
     def create(self, validated_data):
-        # Options are created in the view (as before)
-        return super().create(validated_data)
+        # One atomic operation: the poll INSERT plus a single bulk INSERT for its options
+        option_texts = validated_data.pop("option_texts", [])
+        with transaction.atomic():
+            poll = super().create(validated_data)
+            options = Option.objects.bulk_create([Option(poll=poll, text=text) for text in option_texts])
+        attach_options(poll, options)
+        return poll
 
 
 class VoteSerializer(serializers.ModelSerializer):
     """Serializer for votes."""
     class Meta:
         model = Vote
-        fields = ("id", "poll", "option", "user")
-        read_only_fields = ("user",)
+        fields = ("id", "poll", "option", "user", "created_at")
+        read_only_fields = ("user", "created_at")
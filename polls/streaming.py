@@ -0,0 +1,389 @@
+# polls/streaming.py
+"""
+Live poll results over Server-Sent Events.
+
+Watchers of a poll subscribe to a per-poll channel held by the process-wide
+``ResultsHub``. Votes only mark their poll dirty (through the configured
+transport, once the vote's transaction commits); a ticker thread wakes every
+``INTERVAL`` seconds, recomputes each dirty poll that has watchers exactly
+once, diffs it against the previous snapshot and wakes all watchers. A hot
+poll with thousands of watchers therefore costs one aggregation per interval
+per process, however many votes or watchers it has.
+
+Each watcher receives a full ``snapshot`` event on connect (and whenever it
+fell behind by more than one version), then ``delta`` events holding only the
+options whose counts changed.
+
+Streams are only served by the async view under ASGI: a sync worker would
+be held for the whole stream.
+
+Transports (``POLLS_RESULTS_STREAM["TRANSPORT"]``):
+
+- ``LocalTransport``: in-process; sees votes counted by this process only.
+- ``PostgresNotifyTransport``: ``pg_notify`` on vote, plus a ``LISTEN``
+  thread per process, so every process sees every vote. Watched polls are
+  flagged in a shared cache, so votes on unwatched polls send nothing.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.signals import setting_changed
+from django.db import connections
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .models import Poll
+from .results_cache import compute_results, get_results_cache, results_payload
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "TRANSPORT": "polls.streaming.LocalTransport",
+    "OPTIONS": {},
+    # seconds over which deltas are coalesced (0 disables the ticker thread)
+    "INTERVAL": 1.0,
+    # seconds between keep-alive comments on an idle stream
+    "KEEPALIVE": 15,
+    # seconds before a stream is closed; EventSource clients reconnect
+    "MAX_DURATION": 300,
+    # client reconnect delay sent in the "retry" field, in milliseconds
+    "RETRY_MS": 2000,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "POLLS_RESULTS_STREAM", {})}
+
+
+def diff_results(old, new):
+    """The delta event body turning results entry ``old`` into ``new``."""
+    before = {o["id"]: o["vote_count"] for o in old["options"]}
+    return {
+        "poll_id": new["poll_id"],
+        "total_votes": new["total_votes"],
+        "options": [
+            {"id": o["id"], "vote_count": o["vote_count"]}
+            for o in new["options"]
+            if before.get(o["id"]) != o["vote_count"]
+        ],
+    }
+
+
+def format_event(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+class Channel:
+    """Latest results of one poll plus the watchers waiting on it."""
+
+    def __init__(self, poll_id):
+        self.poll_id = poll_id
+        self.subscribers = 0
+        self.version = 0
+        self.entry = None
+        self.delta = None
+        self.closed = False
+        self.condition = threading.Condition()
+        # (loop, asyncio.Event) pairs of async watchers
+        self.async_waiters = set()
+
+    def publish(self, entry):
+        """Install a new snapshot and wake every watcher; no-op if nothing changed."""
+        with self.condition:
+            if self.entry is not None:
+                delta = diff_results(self.entry, entry)
+                if not delta["options"] and entry["title"] == self.entry["title"]:
+                    return False
+                self.delta = delta
+            self.entry = entry
+            self.version += 1
+            self._wake()
+            return True
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self._wake()
+
+    def _wake(self):
+        self.condition.notify_all()
+        for loop, event in list(self.async_waiters):
+            loop.call_soon_threadsafe(event.set)
+
+    def next_event(self, seen_version):
+        """(version, event text) for a watcher that has seen ``seen_version``, or None."""
+        with self.condition:
+            if self.closed:
+                return self.version, format_event("closed", {"poll_id": self.poll_id})
+            if self.version == seen_version:
+                return None
+            if self.version == seen_version + 1 and self.delta is not None:
+                return self.version, format_event("delta", self.delta, self.version)
+            return self.version, format_event("snapshot", results_payload(self.entry), self.version)
+
+
+class ResultsHub:
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._channels = {}
+        self._dirty = set()
+        self._ticker = None
+
+    def mark_dirty(self, poll_id):
+        with self._lock:
+            if poll_id in self._channels:
+                self._dirty.add(poll_id)
+
+    def tick(self):
+        """Recompute every dirty watched poll once and fan the result out."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            channels = [self._channels[p] for p in dirty if p in self._channels]
+        for channel in channels:
+            self._refresh(channel)
+
+    def _refresh(self, channel):
+        try:
+            entry = compute_results(Poll.objects.only("id", "title").get(pk=channel.poll_id))
+        except Poll.DoesNotExist:
+            channel.close()
+            return
+        # keep the request/response results endpoint just as fresh
+        get_results_cache().set(channel.poll_id, entry)
+        channel.publish(entry)
+
+    def subscribe(self, poll_id):
+        """
+        Register a watcher and return its channel, loading the first snapshot
+        if the poll has no other watchers. Raises ``Poll.DoesNotExist``.
+        """
+        with self._lock:
+            channel = self._channels.get(poll_id)
+            if channel is None:
+                channel = self._channels[poll_id] = Channel(poll_id)
+            channel.subscribers += 1
+        if channel.entry is None:
+            try:
+                self._refresh_initial(channel)
+            except Poll.DoesNotExist:
+                self.unsubscribe(channel)
+                raise
+        self._ensure_ticker()
+        return channel
+
+    def _refresh_initial(self, channel):
+        with channel.condition:
+            if channel.entry is None:
+                poll = Poll.objects.only("id", "title").get(pk=channel.poll_id)
+                channel.publish(compute_results(poll))
+
+    def unsubscribe(self, channel):
+        with self._lock:
+            channel.subscribers -= 1
+            if channel.subscribers <= 0 and self._channels.get(channel.poll_id) is channel:
+                del self._channels[channel.poll_id]
+                self._dirty.discard(channel.poll_id)
+
+    def _ensure_ticker(self):
+        if self.interval <= 0:
+            return
+        with self._lock:
+            if self._ticker is None:
+                self._ticker = threading.Thread(target=self._run, name="results-stream-ticker", daemon=True)
+                self._ticker.start()
+
+    def _run(self):
+        from django.db import connection
+
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("Results stream tick failed")
+            finally:
+                connection.close_if_unusable_or_obsolete()
+
+
+class LocalTransport:
+    """Marks polls dirty in this process only."""
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    def start(self):
+        pass
+
+    def watch(self, poll_id, timeout):
+        pass
+
+    def publish(self, poll_id):
+        self.hub.mark_dirty(poll_id)
+
+
+class PostgresNotifyTransport:
+    """
+    Cross-process transport over Postgres ``LISTEN``/``NOTIFY``.
+
+    ``publish`` sends ``pg_notify(channel, poll_id)``; a listener thread
+    holds one extra connection per process and marks notified polls dirty.
+    Watchers flag their poll in ``CACHES[cache_alias]`` for the length of a
+    stream, and ``publish`` skips polls nobody flagged. A process-local cache
+    cannot see other processes' watchers, so then every vote is notified.
+    """
+
+    def __init__(self, hub, channel="polls_results", using="default", reconnect_delay=5, cache_alias="default"):
+        self.hub = hub
+        self.channel = channel
+        self.using = using
+        self.reconnect_delay = reconnect_delay
+        self.cache = caches[cache_alias]
+        self.shared_cache = not isinstance(self.cache, (LocMemCache, DummyCache))
+        self._listener = None
+
+    def start(self):
+        if self._listener is None:
+            self._listener = threading.Thread(target=self._listen_forever, name="results-stream-listener", daemon=True)
+            self._listener.start()
+
+    def watched_key(self, poll_id):
+        return f"polls:results-stream:watched:{poll_id}"
+
+    def watch(self, poll_id, timeout):
+        # every stream ends within MAX_DURATION and reconnecting flags the poll again
+        self.cache.set(self.watched_key(poll_id), 1, timeout=timeout)
+
+    def publish(self, poll_id):
+        if self.shared_cache and not self.cache.get(self.watched_key(poll_id)):
+            return
+        with connections[self.using].cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.channel, str(poll_id)])
+
+    def _listen_forever(self):
+        while True:
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("Results stream listener lost its connection")
+            time.sleep(self.reconnect_delay)
+
+    def _listen(self):
+        wrapper = connections[self.using]
+        conn = wrapper.get_new_connection(wrapper.get_connection_params())
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            if hasattr(conn, "poll"):
+                # psycopg2
+                while True:
+                    if select.select([conn], [], [], self.reconnect_delay) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self._handle(conn.notifies.pop(0).payload)
+            else:
+                # psycopg 3
+                while True:
+                    for notify in conn.notifies(timeout=self.reconnect_delay):
+                        self._handle(notify.payload)
+        finally:
+            conn.close()
+
+    def _handle(self, payload):
+        try:
+            self.hub.mark_dirty(int(payload))
+        except ValueError:
+            logger.warning("Ignoring results stream notification %r", payload)
+
+
+_hub = None
+_transport = None
+_hub_lock = threading.Lock()
+
+
+def get_hub():
+    global _hub, _transport
+    with _hub_lock:
+        if _hub is None:
+            config = get_config()
+            _hub = ResultsHub(config["INTERVAL"])
+            _transport = import_string(config["TRANSPORT"])(_hub, **config["OPTIONS"])
+            _transport.start()
+        return _hub
+
+
+def get_transport():
+    get_hub()
+    return _transport
+
+
+@receiver(setting_changed)
+def _reset_hub(setting, **kwargs):
+    global _hub, _transport
+    if setting == "POLLS_RESULTS_STREAM":
+        with _hub_lock:
+            _hub = _transport = None
+
+
+def results_changed(poll_id):
+    """Tell result watchers (in any process, transport permitting) that a poll changed."""
+    get_transport().publish(poll_id)
+
+
+def watch(poll_id, config):
+    """Subscribe a watcher to ``poll_id``; raises ``Poll.DoesNotExist``."""
+    channel = get_hub().subscribe(poll_id)
+    get_transport().watch(poll_id, config["MAX_DURATION"])
+    return channel
+
+
+async def astream_results(poll_id, config):
+    """SSE body for a poll's watcher; watchers share the event loop, not threads."""
+    hub = get_hub()
+    yield f"retry: {config['RETRY_MS']}\n\n"
+    try:
+        channel = await sync_to_async(watch)(poll_id, config)
+    except Poll.DoesNotExist:
+        yield format_event("closed", {"poll_id": poll_id})
+        return
+    waiter = (asyncio.get_running_loop(), asyncio.Event())
+    channel.async_waiters.add(waiter)
+    deadline = time.monotonic() + config["MAX_DURATION"]
+    seen = 0
+    try:
+        while time.monotonic() < deadline:
+            event = channel.next_event(seen)
+            if event is None:
+                waiter[1].clear()
+                # re-check after clearing so a wake-up between the two is not lost
+                event = channel.next_event(seen)
+            if event is None:
+                try:
+                    timeout = min(config["KEEPALIVE"], deadline - time.monotonic())
+                    await asyncio.wait_for(waiter[1].wait(), timeout)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                continue
+            seen, text = event
+            yield text
+            if channel.closed:
+                return
+    finally:
+        channel.async_waiters.discard(waiter)
+        hub.unsubscribe(channel)
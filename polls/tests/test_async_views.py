@@ -0,0 +1,69 @@
+# polls/tests/test_async_views.py
+from datetime import timedelta
+
+from asgiref.sync import iscoroutinefunction
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from polls.authentication import get_user_cache
+from polls.middleware import PollsMiddleware, RequestLoggingMiddleware
+from polls.models import Option, Poll, Vote
+from polls.results_cache import get_results_cache
+
+User = get_user_model()
+
+
+class AsyncEndpointsTest(TestCase):
+    def setUp(self):
+        get_results_cache().clear()
+        get_user_cache().clear()
+        self.user = User.objects.create(username="async_user")
+        self.poll = Poll.objects.create(
+            title="Async poll",
+            expiry_date=timezone.now() + timedelta(days=1),
+            created_by=self.user,
+        )
+        self.option = Option.objects.create(poll=self.poll, text="Yes", vote_count=1)
+        self.auth = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+
+    async def test_async_vote(self):
+        """✅ Tests the async vote endpoint records one vote and rejects duplicates"""
+        url = reverse("vote-async")
+        payload = {"poll": self.poll.id, "option": self.option.id}
+        response = await self.async_client.post(url, payload, content_type="application/json", headers=self.auth)
+        self.assertEqual(response.status_code, 201)
+        response = await self.async_client.post(url, payload, content_type="application/json", headers=self.auth)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(await Vote.objects.acount(), 1)
+
+    async def test_async_vote_requires_token(self):
+        """✅ Tests the async vote endpoint rejects unauthenticated requests"""
+        payload = {"poll": self.poll.id, "option": self.option.id}
+        response = await self.async_client.post(reverse("vote-async"), payload, content_type="application/json")
+        self.assertEqual(response.status_code, 401)
+
+    async def test_async_results_match_sync_results(self):
+        """✅ Tests async results return the same body and ETag as the DRF endpoint"""
+        sync_response = await self.async_client.get(reverse("poll-results", args=[self.poll.id]))
+        response = await self.async_client.get(reverse("poll-results-async", args=[self.poll.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, sync_response.content)
+        self.assertEqual(response["ETag"], sync_response["ETag"])
+
+        response = await self.async_client.get(
+            reverse("poll-results-async", args=[self.poll.id]), headers={"If-None-Match": response["ETag"]}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_middleware_is_async_capable(self):
+        """✅ Tests both custom middlewares mark themselves as coroutines for async stacks"""
+        async def get_response(request):
+            return None
+
+        for middleware in (PollsMiddleware, RequestLoggingMiddleware):
+            self.assertTrue(iscoroutinefunction(middleware(get_response)))
+            self.assertFalse(iscoroutinefunction(middleware(lambda request: None)))
@@ -0,0 +1,65 @@
+# polls/tests/test_authentication.py
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from polls.authentication import get_user_cache
+from polls.models import Option, Poll
+
+User = get_user_model()
+
+
+class CachedJWTAuthenticationTest(APITestCase):
+    def setUp(self):
+        get_user_cache().clear()
+        self.user = User.objects.create(username="cached_voter")
+        self.poll = Poll.objects.create(
+            title="Auth poll",
+            expiry_date=timezone.now() + timedelta(days=1),
+            created_by=self.user,
+        )
+        self.option = Option.objects.create(poll=self.poll, text="Yes")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def vote(self, poll=None):
+        payload = {"poll": (poll or self.poll).id, "option": self.option.id}
+        return self.client.post(reverse("vote"), payload, format="json")
+
+    def user_queries(self, captured):
+        return [q["sql"] for q in captured.captured_queries if User._meta.db_table in q["sql"]]
+
+    def test_user_is_loaded_once(self):
+        """✅ Tests the vote path resolves the token's user from the cache after the first request"""
+        with CaptureQueriesContext(connection) as first:
+            self.assertEqual(self.vote().status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(self.user_queries(first)), 1)
+
+        with CaptureQueriesContext(connection) as second:
+            self.assertEqual(self.vote().status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.user_queries(second), [])
+
+    def test_saving_user_invalidates_cache(self):
+        """✅ Tests a deactivated user is rejected right away, not after the cache TTL"""
+        self.vote()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.vote().status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_results_run_no_authenticator(self):
+        """✅ Tests the public results endpoint skips authentication, even with bad credentials"""
+        self.client.credentials(HTTP_AUTHORIZATION="Basic bm9ib2R5Ondyb25n")
+        response = self.client.get(reverse("poll-results", args=[self.poll.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(POLLS_AUTHENTICATION={"VIEWS": {"vote": ["rest_framework.authentication.BasicAuthentication"]}})
+    def test_authenticators_are_configurable_per_view(self):
+        """✅ Tests POLLS_AUTHENTICATION["VIEWS"] replaces a view's authenticators"""
+        self.assertEqual(self.vote().status_code, status.HTTP_401_UNAUTHORIZED)
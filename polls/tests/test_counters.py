@@ -0,0 +1,103 @@
+# polls/tests/test_counters.py
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from polls.counters import count_votes, increment_option
+from polls.models import Option, OptionVoteShard, Poll, Vote
+
+User = get_user_model()
+
+
+class ShardedCounterTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="shard_user", password="password123")
+        self.poll = Poll.objects.create(
+            title="Viral poll",
+            expiry_date=timezone.now() + timedelta(days=1),
+            created_by=self.user,
+            vote_counter_shards=8,
+        )
+        self.option = Option.objects.create(poll=self.poll, text="Yes", vote_count=2)
+
+    def test_shards_are_summed_on_read(self):
+        """✅ Tests that increments spread over shards add up in vote_count and total_votes"""
+        for _ in range(20):
+            count_votes(self.poll.pk, self.option.pk, shards=self.poll.vote_counter_shards)
+
+        self.assertLessEqual(OptionVoteShard.objects.filter(option=self.option).count(), 8)
+        self.assertEqual(Option.objects.get(pk=self.option.pk).total_vote_count, 22)
+
+        response = self.client.get(reverse("poll-detail", args=[self.poll.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["options"][0]["vote_count"], 22)
+        self.assertEqual(response.data["total_votes"], 20)  # the seeded vote_count=2 never went through count_votes
+
+    def test_cast_vote_increments_a_shard(self):
+        """✅ Tests that voting writes to a counter shard instead of Option.vote_count"""
+        self.client.force_authenticate(self.user)
+        response = self.client.post(reverse("vote"), {"poll": self.poll.id, "option": self.option.id}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        self.option.refresh_from_db()
+        self.poll.refresh_from_db()
+        self.assertEqual(self.option.vote_count, 2)
+        self.assertEqual(self.option.total_vote_count, 3)
+        self.assertEqual(self.poll.total_votes, 1)
+
+    def test_recompute_folds_shards(self):
+        """✅ Tests recompute_vote_counts folds shards into vote_count from real Vote rows"""
+        Vote.objects.create(poll=self.poll, option=self.option, user=self.user)
+        increment_option(self.option.pk, shards=self.poll.vote_counter_shards, amount=5)
+
+        call_command("recompute_vote_counts", stdout=StringIO())
+
+        self.option.refresh_from_db()
+        self.poll.refresh_from_db()
+        self.assertEqual(self.option.vote_count, 1)
+        self.assertEqual(self.poll.total_votes, 1)
+        self.assertFalse(OptionVoteShard.objects.filter(option=self.option).exists())
+
+    def test_recompute_dry_run_and_scope(self):
+        """✅ Tests --dry-run only reports drift and --poll limits the recount to that poll"""
+        other = Poll.objects.create(title="Other poll", created_by=self.user)
+        other_option = Option.objects.create(poll=other, text="Maybe", vote_count=7)
+
+        out = StringIO()
+        call_command("recompute_vote_counts", "--dry-run", stdout=out)
+        self.assertIn("2 of 2 options have drifted", out.getvalue())
+        self.assertEqual(Option.objects.get(pk=self.option.pk).vote_count, 2)
+
+        call_command("recompute_vote_counts", "--poll", str(other.pk), "--chunk-size", "1", stdout=StringIO())
+        self.assertEqual(Option.objects.get(pk=other_option.pk).vote_count, 0)
+        self.assertEqual(Option.objects.get(pk=self.option.pk).vote_count, 2)
+
+    def test_duplicate_vote_is_rejected_by_the_insert(self):
+        """✅ Tests a vote that loses the race to an existing row is rejected without counting it"""
+        other = User.objects.create(username="racer")
+        # as if a concurrent request inserted its vote after our lookup
+        Vote.objects.create(poll=self.poll, option=self.option, user=other)
+        self.assertFalse(Vote.objects.create_once(self.poll.pk, self.option.pk, other.pk))
+
+        self.client.force_authenticate(other)
+        response = self.client.post(reverse("vote"), {"poll": self.poll.id, "option": self.option.id}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Option.objects.get(pk=self.option.pk).total_vote_count, 2)
+        self.assertEqual(Poll.objects.get(pk=self.poll.pk).total_votes, 0)
+
+    def test_vote_round_trips(self):
+        """✅ Tests a successful vote is one lookup, one insert and the two counter updates"""
+        OptionVoteShard.objects.bulk_create(
+            OptionVoteShard(option=self.option, shard=n) for n in range(self.poll.vote_counter_shards)
+        )
+        self.client.force_authenticate(self.user)
+        # lookup, savepoint, insert, shard update, poll total, release (no event: LOG_SHARDED_VOTES is off)
+        with self.assertNumQueries(6):
+            response = self.client.post(reverse("vote"), {"poll": self.poll.id, "option": self.option.id}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
@@ -0,0 +1,49 @@
+# polls/tests/test_db.py
+import io
+
+from django.test import SimpleTestCase, TestCase
+
+from polls.db import copy_from, pool_metrics
+from polls.instrumentation import metrics
+
+
+class Copy:
+    def __init__(self, written):
+        self.written = written
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def write(self, data):
+        self.written.append(data)
+
+
+class Psycopg3Cursor:
+    """The part of a psycopg 3 cursor COPY uses: no copy_expert, a copy() context."""
+
+    def __init__(self):
+        self.statements, self.written = [], []
+
+    def copy(self, sql):
+        self.statements.append(sql)
+        return Copy(self.written)
+
+
+class CopyFromTest(SimpleTestCase):
+    def test_copy_with_psycopg3_cursor(self):
+        """✅ Tests copy_from streams the source through cursor.copy() when copy_expert is missing"""
+        cursor = Psycopg3Cursor()
+        copy_from(cursor, "COPY t FROM STDIN", io.StringIO("1,2\n" * 10), chunk_size=16)
+        self.assertEqual(cursor.statements, ["COPY t FROM STDIN"])
+        self.assertEqual("".join(cursor.written), "1,2\n" * 10)
+        self.assertEqual(len(cursor.written), 3)
+
+
+class PoolMetricsTest(TestCase):
+    def test_connects_exported(self):
+        """✅ Tests /api/metrics/ includes the database connect counter collected by polls.db"""
+        self.assertIn(pool_metrics, metrics._collectors)
+        self.assertIn('polls_db_connects_total{alias="default"}', metrics.render())
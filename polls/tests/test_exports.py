@@ -0,0 +1,99 @@
+# polls/tests/test_exports.py
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import skipIf, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from polls.models import Option, OptionVoteShard, Poll, Vote
+
+User = get_user_model()
+
+
+class ExportTest(APITestCase):
+    def setUp(self):
+        self.owner = User.objects.create(username="export_owner")
+        self.voters = [User.objects.create(username=f"export_voter{i}") for i in range(3)]
+        self.poll = Poll.objects.create(
+            title="Exported poll",
+            expiry_date=timezone.now() + timedelta(days=1),
+            created_by=self.owner,
+        )
+        self.yes = Option.objects.create(poll=self.poll, text="Yes", vote_count=2)
+        self.no = Option.objects.create(poll=self.poll, text="No", vote_count=0)
+        OptionVoteShard.objects.create(option=self.no, shard=0, count=1)
+        for voter, option in zip(self.voters, [self.yes, self.yes, self.no]):
+            Vote.objects.create(poll=self.poll, option=option, user=voter)
+        self.url = reverse("poll-export", args=[self.poll.id])
+
+    def read(self, response):
+        return b"".join(response.streaming_content).decode()
+
+    def test_creator_exports_votes_as_csv(self):
+        """✅ Tests the poll creator can stream its votes as CSV"""
+        self.client.force_authenticate(self.owner)
+        response = self.client.get(self.url, {"fmt": "csv"}, secure=True)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        lines = self.read(response).splitlines()
+        self.assertEqual(lines[0], "id,poll,option,user,created_at")
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[1].startswith(f"{Vote.objects.order_by('id')[0].id},{self.poll.id},{self.yes.id},"))
+
+    def test_results_as_ndjson(self):
+        """✅ Tests results export includes counter shards, one JSON object per line"""
+        self.client.force_authenticate(self.owner)
+        response = self.client.get(self.url, {"data": "results", "fmt": "ndjson"}, secure=True)
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual([(r["option_text"], r["vote_count"]) for r in rows], [("Yes", 2), ("No", 1)])
+
+    def test_export_permissions(self):
+        """✅ Tests only the creator or staff export a poll and only staff export all polls"""
+        self.client.force_authenticate(self.voters[0])
+        self.assertEqual(self.client.get(self.url, secure=True).status_code, status.HTTP_403_FORBIDDEN)
+        all_url = reverse("poll-export-all")
+        self.assertEqual(self.client.get(all_url, secure=True).status_code, status.HTTP_403_FORBIDDEN)
+
+        staff = User.objects.create(username="export_staff", is_staff=True)
+        self.client.force_authenticate(staff)
+        response = self.client.get(all_url, {"fmt": "ndjson"}, secure=True)
+        self.assertEqual(len(self.read(response).splitlines()), 3)
+        self.assertEqual(self.client.get(all_url, {"fmt": "xml"}, secure=True).status_code, 400)
+
+    def test_export_command(self):
+        """✅ Tests the export_votes command streams votes to stdout"""
+        out = StringIO()
+        call_command("export_votes", "--poll", str(self.poll.id), "--format", "ndjson", stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual({r["user"] for r in rows}, {v.id for v in self.voters})
+
+    @skipUnless(connection.vendor == "postgresql", "import_votes uses COPY")
+    def test_import_round_trip(self):
+        """✅ Tests exported votes re-import with COPY, skipping duplicates and recounting options"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "votes.csv")
+            call_command("export_votes", "--poll", str(self.poll.id), "--output", path)
+            Vote.objects.filter(user=self.voters[0]).delete()
+            call_command("import_votes", path, stdout=StringIO())
+
+        self.assertEqual(Vote.objects.filter(poll=self.poll).count(), 3)
+        self.assertEqual(Option.objects.get(pk=self.yes.pk).vote_count, 2)
+        self.assertEqual(Option.objects.get(pk=self.no.pk).vote_count, 1)
+        self.assertFalse(OptionVoteShard.objects.filter(option__poll=self.poll).exists())
+        self.assertEqual(Poll.objects.get(pk=self.poll.pk).total_votes, 3)
+
+    @skipIf(connection.vendor == "postgresql", "import_votes works on PostgreSQL")
+    def test_import_requires_postgres(self):
+        """✅ Tests import_votes refuses to run on databases without COPY"""
+        with self.assertRaises(CommandError):
+            call_command("import_votes", "-", stdout=StringIO())
@@ -0,0 +1,65 @@
+# polls/tests/test_fast_serializers.py
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from polls.counters import increment_option
+from polls.models import Option, Poll
+from polls.renderers import FastJSONRenderer, orjson
+
+User = get_user_model()
+
+
+class FastReadPathTest(APITestCase):
+    def setUp(self):
+        user = User.objects.create(username="fast_user")
+        for i in range(4):
+            poll = Poll.objects.create(
+                title=f"Poll {i} – ünïcode \u2028",
+                description="",
+                expiry_date=None if i % 2 else timezone.now() + timedelta(days=i),
+                created_by=user,
+                total_votes=i,
+            )
+            for text in ("Red", "Blue"):
+                option = Option.objects.create(poll=poll, text=text, vote_count=i)
+            increment_option(option.pk, shards=4, amount=3)
+        self.poll = poll
+
+    def assert_same_bytes(self, url):
+        with override_settings(POLLS_FAST_READ_SERIALIZATION=False):
+            expected = self.client.get(url).content
+        actual = self.client.get(url).content
+        self.assertEqual(actual, expected)
+
+    def test_list_is_byte_compatible(self):
+        """✅ Tests the fast list path renders exactly what PollSerializer renders"""
+        self.assert_same_bytes(reverse("poll-list"))
+        self.assert_same_bytes(reverse("poll-list") + "?ordering=total_votes&page=1")
+        self.assert_same_bytes(reverse("poll-list") + "?cursor=&ordering=expiry_date")
+
+    def test_retrieve_is_byte_compatible(self):
+        """✅ Tests the fast retrieve path matches PollSerializer and still 404s"""
+        self.assert_same_bytes(reverse("poll-detail", args=[self.poll.id]))
+        self.assertEqual(self.client.get(reverse("poll-detail", args=[999])).status_code, 404)
+
+    @skipUnless(orjson, "orjson is not installed")
+    def test_fast_renderer_matches_json_renderer(self):
+        """✅ Tests orjson output equals JSONRenderer output, datetimes and decimals included"""
+        data = {
+            "title": "ünïcode \u2028",
+            "n": [1, None, True, 0.1, 1e16],
+            "nested": {"x": "y"},
+            "expiry_date": datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=dt_timezone.utc),
+            "created": datetime(2026, 1, 2, 3, 4, 5),
+            "day": date(2026, 1, 2),
+            "prices": [Decimal("12.50"), Decimal("0.1"), Decimal("1E-7")],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
@@ -0,0 +1,72 @@
+# polls/tests/test_instrumentation.py
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from polls.instrumentation import metrics
+from polls.models import Option, Poll
+
+User = get_user_model()
+
+
+class InstrumentationTest(APITestCase):
+    def setUp(self):
+        metrics.clear()
+        self.user = User.objects.create(username="metrics_user")
+        self.poll = Poll.objects.create(
+            title="Measured poll",
+            expiry_date=timezone.now() + timedelta(days=1),
+            created_by=self.user,
+        )
+        Option.objects.create(poll=self.poll, text="Yes")
+        self.detail_url = reverse("poll-detail", args=[self.poll.id])
+
+    def test_server_timing_counts_queries(self):
+        """✅ Tests the Server-Timing header reports the request's query count and DB time"""
+        with self.assertNumQueries(2):
+            response = self.client.get(self.detail_url, secure=True)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        timing = response["Server-Timing"]
+        self.assertIn('db;dur=', timing)
+        self.assertIn('desc="2 queries"', timing)
+        self.assertIn("total;dur=", timing)
+
+    def test_metrics_endpoint_exposes_route_histograms(self):
+        """✅ Tests /api/metrics/ renders per-route histograms in Prometheus text format"""
+        self.client.get(self.detail_url, secure=True)
+        self.client.get(self.detail_url, secure=True)
+
+        staff = User.objects.create(username="metrics_staff", is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(reverse("metrics"), secure=True)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = response.content.decode()
+        self.assertIn("# TYPE polls_http_request_duration_seconds histogram", body)
+        self.assertIn('polls_http_request_queries_bucket{route="poll-detail",method="GET",le="2"} 2', body)
+        self.assertIn('polls_http_responses_total{route="poll-detail",method="GET",status="200"} 2', body)
+
+    def test_metrics_closed_without_token(self):
+        """✅ Tests /api/metrics/ is not public when no token is configured"""
+        self.assertEqual(self.client.get(reverse("metrics"), secure=True).status_code, 401)
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse("metrics"), secure=True).status_code, 401)
+
+    @override_settings(POLLS_INSTRUMENTATION={"METRICS_TOKEN": "s3cret"})
+    def test_metrics_token(self):
+        """✅ Tests /api/metrics/ requires the bearer token when one is configured"""
+        self.assertEqual(self.client.get(reverse("metrics"), secure=True).status_code, 401)
+        response = self.client.get(reverse("metrics"), secure=True, HTTP_AUTHORIZATION="Bearer s3cret")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(POLLS_INSTRUMENTATION={"SLOW_REQUEST_MS": 0})
+    def test_slow_requests_log_slowest_queries(self):
+        """✅ Tests requests over SLOW_REQUEST_MS are logged with their slowest statements"""
+        with self.assertLogs("polls.instrumentation", "WARNING") as logs:
+            self.client.get(self.detail_url, secure=True)
+        self.assertIn("[Slow request] GET poll-detail", logs.output[0])
+        self.assertIn("SELECT", logs.output[0])
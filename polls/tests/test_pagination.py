@@ -0,0 +1,87 @@
+# polls/tests/test_pagination.py
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from polls.models import Option, Poll
+
+User = get_user_model()
+
+
+class KeysetPaginationTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="page_user", password="password123")
+        now = timezone.now()
+        for i in range(25):
+            poll = Poll.objects.create(
+                title=f"Poll {i}",
+                # every third poll never expires; others share expiry dates to force ties
+                expiry_date=None if i % 3 == 0 else now + timedelta(days=i % 4),
+                created_by=self.user,
+            )
+            Option.objects.create(poll=poll, text="A", vote_count=i % 5)
+
+    def walk(self, url, key="next"):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids += [p["id"] for p in response.data["results"]]
+            url = response.data[key]
+        return ids
+
+    def assert_walks_all(self, ordering, expected):
+        url = f"{reverse('poll-list')}?cursor=&ordering={ordering}"
+        ids = self.walk(url)
+        self.assertEqual(ids, expected)
+
+    def test_default_ordering(self):
+        """✅ Tests cursor pages follow -created_at with an id tie-breaker"""
+        expected = list(Poll.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+        self.assert_walks_all("-created_at", expected)
+
+    def test_nullable_and_composite_ordering(self):
+        """✅ Tests expiry_date (nullable) and total_votes orderings visit every poll exactly once"""
+        for ordering in ("expiry_date", "-expiry_date", "-total_votes,expiry_date", "total_votes,-id"):
+            ids = self.walk(f"{reverse('poll-list')}?cursor=&ordering={ordering}")
+            self.assertEqual(sorted(ids), sorted(Poll.objects.values_list("id", flat=True)), ordering)
+            self.assertEqual(len(ids), len(set(ids)), ordering)
+
+        polls = Poll.objects.all()
+        expected = [p.id for p in sorted(polls, key=lambda p: (p.expiry_date is None, p.expiry_date or 0, p.id))]
+        self.assert_walks_all("expiry_date", expected)
+        self.assert_walks_all("-expiry_date", expected[::-1])
+
+    def test_seek_bounds_leading_key(self):
+        """✅ Tests the seek carries a plain range on the leading key next to the OR'ed comparisons"""
+        first = self.client.get(f"{reverse('poll-list')}?cursor=&ordering=-created_at")
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(first.data["next"])
+        sql = next(q["sql"] for q in queries.captured_queries if 'FROM "polls_poll"' in q["sql"])
+        where = sql.split("WHERE", 1)[1]
+        self.assertIn('AND "polls_poll"."created_at" <= ', where)
+
+    def test_previous_links(self):
+        """✅ Tests walking back with previous links returns the pages in order"""
+        response = self.client.get(f"{reverse('poll-list')}?cursor=&ordering=expiry_date")
+        first_page = [p["id"] for p in response.data["results"]]
+        self.assertIsNone(response.data["previous"])
+        second = self.client.get(response.data["next"])
+        back = self.client.get(second.data["previous"])
+        self.assertEqual([p["id"] for p in back.data["results"]], first_page)
+
+    def test_page_number_mode_unchanged(self):
+        """✅ Tests requests without a cursor still get page-number pagination"""
+        response = self.client.get(reverse("poll-list"))
+        self.assertEqual(response.data["count"], 25)
+
+    def test_invalid_cursor(self):
+        """✅ Tests a garbled cursor returns 404"""
+        response = self.client.get(f"{reverse('poll-list')}?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -2,9 +2,11 @@
 from django.utils import timezone
 from django.contrib.auth import get_user_model   # ✅ use this instead of auth.User
 from django.urls import reverse
+from django.core.cache import cache
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from polls.models import Poll, Option, Vote
+from polls.authentication import get_user_cache
 from datetime import timedelta
 
 User = get_user_model()   # ✅ this points to polls.User now
@@ -13,6 +15,11 @@ User = get_user_model()   # ✅ this points to polls.User now
 
 class PollSystemTest(APITestCase):
     def setUp(self):
+        # Rate-limit counters live in the cache; start every test from zero
+        cache.clear()
+        # user ids are reused between tests, so drop users cached by JWT auth
+        get_user_cache().clear()
+
         # Setup API client and base user
         self.client = APIClient()
         self.user_data = {"username": "polls_user", "password": "password123"}
@@ -89,6 +96,19 @@ class PollSystemTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertGreaterEqual(len(response.data), 1)
 
+    def test_filter_active_polls(self):
+        """✅ Tests ?active= filters open/expired polls in SQL, matching Poll.is_active"""
+        now = timezone.now()
+        open_poll = Poll.objects.create(title="Open", expiry_date=now + timedelta(days=1), created_by=self.user)
+        forever = Poll.objects.create(title="No expiry", created_by=self.user)
+        closed = Poll.objects.create(title="Closed", expiry_date=now - timedelta(days=1), created_by=self.user)
+
+        self.assertEqual(set(Poll.objects.active()), {p for p in Poll.objects.all() if p.is_active})
+        response = self.client.get(self.polls_url, {"active": "true"})
+        self.assertEqual({p["id"] for p in response.data["results"]}, {open_poll.id, forever.id})
+        response = self.client.get(self.polls_url, {"active": "false"})
+        self.assertEqual([p["id"] for p in response.data["results"]], [closed.id])
+
     def test_view_poll_details(self):
         """✅ Tests retrieving a poll with all its options (User Story 2.4)"""
         poll = Poll.objects.create(
@@ -180,3 +200,32 @@ class PollSystemTest(APITestCase):
         self.authenticate()
         response = self.client.post(reverse("vote"), {"poll": 999, "option": 999}, format="json")
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_create_poll_returns_options_in_few_queries(self):
+        """✅ Tests poll creation inserts options in one bulk query and returns them"""
+        self.client.force_authenticate(self.user)
+        payload = {"title": "Bulk options", "options": ["A", "B", "C", "D"]}
+        # savepoint, poll insert, one insert for all options, release
+        with self.assertNumQueries(4):
+            response = self.client.post(self.polls_url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([o["text"] for o in response.data["options"]], ["A", "B", "C", "D"])
+        self.assertTrue(all(o["id"] for o in response.data["options"]))
+
+    def test_batch_create_polls(self):
+        """✅ Tests the batch endpoint creates many polls with options and enforces the daily limit"""
+        self.client.force_authenticate(self.user)
+        batch_url = reverse("poll-batch")
+        payload = {"polls": [
+            {"title": f"Imported {i}", "options": ["Yes", "No"]} for i in range(3)
+        ]}
+        response = self.client.post(batch_url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(Option.objects.filter(poll__title__startswith="Imported").count(), 6)
+        self.assertEqual(len(response.data[0]["options"]), 2)
+
+        # 3 already created today; 3 more would exceed the limit of 5
+        response = self.client.post(batch_url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(Poll.objects.count(), 3)
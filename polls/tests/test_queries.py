@@ -0,0 +1,42 @@
+# polls/tests/test_queries.py
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from polls.models import Option, Poll
+from polls.tests.utils import QueryCountAssertionsMixin
+
+User = get_user_model()
+
+
+class PollQueryCountTest(QueryCountAssertionsMixin, APITestCase):
+    def setUp(self):
+        self.users = [User.objects.create(username=f"creator{i}") for i in range(10)]
+        self.poll = self.make_poll(self.users[0])
+
+    def make_poll(self, user, options=3):
+        poll = Poll.objects.create(title=f"Poll by {user.username}", created_by=user)
+        Option.objects.bulk_create([Option(poll=poll, text=f"Option {i}") for i in range(options)])
+        return poll
+
+    def add_polls(self):
+        for user in self.users[1:]:
+            self.make_poll(user, options=5)
+
+    def test_list_query_count_is_constant(self):
+        """✅ Tests the list endpoint runs count + polls + options queries regardless of page size"""
+        response = self.assertConstantQueries(reverse("poll-list"), self.add_polls, expected=3)
+        self.assertEqual(len(response.data["results"]), 10)
+        self.assertEqual(response.data["results"][0]["created_by"], "creator9")
+
+    def test_cursor_list_query_count_is_constant(self):
+        """✅ Tests keyset pages skip the COUNT query"""
+        self.assertConstantQueries(reverse("poll-list") + "?cursor=", self.add_polls, expected=2)
+
+    def test_retrieve_query_count_is_constant(self):
+        """✅ Tests retrieve runs one poll query and one options query"""
+        def add_options():
+            Option.objects.bulk_create([Option(poll=self.poll, text=f"Extra {i}") for i in range(10)])
+
+        response = self.assertConstantQueries(reverse("poll-detail", args=[self.poll.id]), add_options, expected=2)
+        self.assertEqual(len(response.data["options"]), 13)
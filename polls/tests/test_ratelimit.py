@@ -0,0 +1,95 @@
+# polls/tests/test_ratelimit.py
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from polls.ratelimit import FixedWindowLimiter, TokenBucketLimiter, check_rate_limit_caches, parse_rate
+from polls.tests.utils import LOCAL_COUNTER_CACHE, local_counter_cache
+
+User = get_user_model()
+
+LOCAL_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "ratelimit-test"}}
+DATABASE_CACHE = {"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "polls_cache"}}
+FIXED_WINDOW = {"poll_create": {"CLASS": "polls.ratelimit.FixedWindowLimiter", "RATE": "2/day"}}
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class RateLimiterTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_parse_rate(self):
+        """✅ Tests DRF-style rate strings are parsed"""
+        self.assertEqual(parse_rate("5/day"), (5, 86400))
+        self.assertEqual(parse_rate("10/minute"), (10, 60))
+
+    def test_fixed_window(self):
+        """✅ Tests the fixed window allows the limit and doesn't count rejected attempts"""
+        limiter = FixedWindowLimiter("test", "3/day")
+        self.assertTrue(limiter.consume(1, 2))
+        self.assertFalse(limiter.consume(1, 2))
+        self.assertTrue(limiter.consume(1))
+        self.assertFalse(limiter.consume(1))
+        self.assertTrue(limiter.consume(2, 3))
+
+    def test_token_bucket(self):
+        """✅ Tests the token bucket rejects once its tokens are spent"""
+        limiter = TokenBucketLimiter("test", "2/day")
+        self.assertTrue(limiter.consume(1))
+        self.assertTrue(limiter.consume(1))
+        self.assertFalse(limiter.consume(1))
+
+    def test_token_bucket_drops_refilled_buckets(self):
+        """✅ Tests full buckets are swept so idle idents don't accumulate"""
+        limiter = TokenBucketLimiter("test", "2/second")
+        for ident in range(100):
+            limiter.consume(ident)
+        limiter.sweep(time.monotonic() + 1)
+        self.assertEqual(limiter._buckets, {})
+
+    @override_settings(POLLS_RATE_LIMITS=FIXED_WINDOW)
+    def test_non_atomic_caches_fail_check(self):
+        """✅ Tests the startup check rejects a cache-backed limit on a per-process or database cache"""
+        for cache_settings in (LOCAL_CACHE, DATABASE_CACHE):
+            with self.subTest(cache_settings["default"]["BACKEND"]), override_settings(CACHES=cache_settings):
+                errors = check_rate_limit_caches(None)
+                self.assertEqual([error.id for error in errors], ["polls.E001"])
+        with override_settings(POLLS_RATE_LIMITS={"poll_create": {"CLASS": "polls.ratelimit.TokenBucketLimiter", "RATE": "2/day"}}):
+            self.assertEqual(check_rate_limit_caches(None), [])
+        with local_counter_cache():
+            self.assertEqual(check_rate_limit_caches(None), [])
+
+
+class PollCreationLimitTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="limited_user")
+        self.client.force_authenticate(self.user)
+
+    @override_settings(POLLS_RATE_LIMITS={"poll_create": {"CLASS": "polls.ratelimit.TokenBucketLimiter", "RATE": "2/day"}})
+    def test_limit_is_enforced_without_counting_polls(self):
+        """✅ Tests the creation limit is checked through the limiter, not a COUNT over polls"""
+        for _ in range(2):
+            response = self.client.post(reverse("poll-list"), {"title": "Limited", "options": ["A"]}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        with self.assertNumQueries(0):
+            response = self.client.post(reverse("poll-list"), {"title": "Limited", "options": ["A"]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertIn("2 polls per day", response.data["error"])
+
+    @override_settings(POLLS_RATE_LIMITS=FIXED_WINDOW, CACHES=LOCAL_COUNTER_CACHE)
+    def test_fixed_window_limit_is_enforced_in_the_cache(self):
+        """✅ Tests the default cache-backed limiter enforces the creation limit without database queries"""
+        cache.clear()
+        for _ in range(2):
+            response = self.client.post(reverse("poll-list"), {"title": "Limited", "options": ["A"]}, format="json")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        with self.assertNumQueries(0):
+            response = self.client.post(reverse("poll-list"), {"title": "Limited", "options": ["A"]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertIn("2 polls per day", response.data["error"])
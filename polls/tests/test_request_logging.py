@@ -0,0 +1,66 @@
+# polls/tests/test_request_logging.py
+import logging
+import queue
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from polls.request_logging import CurlFormatter, DeferredQueueHandler
+
+User = get_user_model()
+
+
+class RequestLoggingTest(APITestCase):
+    def test_headers_redacted_and_auth_body_skipped(self):
+        """✅ Tests sensitive headers are redacted and auth bodies never captured"""
+        User.objects.create_user(username="log_user", password="password123")
+        with self.assertLogs("polls.middleware", level="INFO") as logs:
+            self.client.post(
+                reverse("token_obtain_pair"),
+                {"username": "log_user", "password": "password123"},
+                format="json",
+                HTTP_AUTHORIZATION="Bearer secret-token",
+            )
+        record = logs.records[-1].http
+        self.assertEqual(record["headers"]["Authorization"], "[redacted]")
+        self.assertNotIn("body", record)
+        self.assertEqual(record["status"], 200)
+        self.assertNotIn("secret-token", CurlFormatter().format(logs.records[-1]))
+
+    def test_body_captured_for_other_paths(self):
+        """✅ Tests request bodies are logged (truncated) outside skipped paths"""
+        with override_settings(POLLS_REQUEST_LOGGING={"MAX_BODY_BYTES": 10}):
+            with self.assertLogs("polls.middleware", level="INFO") as logs:
+                self.client.post(reverse("vote"), {"poll": 1, "option": 1}, format="json")
+        self.assertEqual(logs.records[-1].http["body"], '{"poll":1,')
+
+    @override_settings(POLLS_REQUEST_LOGGING={"SAMPLE_RATE": 0.0})
+    def test_sampling_rate_zero_logs_nothing(self):
+        """✅ Tests a zero sample rate skips request logging entirely"""
+        logger = logging.getLogger("polls.middleware")
+        with self.assertNoLogs(logger, level="INFO"):
+            self.client.get(reverse("poll-list"))
+
+
+class DeferredQueueHandlerTest(APITestCase):
+    def test_listener_starts_per_process_on_first_record(self):
+        """✅ Tests no thread runs until a record is logged, and a forked process gets its own"""
+        target = logging.Handler()
+        target.emit = lambda record: None
+        handler = DeferredQueueHandler([target], maxsize=10)
+        self.assertIsNone(handler.listener)
+
+        record = logging.makeLogRecord({"msg": "first", "levelno": logging.INFO})
+        handler.handle(record)
+        first = handler.listener
+        self.assertIsNotNone(first)
+        handler.handle(record)
+        self.assertIs(handler.listener, first)
+
+        # what a worker forked after the first record sees: a parent's pid and a dead thread
+        handler._pid = -1
+        handler.handle(record)
+        self.assertIsNot(handler.listener, first)
+        self.assertIsInstance(handler.queue, queue.Queue)
@@ -0,0 +1,92 @@
+# polls/tests/test_results_cache.py
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from polls.models import Option, Poll
+from polls.results_cache import LocalResultsCache, check_results_cache, get_results_cache
+from polls.tests.utils import LOCAL_COUNTER_CACHE, local_counter_cache
+
+User = get_user_model()
+
+
+class ResultsCacheTest(APITestCase):
+    def setUp(self):
+        get_results_cache().clear()
+        self.user = User.objects.create_user(username="results_user", password="password123")
+        self.poll = Poll.objects.create(
+            title="Cached poll",
+            expiry_date=timezone.now() + timedelta(days=1),
+            created_by=self.user,
+        )
+        self.option = Option.objects.create(poll=self.poll, text="Yes", vote_count=4)
+        Option.objects.create(poll=self.poll, text="No", vote_count=1)
+        self.results_url = reverse("poll-results", args=[self.poll.id])
+
+    def test_votes_update_cached_results(self):
+        """✅ Tests results are served from cache and updated in place by votes"""
+        response = self.client.get(self.results_url)
+        self.assertEqual(response.data["total_votes"], 5)
+
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("vote"), {"poll": self.poll.id, "option": self.option.id}, format="json")
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.results_url)
+        self.assertEqual(response.data["total_votes"], 6)
+        self.assertEqual(response.data["options"][0]["vote_count"], 5)
+
+    def test_conditional_get_returns_304(self):
+        """✅ Tests ETag revalidation returns 304 until the results change"""
+        response = self.client.get(self.results_url)
+        etag = response["ETag"]
+        self.assertTrue(response.has_header("Last-Modified"))
+
+        response = self.client.get(self.results_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        get_results_cache().apply_vote(self.poll.id, self.option.id)
+        response = self.client.get(self.results_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(POLLS_RESULTS_CACHE={"BACKEND": "django"}, CACHES=LOCAL_COUNTER_CACHE)
+    @local_counter_cache()
+    def test_django_cache_backend(self):
+        """✅ Tests the cache-framework backend applies votes with atomic increments"""
+        get_results_cache().cache.clear()
+        self.client.get(self.results_url)
+        get_results_cache().apply_vote(self.poll.id, self.option.id, 2)
+        response = self.client.get(self.results_url)
+        self.assertEqual(response.data["total_votes"], 7)
+
+    @override_settings(
+        POLLS_RESULTS_CACHE={"BACKEND": "django"},
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "polls_cache"}},
+    )
+    def test_django_backend_refuses_non_atomic_caches(self):
+        """✅ Tests the cache-framework backend refuses a cache whose incr is not atomic"""
+        with self.assertRaises(ImproperlyConfigured):
+            get_results_cache()
+        self.assertEqual([error.id for error in check_results_cache(None)], ["polls.E004"])
+
+    def test_unknown_poll_is_404(self):
+        """✅ Tests results for a missing poll return 404"""
+        response = self.client.get(reverse("poll-results", args=[999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_local_cache_evicts_least_recently_used(self):
+        """✅ Tests the in-memory backend evicts the least recently used poll"""
+        cache = LocalResultsCache(ttl=60, max_entries=2)
+        for poll_id in (1, 2):
+            cache.set(poll_id, {"options": [], "total_votes": 0})
+        cache.get(1)
+        cache.set(3, {"options": [], "total_votes": 0})
+        self.assertIsNone(cache.get(2))
+        self.assertIsNotNone(cache.get(1))
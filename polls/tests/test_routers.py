@@ -0,0 +1,88 @@
+# polls/tests/test_routers.py
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from polls.authentication import get_user_cache
+from polls.models import Option, Poll
+from polls.results_cache import get_results_cache
+from polls.routers import ReplicaRouter, replica_reads
+
+User = get_user_model()
+
+REPLICAS = {"ALIASES": ["replica"], "STICKY_SECONDS": 5}
+
+
+@override_settings(POLLS_READ_REPLICAS=REPLICAS)
+class ReplicaRouterTest(SimpleTestCase):
+    def test_routing(self):
+        """✅ Tests reads use a replica only inside replica_reads(), and writes always use the primary"""
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Poll))
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Poll), "replica")
+            self.assertEqual(router.db_for_write(Poll), "default")
+        self.assertIsNone(router.db_for_read(Poll))
+        self.assertFalse(router.allow_migrate("replica", "polls"))
+        self.assertIsNone(router.allow_migrate("default", "polls"))
+
+
+@override_settings(POLLS_READ_REPLICAS=REPLICAS)
+class ReplicaRoutingViewTest(APITestCase):
+    def setUp(self):
+        get_user_cache().clear()
+        get_results_cache().clear()
+        self.user = User.objects.create_user(username="replica_reader", password="password123")
+        self.poll = Poll.objects.create(
+            title="Replica poll", expiry_date=timezone.now() + timedelta(days=1), created_by=self.user
+        )
+        self.option = Option.objects.create(poll=self.poll, text="Yes")
+        # the test database has no replica alias: pick the primary, but record the routing
+        patcher = mock.patch("polls.routers.pick_replica", return_value="default")
+        self.pick = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_poll_reads_use_replica(self):
+        """✅ Tests list, retrieve and results reads are routed to a replica"""
+        for url in (reverse("poll-list"), reverse("poll-detail", args=[self.poll.id]),
+                    reverse("poll-results", args=[self.poll.id])):
+            self.pick.reset_mock()
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+            self.assertTrue(self.pick.called, url)
+
+    def test_export_streams_from_replica(self):
+        """✅ Tests an export's queries, run while the body streams, are routed to a replica"""
+        self.client.force_authenticate(self.user)
+        response = self.client.get(reverse("poll-export", args=[self.poll.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        aliases = []
+        db_for_read = ReplicaRouter.db_for_read
+
+        def record(router, model, **hints):
+            aliases.append(db_for_read(router, model, **hints))
+            return aliases[-1]
+
+        with mock.patch.object(ReplicaRouter, "db_for_read", record):
+            b"".join(response.streaming_content)
+        # pick_replica stands in for a replica with "default"; None would mean the primary
+        self.assertTrue(aliases)
+        self.assertEqual(set(aliases), {"default"})
+
+    def test_reads_stick_to_primary_after_write(self):
+        """✅ Tests a client that just voted reads its own write from the primary"""
+        self.client.force_authenticate(self.user)
+        response = self.client.post(reverse("vote"), {"poll": self.poll.id, "option": self.option.id}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.cookies["polls_primary"]["max-age"], 5)
+
+        self.pick.reset_mock()
+        response = self.client.get(reverse("poll-detail", args=[self.poll.id]))
+        self.assertEqual(response.data["total_votes"], 1)
+        self.assertFalse(self.pick.called)
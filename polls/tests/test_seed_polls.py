@@ -0,0 +1,34 @@
+# polls/tests/test_seed_polls.py
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase, override_settings
+
+from polls.models import Option, Poll, Vote, VoteEvent
+
+
+class SeedPollsTest(TestCase):
+    @override_settings(POLLS_VOTE_COUNTING={"MODE": "sharded", "LOG_SHARDED_VOTES": True})
+    def test_generates_skewed_dataset_with_consistent_counts(self):
+        """✅ Tests seed_polls generates unique votes whose counts match Option.vote_count and total_votes"""
+        call_command(
+            "seed_polls", "--users", "30", "--polls", "6", "--options-per-poll", "3",
+            "--votes", "60", "--batch-size", "7", "--seed", "1", stdout=StringIO(),
+        )
+        self.assertEqual(Poll.objects.count(), 6)
+        self.assertEqual(Option.objects.count(), 18)
+        votes = Vote.objects.count()
+        self.assertGreater(votes, 0)
+        self.assertEqual(Option.objects.aggregate(n=Sum("vote_count"))["n"], votes)
+        self.assertEqual(Poll.objects.aggregate(n=Sum("total_votes"))["n"], votes)
+        self.assertEqual(VoteEvent.objects.filter(counted=True).aggregate(n=Sum("amount"))["n"], votes)
+
+        # Zipf: the first (most popular) poll gets the most votes
+        per_poll = list(Poll.objects.order_by("id").values_list("total_votes", flat=True))
+        self.assertEqual(per_poll[0], max(per_poll))
+
+    def test_default_seeds_examples(self):
+        """✅ Tests seed_polls without arguments still seeds the example polls"""
+        call_command("seed_polls", stdout=StringIO())
+        self.assertEqual(Poll.objects.count(), 2)
@@ -0,0 +1,131 @@
+# polls/tests/test_streaming.py
+import json
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from polls.models import Option, Poll
+from polls.results_cache import get_results_cache
+from polls.streaming import PostgresNotifyTransport, get_config, get_hub, results_changed, watch
+
+User = get_user_model()
+
+
+def parse_event(text):
+    fields = dict(line.split(": ", 1) for line in text.strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+@override_settings(POLLS_RESULTS_STREAM={"INTERVAL": 0, "KEEPALIVE": 1, "MAX_DURATION": 5})
+class ResultsStreamTest(APITestCase):
+    def setUp(self):
+        get_results_cache().clear()
+        self.user = User.objects.create(username="stream_user")
+        self.poll = Poll.objects.create(
+            title="Streamed poll",
+            expiry_date=timezone.now() + timedelta(days=1),
+            created_by=self.user,
+        )
+        self.yes = Option.objects.create(poll=self.poll, text="Yes", vote_count=2)
+        self.no = Option.objects.create(poll=self.poll, text="No", vote_count=1)
+
+    def vote(self, option):
+        self.client.force_authenticate(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("vote"), {"poll": self.poll.id, "option": option.id}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def watch(self):
+        """A sync stand-in for one watcher: yields its events as astream_results would."""
+        channel = watch(self.poll.id, get_config())
+        seen = 0
+        try:
+            while True:
+                event = channel.next_event(seen)
+                if event is None:
+                    yield None
+                    continue
+                seen, text = event
+                yield text
+        finally:
+            get_hub().unsubscribe(channel)
+
+    def test_watchers_share_one_computation_per_tick(self):
+        """✅ Tests a vote is computed once per tick and fanned out as a delta to every watcher"""
+        first = self.watch()
+        self.assertEqual(parse_event(next(first))[1]["total_votes"], 3)
+        with self.assertNumQueries(0):
+            second = self.watch()
+            event, snapshot = parse_event(next(second))
+        self.assertEqual((event, snapshot["total_votes"]), ("snapshot", 3))
+
+        self.vote(self.yes)
+        with self.assertNumQueries(2):
+            get_hub().tick()
+
+        for stream in (first, second):
+            event, delta = parse_event(next(stream))
+            self.assertEqual(event, "delta")
+            self.assertEqual(delta["total_votes"], 4)
+            self.assertEqual(delta["options"], [{"id": self.yes.id, "vote_count": 3}])
+            stream.close()
+
+    def test_changes_are_coalesced_per_tick(self):
+        """✅ Tests repeated change notifications within an interval cost one computation"""
+        stream = self.watch()
+        next(stream)
+        for _ in range(5):
+            results_changed(self.poll.id)
+        with self.assertNumQueries(2):
+            get_hub().tick()
+        with self.assertNumQueries(0):
+            get_hub().tick()
+        stream.close()
+
+    def test_unwatched_polls_are_not_computed(self):
+        """✅ Tests votes on polls nobody watches trigger no stream computation"""
+        stream = self.watch()
+        next(stream)
+        stream.close()
+        self.vote(self.no)
+        with self.assertNumQueries(0):
+            get_hub().tick()
+
+    async def test_stream_endpoint(self):
+        """✅ Tests the SSE endpoint streams a snapshot under ASGI and 404s for unknown polls"""
+        response = await self.async_client.get(reverse("poll-results-stream", args=[self.poll.id]), secure=True)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        chunks = aiter(response.streaming_content)
+        self.assertTrue((await anext(chunks)).startswith(b"retry:"))
+        event, snapshot = parse_event((await anext(chunks)).decode())
+        self.assertEqual(event, "snapshot")
+        self.assertEqual([o["vote_count"] for o in snapshot["options"]], [2, 1])
+        await chunks.aclose()
+
+        response = await self.async_client.get(reverse("poll-results-stream", args=[9999]), secure=True)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_stream_endpoint_refused_under_wsgi(self):
+        """✅ Tests the SSE endpoint won't hold a WSGI worker for a stream"""
+        response = self.client.get(reverse("poll-results-stream", args=[self.poll.id]), secure=True)
+        self.assertEqual(response.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+
+    @override_settings(CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "shared": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": tempfile.mkdtemp()},
+    })
+    def test_notify_skips_unwatched_polls(self):
+        """✅ Tests PostgresNotifyTransport sends nothing for a poll no process watches"""
+        transport = PostgresNotifyTransport(get_hub(), cache_alias="shared")
+        with self.assertNumQueries(0):
+            transport.publish(self.poll.id)
+        transport.watch(self.poll.id, 60)
+        self.assertEqual(caches["shared"].get(transport.watched_key(self.poll.id)), 1)
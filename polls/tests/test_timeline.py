@@ -0,0 +1,85 @@
+# polls/tests/test_timeline.py
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from polls import vote_events
+from polls.models import Option, Poll, Vote, VoteEvent, VoteRollup
+
+User = get_user_model()
+
+T0 = datetime(2026, 3, 1, 10, 0, tzinfo=dt_timezone.utc)
+
+
+@override_settings(POLLS_VOTE_COUNTING={"MODE": "sharded", "LOG_SHARDED_VOTES": True})
+class VoteTimelineTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="trend_watcher")
+        self.poll = Poll.objects.create(title="Trending poll", created_by=self.user)
+        self.yes = Option.objects.create(poll=self.poll, text="Yes")
+        self.no = Option.objects.create(poll=self.poll, text="No")
+        self.url = reverse("poll-timeline", args=[self.poll.id])
+
+    def log(self, option, minutes, amount=1):
+        VoteEvent.objects.create(
+            poll=self.poll, option=option, amount=amount, counted=True, created_at=T0 + timedelta(minutes=minutes)
+        )
+
+    def test_rollups_are_maintained_incrementally(self):
+        """✅ Tests the aggregator adds each event to its minute, hour and day rollups across runs"""
+        self.log(self.yes, 0)
+        self.log(self.yes, 0.5, amount=2)
+        vote_events.aggregate_all()
+        self.log(self.no, 61)
+        self.log(self.yes, 0.9)
+        vote_events.aggregate_all()
+
+        rollups = {
+            (r.option_id, r.bucket, r.start): r.votes for r in VoteRollup.objects.filter(poll=self.poll)
+        }
+        self.assertEqual(rollups[(self.yes.id, "minute", T0)], 4)
+        self.assertEqual(rollups[(self.yes.id, "hour", T0)], 4)
+        self.assertEqual(rollups[(self.no.id, "hour", T0 + timedelta(hours=1))], 1)
+        self.assertEqual(rollups[(self.no.id, "day", T0.replace(hour=0))], 1)
+
+        vote_events.rebuild([self.poll.id])
+        rebuilt = {(r.option_id, r.bucket, r.start): r.votes for r in VoteRollup.objects.filter(poll=self.poll)}
+        self.assertEqual(rebuilt, rollups)
+
+    def test_timeline_series(self):
+        """✅ Tests /timeline/ returns zero-filled per-option series from the rollups only"""
+        self.log(self.yes, 5)
+        self.log(self.yes, 70, amount=3)
+        self.log(self.no, 130)
+        vote_events.aggregate_all()
+
+        params = {"bucket": "hour", "since": "2026-03-01T09:30:00Z", "until": "2026-03-01T13:00:00+00:00"}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse([q for q in queries if Vote._meta.db_table + '"' in q["sql"]])
+        self.assertEqual(response.data["labels"], [
+            "2026-03-01T09:00:00Z", "2026-03-01T10:00:00Z", "2026-03-01T11:00:00Z",
+            "2026-03-01T12:00:00Z", "2026-03-01T13:00:00Z",
+        ])
+        self.assertEqual(response.data["series"], [
+            {"option_id": self.yes.id, "text": "Yes", "votes": [0, 1, 3, 0, 0]},
+            {"option_id": self.no.id, "text": "No", "votes": [0, 0, 0, 1, 0]},
+        ])
+        self.assertEqual(response.data["total"], [0, 1, 3, 1, 0])
+
+    def test_timeline_errors(self):
+        """✅ Tests bad buckets and ranges are rejected with 400 and unknown polls with 404"""
+        self.assertEqual(self.client.get(self.url, {"bucket": "week"}).status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url, {"bucket": "minute", "since": "2026-01-01T00:00:00Z"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {"since": "yesterday"}).status_code, status.HTTP_400_BAD_REQUEST)
+        missing = reverse("poll-timeline", args=[self.poll.id + 100])
+        self.assertEqual(self.client.get(missing).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(len(self.client.get(self.url, {"bucket": "day"}).data["labels"]), 30)
@@ -0,0 +1,123 @@
+# polls/tests/test_vote_buffer.py
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from polls.models import Option, Poll, Vote
+from polls.tests.utils import LOCAL_COUNTER_CACHE, local_counter_cache
+from polls.vote_buffer import BufferedVote, check_vote_buffer, get_vote_buffer
+
+User = get_user_model()
+
+DATABASE_CACHE = {"default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "polls_cache"}}
+
+
+class WriteBehindVoteTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="buffer_user", password="password123")
+        self.poll = Poll.objects.create(
+            title="Buffered poll",
+            expiry_date=timezone.now() + timedelta(days=1),
+            created_by=self.user,
+        )
+        self.option = Option.objects.create(poll=self.poll, text="Yes")
+        self.client.force_authenticate(self.user)
+
+    def vote(self):
+        return self.client.post(reverse("vote"), {"poll": self.poll.id, "option": self.option.id}, format="json")
+
+    @override_settings(POLLS_VOTE_WRITE_BEHIND={"ENABLED": True, "FLUSH_INTERVAL": 0})
+    def test_vote_is_accepted_then_flushed(self):
+        """✅ Tests write-behind votes return 202 and are persisted by flush_vote_buffer"""
+        response = self.vote()
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(Vote.objects.count(), 0)
+
+        call_command("flush_vote_buffer", stdout=StringIO())
+
+        self.assertEqual(Vote.objects.count(), 1)
+        self.assertEqual(Option.objects.get(pk=self.option.pk).total_vote_count, 1)
+
+    @override_settings(POLLS_VOTE_WRITE_BEHIND={"ENABLED": True, "FLUSH_INTERVAL": 0})
+    def test_duplicate_rejected_before_flush(self):
+        """✅ Tests a second vote is rejected while the first is still buffered"""
+        self.assertEqual(self.vote().status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(self.vote().status_code, status.HTTP_400_BAD_REQUEST)
+
+        call_command("flush_vote_buffer", stdout=StringIO())
+        self.assertEqual(self.vote().status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Vote.objects.count(), 1)
+
+    @override_settings(
+        POLLS_VOTE_WRITE_BEHIND={"ENABLED": True, "BACKEND": "cache", "FLUSH_INTERVAL": 0},
+        CACHES=LOCAL_COUNTER_CACHE,
+    )
+    @local_counter_cache()
+    def test_shared_cache_buffer(self):
+        """✅ Tests the cache-backed buffer drains through the management command"""
+        get_vote_buffer().cache.clear()
+        self.assertEqual(self.vote().status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(self.vote().status_code, status.HTTP_400_BAD_REQUEST)
+
+        call_command("flush_vote_buffer", stdout=StringIO())
+        self.assertEqual(Vote.objects.filter(poll=self.poll, user=self.user).count(), 1)
+
+    @override_settings(
+        POLLS_VOTE_WRITE_BEHIND={"ENABLED": True, "BACKEND": "cache", "FLUSH_INTERVAL": 0, "GAP_TIMEOUT": 0},
+        CACHES=LOCAL_COUNTER_CACHE,
+    )
+    @local_counter_cache()
+    def test_missing_item_is_skipped_after_timeout(self):
+        """✅ Tests a lost buffer item stalls the drain only until GAP_TIMEOUT, then is skipped"""
+        buffer = get_vote_buffer()
+        buffer.cache.clear()
+        buffer.push(BufferedVote(self.poll.pk, self.option.pk, None, 1))
+        buffer.cache.delete(buffer._key("item", 1))
+        self.assertEqual(self.vote().status_code, status.HTTP_202_ACCEPTED)
+
+        with self.assertLogs("polls.vote_buffer", "WARNING"):
+            self.assertEqual(buffer.drain(10), [])
+            self.assertEqual(buffer.drain(10), [BufferedVote(self.poll.pk, self.option.pk, self.user.pk, 1)])
+        self.assertEqual(buffer.drain(10), [])
+
+    @override_settings(
+        POLLS_VOTE_WRITE_BEHIND={"ENABLED": True, "BACKEND": "cache", "FLUSH_INTERVAL": 0},
+        CACHES=LOCAL_COUNTER_CACHE,
+    )
+    @local_counter_cache()
+    def test_buffer_survives_a_lost_tail(self):
+        """✅ Tests votes pushed after the tail key expired are still drained"""
+        buffer = get_vote_buffer()
+        buffer.cache.clear()
+        buffer.push(BufferedVote(self.poll.pk, self.option.pk, None, 1))
+        self.assertEqual(len(buffer.drain(10)), 1)
+        buffer.cache.delete(buffer._key("tail"))
+
+        self.assertEqual(self.vote().status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(buffer.drain(10), [BufferedVote(self.poll.pk, self.option.pk, self.user.pk, 1)])
+
+    def test_non_atomic_caches_are_refused(self):
+        """✅ Tests the cache-backed buffer refuses caches without a shared atomic incr"""
+        write_behind = {"ENABLED": True, "BACKEND": "cache", "FLUSH_INTERVAL": 0}
+        for cache_settings in (DATABASE_CACHE, LOCAL_COUNTER_CACHE):
+            with self.subTest(cache_settings["default"]["BACKEND"]), override_settings(
+                POLLS_VOTE_WRITE_BEHIND=write_behind, CACHES=cache_settings
+            ):
+                with self.assertRaises(ImproperlyConfigured):
+                    get_vote_buffer()
+                self.assertEqual([error.id for error in check_vote_buffer(None)], ["polls.E002"])
+
+    def test_local_buffer_requires_a_single_process(self):
+        """✅ Tests the local buffer fails the startup check unless the site runs in one process"""
+        with override_settings(POLLS_VOTE_WRITE_BEHIND={"ENABLED": True}):
+            self.assertEqual([error.id for error in check_vote_buffer(None)], ["polls.E003"])
+        with override_settings(POLLS_VOTE_WRITE_BEHIND={"ENABLED": True, "SINGLE_PROCESS": True}):
+            self.assertEqual(check_vote_buffer(None), [])
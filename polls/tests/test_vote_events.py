@@ -0,0 +1,143 @@
+# polls/tests/test_vote_events.py
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from polls import vote_events
+from polls.counters import count_votes
+from polls.models import AggregationCheckpoint, Option, OptionVoteShard, Poll, VoteEvent, VoteRollup
+from polls.results_cache import get_results_cache
+
+User = get_user_model()
+
+EVENT_LOG = {"MODE": "event_log", "GAP_TIMEOUT": 10}
+SHARDED_LOGGED = {"MODE": "sharded", "LOG_SHARDED_VOTES": True}
+
+
+class VoteEventLogTest(APITestCase):
+    def setUp(self):
+        get_results_cache().clear()
+        self.user = User.objects.create_user(username="event_voter", password="password123")
+        self.poll = Poll.objects.create(
+            title="Logged poll", expiry_date=timezone.now() + timedelta(days=1), created_by=self.user
+        )
+        self.yes = Option.objects.create(poll=self.poll, text="Yes")
+        self.no = Option.objects.create(poll=self.poll, text="No")
+
+    def results(self):
+        response = self.client.get(reverse("poll-results", args=[self.poll.id]))
+        return {row["text"]: row["vote_count"] for row in response.data["options"]}
+
+    @override_settings(POLLS_VOTE_COUNTING=EVENT_LOG)
+    def test_votes_are_counted_by_the_aggregator(self):
+        """✅ Tests event_log mode only appends at vote time and the aggregator folds events into tallies"""
+        self.client.force_authenticate(self.user)
+        response = self.client.post(reverse("vote"), {"poll": self.poll.id, "option": self.yes.id}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(VoteEvent.objects.get().option_id, self.yes.id)
+        self.assertEqual(self.results()["Yes"], 0)
+
+        # folding updates the cached results once committed
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(vote_events.aggregate_all(), 1)
+        self.assertEqual(self.results()["Yes"], 1)
+        self.assertEqual(Poll.objects.get(pk=self.poll.pk).total_votes, 1)
+        self.assertEqual(AggregationCheckpoint.objects.get().position, VoteEvent.objects.get().pk)
+        self.assertEqual(vote_events.aggregate_all(), 0)
+
+    @override_settings(POLLS_VOTE_COUNTING=SHARDED_LOGGED)
+    def test_sharded_votes_are_not_counted_twice(self):
+        """✅ Tests sharded mode logs counted events that the aggregator passes over"""
+        count_votes(self.poll.pk, self.yes.pk, shards=4, amount=3)
+        self.assertTrue(VoteEvent.objects.get().counted)
+        self.assertEqual(vote_events.aggregate_all(), 1)
+        self.assertEqual(Option.objects.with_vote_totals().get(pk=self.yes.pk).total_vote_count, 3)
+
+    @override_settings(POLLS_VOTE_COUNTING=EVENT_LOG)
+    def test_aggregator_waits_at_gaps(self):
+        """✅ Tests the high-water mark stops at a missing event id until GAP_TIMEOUT has passed"""
+        for option in (self.yes, self.no, self.yes):
+            count_votes(self.poll.pk, option.pk)
+        first, missing, last = VoteEvent.objects.order_by("pk")
+        missing.delete()  # as if its transaction were still open
+
+        self.assertEqual(vote_events.aggregate_all(), 1)
+        checkpoint = AggregationCheckpoint.objects.get()
+        self.assertEqual(checkpoint.position, first.pk)
+        self.assertIsNotNone(checkpoint.waiting_since)
+
+        checkpoint.waiting_since -= timedelta(seconds=11)
+        checkpoint.save()
+        self.assertEqual(vote_events.aggregate_all(), 1)
+        self.assertEqual(Option.objects.get(pk=self.yes.pk).vote_count, 2)
+        self.assertIsNone(AggregationCheckpoint.objects.get().waiting_since)
+
+    @override_settings(POLLS_VOTE_COUNTING=EVENT_LOG)
+    def test_skipped_events_are_folded_when_they_commit(self):
+        """✅ Tests an event committing after the aggregator skipped its id still reaches tallies and rollups"""
+        for option in (self.yes, self.yes, self.yes):
+            count_votes(self.poll.pk, option.pk)
+        first, late, last = VoteEvent.objects.order_by("pk")
+        late_id = late.pk
+        late.delete()  # its transaction outlives GAP_TIMEOUT
+        vote_events.aggregate_all()
+        AggregationCheckpoint.objects.update(waiting_since=timezone.now() - timedelta(seconds=11))
+        self.assertEqual(vote_events.aggregate_all(), 1)
+        self.assertEqual(AggregationCheckpoint.objects.get().gaps[0][:2], [late_id, late_id])
+
+        late.pk = late_id
+        late.save(force_insert=True)  # ... and commits
+        self.assertEqual(vote_events.aggregate_all(), 1)
+        self.assertEqual(vote_events.aggregate_all(), 0)
+        self.assertEqual(AggregationCheckpoint.objects.get().gaps, [])
+        self.assertEqual(Option.objects.get(pk=self.yes.pk).vote_count, 3)
+        self.assertEqual(VoteRollup.objects.get(option=self.yes, bucket=VoteRollup.DAY).votes, 3)
+
+    @override_settings(POLLS_VOTE_COUNTING={**EVENT_LOG, "GAP_RETENTION": 0})
+    def test_gaps_are_forgotten_after_retention(self):
+        """✅ Tests ids that never commit stop being watched after GAP_RETENTION"""
+        AggregationCheckpoint.objects.create(name=vote_events.CHECKPOINT, position=5, gaps=[[2, 3, "2000-01-01T00:00:00+00:00"]])
+        with self.assertLogs("polls.vote_events", "WARNING"):
+            self.assertEqual(vote_events.aggregate(), 0)
+        self.assertEqual(AggregationCheckpoint.objects.get().gaps, [])
+
+    def test_without(self):
+        """✅ Tests folded ids are cut out of the gap ranges"""
+        self.assertEqual(vote_events.without([[1, 5, "t"], [8, 8, "u"]], [1, 3, 8]), [[2, 2, "t"], [4, 5, "t"]])
+
+    @override_settings(POLLS_VOTE_COUNTING={"MODE": "sharded", "LOG_SHARDED_VOTES": False})
+    def test_sharded_votes_can_skip_the_log(self):
+        """✅ Tests LOG_SHARDED_VOTES=False counts without an event and refuses a rebuild from the log"""
+        count_votes(self.poll.pk, self.yes.pk, shards=4)
+        self.assertFalse(VoteEvent.objects.exists())
+        self.assertEqual(Poll.objects.get(pk=self.poll.pk).total_votes, 1)
+        with self.assertRaisesMessage(CommandError, "LOG_SHARDED_VOTES"):
+            call_command("aggregate_votes", "--rebuild", stdout=StringIO())
+
+    @override_settings(POLLS_VOTE_COUNTING=SHARDED_LOGGED)
+    def test_rebuild_replaces_drifted_tallies(self):
+        """✅ Tests aggregate_votes --rebuild recomputes tallies from the log and folds shards away"""
+        count_votes(self.poll.pk, self.yes.pk, shards=4, amount=2)
+        count_votes(self.poll.pk, self.no.pk, shards=4)
+        Option.objects.filter(pk=self.yes.pk).update(vote_count=40)  # drift
+
+        out = StringIO()
+        call_command("aggregate_votes", "--rebuild", "--poll", str(self.poll.pk), stdout=out)
+        self.assertIn("Rebuilt tallies and rollups of 2 options", out.getvalue())
+        self.assertFalse(OptionVoteShard.objects.exists())
+        self.assertEqual(Option.objects.get(pk=self.yes.pk).vote_count, 2)
+        self.assertEqual(Poll.objects.get(pk=self.poll.pk).total_votes, 3)
+
+    @override_settings(POLLS_VOTE_COUNTING=EVENT_LOG)
+    def test_recompute_is_refused_in_event_log_mode(self):
+        """✅ Tests recompute_vote_counts points to the rebuild when counts come from the event log"""
+        with self.assertRaisesMessage(CommandError, "aggregate_votes --rebuild"):
+            call_command("recompute_vote_counts", stdout=StringIO())
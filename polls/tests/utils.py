@@ -0,0 +1,39 @@
+# polls/tests/utils.py
+from unittest import mock
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# CACHES entry for tests of cache counters; see local_counter_cache()
+LOCAL_COUNTER_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "counters"}}
+
+
+def local_counter_cache():
+    """
+    Let the local-memory cache stand in for Redis/Memcached where counters
+    require them: within one process its incr is atomic and keeps the expiry.
+    """
+    return mock.patch("polls.caching.ATOMIC_COUNTER_BACKENDS", (LocMemCache,))
+
+
+class QueryCountAssertionsMixin:
+    """Helpers for pinning the number of SQL queries an endpoint runs."""
+
+    def assertConstantQueries(self, url, grow, expected=None, **extra):
+        """
+        GET ``url``, call ``grow()`` to add more rows, GET again, and assert both
+        requests ran the same number of queries (and ``expected`` if given).
+        """
+        counts = []
+        for step in range(2):
+            if step:
+                grow()
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url, **extra)
+            self.assertEqual(response.status_code, 200, response.content)
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1], f"query count grew with the data: {counts}")
+        if expected is not None:
+            self.assertEqual(counts[0], expected, f"expected {expected} queries, got {counts[0]}")
+        return response
@@ -0,0 +1,93 @@
+# polls/timeline.py
+"""
+Vote history of a poll, read from the minute/hour/day rollups that the vote
+aggregator maintains (see polls/vote_events.py); never from raw votes.
+
+``poll_timeline()`` returns dense, zero-filled series ready for a chart: one label
+per bucket and, for each option, one count per label::
+
+    {
+        "poll_id": 1,
+        "bucket": "hour",
+        "labels": ["2026-01-01T10:00:00Z", "2026-01-01T11:00:00Z", ...],
+        "series": [{"option_id": 3, "text": "Yes", "votes": [0, 12, ...]}, ...],
+        "total": [0, 20, ...],
+    }
+
+Rollups only cover events the aggregator has folded, so the latest bucket
+trails live counts by the aggregator's lag. In "sharded" counting mode votes
+only reach the log with ``LOG_SHARDED_VOTES``.
+"""
+from datetime import timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Option, Poll, VoteRollup
+from .vote_events import bucket_start
+
+STEPS = {
+    VoteRollup.MINUTE: timedelta(minutes=1),
+    VoteRollup.HOUR: timedelta(hours=1),
+    VoteRollup.DAY: timedelta(days=1),
+}
+# time range shown when ?since= is not given
+DEFAULT_WINDOWS = {
+    VoteRollup.MINUTE: timedelta(hours=1),
+    VoteRollup.HOUR: timedelta(days=2),
+    VoteRollup.DAY: timedelta(days=30),
+}
+MAX_POINTS = 1500
+
+
+class TimelineError(ValueError):
+    """Invalid timeline parameters."""
+
+
+def parse_moment(value, name):
+    moment = parse_datetime(value)
+    if moment is None or moment.tzinfo is None:
+        raise TimelineError(f"{name} must be an ISO datetime with a timezone.")
+    return moment
+
+
+def label(moment):
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def poll_timeline(poll_id, bucket, since=None, until=None):
+    """Per-option vote counts of ``poll_id`` per ``bucket``; None if the poll does not exist."""
+    if bucket not in STEPS:
+        raise TimelineError(f"bucket must be one of {', '.join(STEPS)}.")
+    step = STEPS[bucket]
+    until = bucket_start(until or timezone.now(), bucket)
+    since = bucket_start(since, bucket) if since else until - DEFAULT_WINDOWS[bucket] + step
+    if since > until:
+        raise TimelineError("since must not be after until.")
+    points = (until - since) // step + 1
+    if points > MAX_POINTS:
+        raise TimelineError(f"At most {MAX_POINTS} {bucket} buckets per request; narrow since/until.")
+
+    options = list(Option.objects.filter(poll_id=poll_id).order_by("id").values_list("id", "text"))
+    if not options and not Poll.objects.filter(pk=poll_id).exists():
+        return None
+
+    index = {option_id: position for position, (option_id, _) in enumerate(options)}
+    counts = [[0] * points for _ in options]
+    rows = VoteRollup.objects.filter(
+        poll_id=poll_id, bucket=bucket, start__gte=since, start__lte=until
+    ).values_list("option_id", "start", "votes")
+    for option_id, start, votes in rows:
+        if option_id in index:
+            counts[index[option_id]][(start - since) // step] += votes
+
+    return {
+        "poll_id": poll_id,
+        "bucket": bucket,
+        "labels": [label(since + step * n) for n in range(points)],
+        "series": [
+            {"option_id": option_id, "text": text, "votes": votes}
+            for (option_id, text), votes in zip(options, counts)
+        ],
+        "total": [sum(column) for column in zip(*counts)] if counts else [0] * points,
+    }
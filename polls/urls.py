@@ -3,7 +3,8 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 # from .views import PollViewSet, UserRegisterView, logout_view, cast_vote
-from .views import PollViewSet, UserRegisterView, cast_vote
+from .views import PollViewSet, UserRegisterView, cast_vote, metrics_view
+from .async_views import cast_vote_async, poll_results_async, poll_results_stream_async
 
 router = DefaultRouter()
 router.register(r'polls', PollViewSet, basename="poll")
@@ -16,6 +17,16 @@ urlpatterns = [
     # Poll voting
     path("vote/", cast_vote, name="vote"),
 
+    # Live results (Server-Sent Events; ASGI only)
+    path("polls/<int:pk>/results/stream/", poll_results_stream_async, name="poll-results-stream"),
+
+    # Native async endpoints (for ASGI deployments)
+    path("async/vote/", cast_vote_async, name="vote-async"),
+    path("async/polls/<int:pk>/results/", poll_results_async, name="poll-results-async"),
+
+    # Request metrics (Prometheus text format)
+    path("metrics/", metrics_view, name="metrics"),
+
     # Poll CRUD
     path("", include(router.urls)),
 ]
@@ -1,21 +1,37 @@
 # polls/views.py
 from rest_framework import viewsets, generics, status, permissions, filters as drf_filters
-from rest_framework.decorators import api_view, permission_classes, action
+from rest_framework.decorators import api_view, authentication_classes, permission_classes, action
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
+from rest_framework.renderers import BrowsableAPIRenderer
+from django.conf import settings
 from django.shortcuts import get_object_or_404
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.http import require_GET
 from rest_framework_simplejwt.tokens import RefreshToken, TokenError
 from rest_framework.views import APIView
 
 from django.db import transaction
-from django.db.models import F, Sum, Count, Value
-from django.db.models.functions import Coalesce
+from django.db.models import BooleanField, ExpressionWrapper, Prefetch, Q
+from django.db.models.functions import Now
 
 from django_filters.rest_framework import DjangoFilterBackend
 
 from .models import Poll, Option, Vote, User
 from .serializers import PollSerializer, UserSerializer, OptionSerializer, VoteSerializer
 from .filters import PollFilter
+from .pagination import PollPagination
+from .fast_serializers import poll_rows, serialize_polls
+from .renderers import FastJSONRenderer
+from .ratelimit import get_rate_limiter
+from .authentication import ViewAuthentication
+from .counters import count_votes
+from .results_cache import etag_for, get_results, get_results_cache, results_payload
+from .timeline import TimelineError, parse_moment, poll_timeline
+from . import exports, instrumentation, routers, streaming
+from . import vote_buffer
 
 
 # ---------------- User Registration ----------------
@@ -32,6 +48,9 @@ class PollViewSet(viewsets.ModelViewSet):
     queryset = Poll.objects.all()
     serializer_class = PollSerializer
     permission_classes = [IsAuthenticated]
+    # page numbers by default; ?cursor= switches to keyset pagination
+    pagination_class = PollPagination
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
 
     # Filters, ordering
     filter_backends = [DjangoFilterBackend, drf_filters.OrderingFilter]
@@ -39,73 +58,272 @@ class PollViewSet(viewsets.ModelViewSet):
     ordering_fields = ['created_at', 'expiry_date', 'id', 'title', 'total_votes']
     ordering = ['-created_at']
 
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # reads go to a replica, unless this client wrote within the sticky window
+        self.replica_token = None
+        if request.method in permissions.SAFE_METHODS and not routers.is_pinned(request):
+            self.replica_token = routers.start_replica_reads()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        routers.end_replica_reads(getattr(self, "replica_token", None))
+        return super().finalize_response(request, response, *args, **kwargs)
+
     def get_permissions(self):
         if self.action in ["list", "retrieve"]:
             return [AllowAny()]
         return super().get_permissions()
 
+    # columns PollSerializer reads; list/retrieve load nothing else
+    list_columns = ('id', 'title', 'description', 'expiry_date', 'created_by__username', 'created_at', 'total_votes')
+
     def get_queryset(self):
-        # annotate total_votes (sum of option.vote_count) for fast ordering & returning
-        return Poll.objects.prefetch_related('options').annotate(
-            total_votes=Coalesce(Sum('options__vote_count'), Value(0))
+        # total_votes is a stored, indexed column, so listing/ordering needs no GROUP BY;
+        # created_by is joined and options prefetched so a page costs a fixed number of queries
+        options = Option.objects.only('id', 'poll_id', 'text', 'vote_count').with_vote_totals().order_by('id')
+        queryset = Poll.objects.select_related('created_by').prefetch_related(
+            Prefetch('options', queryset=options)
+        )
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.only(*self.list_columns)
+        return queryset
+
+    def use_fast_path(self):
+        return getattr(settings, "POLLS_FAST_READ_SERIALIZATION", True)
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_path():
+            return super().list(request, *args, **kwargs)
+        # values() rows + dict construction; same JSON as PollSerializer
+        rows = poll_rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serialize_polls(page))
+        return Response(serialize_polls(rows))
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.use_fast_path():
+            return super().retrieve(request, *args, **kwargs)
+        # retrieve is AllowAny, so there are no object permissions to check on a row
+        lookup = {self.lookup_field: self.kwargs[self.lookup_url_kwarg or self.lookup_field]}
+        rows = poll_rows(self.filter_queryset(self.get_queryset()).filter(**lookup))
+        data = serialize_polls(rows[:1])
+        if not data:
+            raise Http404("No Poll matches the given query.")
+        return Response(data[0])
+
+    def creation_limit_response(self, request, amount):
+        """403 response if creating ``amount`` polls would exceed the user's daily limit."""
+        limiter = get_rate_limiter("poll_create")
+        if limiter.consume(request.user.pk, amount):
+            return None
+        return Response(
+            {"error": f"You have reached the daily poll creation limit ({limiter.limit} polls per day)."},
+            status=403,
         )
 
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        denied = self.creation_limit_response(request, 1)
+        if denied is not None:
+            return denied
+        self.perform_create(serializer)
+        headers = self.get_success_headers(serializer.data)
+        return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+
     def perform_create(self, serializer):
-        options_data = self.request.data.get("options", [])
-        poll = serializer.save(created_by=self.request.user)
-        # create poll options
-        for text in options_data:
-            Option.objects.create(poll=poll, text=text)
+        # the serializer inserts the poll and bulk-creates its options atomically
+        serializer.save(created_by=self.request.user)
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """
+        Create many polls with their options in one request (for import jobs).
+        Accepts a list of polls or {"polls": [...]}; the daily creation limit
+        applies to the batch as a whole.
+        """
+        items = request.data.get("polls") if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response({"error": "Expected a non-empty list of polls."}, status=400)
+
+        serializer = self.get_serializer(data=items, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        denied = self.creation_limit_response(request, len(items))
+        if denied is not None:
+            return denied
+
+        serializer.save(created_by=request.user)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def export_response(self, request, poll_id=None):
+        dataset = request.query_params.get("data", "votes")
+        # not "format": DRF reserves that parameter for renderer selection
+        fmt = request.query_params.get("fmt", "csv")
+        if dataset not in exports.DATASETS or fmt not in exports.FORMATS:
+            return Response(
+                {"error": f"data must be one of {', '.join(exports.DATASETS)}; fmt one of {', '.join(exports.FORMATS)}."},
+                status=400,
+            )
+        body = exports.export(dataset, fmt, poll_id)
+        if self.replica_token is not None:
+            # the body is read after finalize_response has closed the view's replica scope
+            body = routers.replica_iterator(body)
+        response = StreamingHttpResponse(body, content_type=exports.FORMATS[fmt])
+        name = f"poll-{poll_id}-{dataset}" if poll_id is not None else f"polls-{dataset}"
+        response["Content-Disposition"] = f'attachment; filename="{name}.{fmt}"'
+        return response
+
+    @action(detail=True, methods=['get'])
+    def export(self, request, pk=None):
+        """
+        Stream a poll's votes (?data=votes) or results (?data=results) as
+        ?fmt=csv or ?fmt=ndjson. Only the poll's creator and staff may export.
+        """
+        poll = get_object_or_404(Poll.objects.only('id', 'created_by_id'), pk=pk)
+        if poll.created_by_id != request.user.id and not request.user.is_staff:
+            return Response({"error": "Only the poll creator can export its votes."}, status=403)
+        return self.export_response(request, poll.id)
 
-    @action(detail=True, methods=['get'], permission_classes=[AllowAny])
+    @action(detail=False, methods=['get'], url_path='export', permission_classes=[permissions.IsAdminUser])
+    def export_all(self, request):
+        """Stream the votes or results of every poll (staff only); same parameters as export."""
+        return self.export_response(request)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        get_results_cache().invalidate(serializer.instance.pk)
+        transaction.on_commit(lambda: streaming.results_changed(serializer.instance.pk))
+
+    def perform_destroy(self, instance):
+        poll_id = instance.pk
+        get_results_cache().invalidate(poll_id)
+        super().perform_destroy(instance)
+        transaction.on_commit(lambda: streaming.results_changed(poll_id))
+
+    @action(detail=True, methods=['get'], permission_classes=[AllowAny],
+            authentication_classes=ViewAuthentication("results"))
     def results(self, request, pk=None):
         """
         Return aggregated results for a poll:
-        - uses Count on Vote table to get accurate counts (single query per options set)
-        - returns list of options with vote_count (from aggregation)
+        - served from the per-poll results cache, which votes update in place
+        - computed from the option counters only on a cache miss
+        - ETag/Last-Modified let clients revalidate with a 304
         """
-        poll = get_object_or_404(Poll, id=pk)
+        try:
+            entry = get_results(int(pk))
+        except (ValueError, Poll.DoesNotExist):
+            raise Http404("No Poll matches the given query.")
 
-        # aggregate vote counts per option (single-query)
-        options_qs = Option.objects.filter(poll=poll).annotate(vote_count_agg=Count('votes'))
-        options = [
-            {"id": o.id, "text": o.text, "vote_count": o.vote_count_agg}
-            for o in options_qs
-        ]
+        etag = etag_for(entry)
+        last_modified = int(entry["last_modified"])
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
 
-        # total votes via count on Vote table
-        total_votes = Vote.objects.filter(poll=poll).count()
+        response = Response(results_payload(entry))
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        return response
 
-        return Response({
-            "poll_id": poll.id,
-            "title": poll.title,
-            "total_votes": total_votes,
-            "options": options
-        })
+    @action(detail=True, methods=['get'], permission_classes=[AllowAny],
+            authentication_classes=ViewAuthentication("timeline"))
+    def timeline(self, request, pk=None):
+        """
+        Votes per option over time, from the vote rollups: ?bucket=minute|hour|day
+        (default hour), optionally bounded by ?since= and ?until= (ISO datetimes).
+        """
+        try:
+            poll_id = int(pk)
+        except ValueError:
+            raise Http404("No Poll matches the given query.")
+        params = request.query_params
+        try:
+            since, until = (
+                parse_moment(params[name], name) if params.get(name) else None for name in ("since", "until")
+            )
+            data = poll_timeline(poll_id, params.get("bucket", "hour"), since, until)
+        except TimelineError as exc:
+            return Response({"error": str(exc)}, status=400)
+        if data is None:
+            raise Http404("No Poll matches the given query.")
+        return Response(data)
 
 
 # ---------------- Voting ----------------
+def vote_target(poll_id, option_id):
+    """
+    The option being voted for, with the poll columns the vote path needs and
+    whether the poll is still open, in one query. Empty if the option is not
+    in that poll.
+    """
+    is_open = ExpressionWrapper(Q(poll__expiry_date__isnull=True) | Q(poll__expiry_date__gt=Now()), output_field=BooleanField())
+    return (
+        Option.objects.filter(pk=option_id, poll_id=poll_id)
+        .select_related("poll")
+        .only("id", "poll__id", "poll__vote_counter_shards")
+        .annotate(poll_open=is_open)
+    )
+
+
+def vote_target_missing(poll_exists):
+    """The 404 for a vote whose poll/option pair matched nothing."""
+    return Http404("No Option matches the given query." if poll_exists else "No Poll matches the given query.")
+
+
 @api_view(["POST"])
+@authentication_classes(ViewAuthentication("vote"))
 @permission_classes([IsAuthenticated])
 def cast_vote(request):
     """Allow authenticated users to vote once per poll."""
-    poll_id = request.data.get("poll")
-    option_id = request.data.get("option")
+    try:
+        poll_id, option_id = int(request.data.get("poll")), int(request.data.get("option"))
+    except (TypeError, ValueError):
+        raise Http404("No Poll matches the given query.")
 
-    poll = get_object_or_404(Poll, id=poll_id)
-    option = get_object_or_404(Option, id=option_id, poll=poll)
-
-    # Prevent duplicate vote
-    if Vote.objects.filter(user=request.user, poll=poll).exists():
-        return Response({"error": "You have already voted on this poll."}, status=400)
+    option = vote_target(poll_id, option_id).first()
+    if option is None:
+        raise vote_target_missing(Poll.objects.filter(pk=poll_id).exists())
 
     # Prevent voting on expired polls
-    if not poll.is_active:
+    if not option.poll_open:
         return Response({"error": "This poll is closed."}, status=400)
 
-    # Use transaction + F() update for atomic increment
-    with transaction.atomic():
-        Vote.objects.create(user=request.user, poll=poll, option=option)
-        Option.objects.filter(pk=option.pk).update(vote_count=F('vote_count') + 1)
+    # Write-behind mode: acknowledge now, persist in the next batched flush
+    if vote_buffer.is_enabled():
+        # the insert happens later, so persisted votes are checked up front
+        if Vote.objects.filter(user=request.user, poll_id=poll_id).exists() or not vote_buffer.enqueue_vote(
+            option.poll, option, request.user
+        ):
+            return Response({"error": "You have already voted on this poll."}, status=400)
+        return Response({"message": "Vote accepted."}, status=202)
 
+    # Prevent duplicate vote: the unique constraint decides, atomically
+    if not record_vote(option.poll, option, request.user):
+        return Response({"error": "You have already voted on this poll."}, status=400)
     return Response({"message": "Vote cast successfully."}, status=201)
+
+
+def record_vote(poll, option, user):
+    """
+    Persist a vote and count it, unless the user already voted on the poll.
+    Returns True if the vote was recorded (shared by the sync and async vote views).
+    """
+    # Use transaction + sharded F() update so voters don't queue on one counter row
+    with transaction.atomic():
+        if not Vote.objects.create_once(poll.pk, option.pk, user.pk):
+            return False
+        count_votes(poll.pk, option.pk, shards=poll.vote_counter_shards)
+    return True
+
+
+# ---------------- Metrics ----------------
+@require_GET
+def metrics_view(request):
+    """Per-route request histograms of this process, in Prometheus text format."""
+    token = instrumentation.get_config()["METRICS_TOKEN"]
+    has_token = bool(token) and request.headers.get("Authorization") == f"Bearer {token}"
+    if not (has_token or request.user.is_staff):
+        return HttpResponse(status=401)
+    return HttpResponse(instrumentation.metrics.render(), content_type="text/plain; version=0.0.4")
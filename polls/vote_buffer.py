@@ -0,0 +1,336 @@
+# polls/vote_buffer.py
+"""
+Write-behind vote buffer.
+
+When ``POLLS_VOTE_WRITE_BEHIND["ENABLED"]`` is set, ``cast_vote`` validates a
+vote, reserves the (poll, user) pair so duplicates are rejected before the
+vote is acknowledged, and pushes it into a buffer. Buffered votes are written
+in batches by ``flush_vote_buffer()``: one ``bulk_create`` for the votes and
+one aggregated counter increment per option.
+
+Two buffer backends are available:
+
+- ``"local"``: an in-process list. Flushed by a background thread and on
+  interpreter exit. Pending votes are only known to their own process: with
+  several workers, a duplicate sent to another worker would be acknowledged
+  and then dropped at flush. It is therefore refused (``polls.E003``) unless
+  ``SINGLE_PROCESS`` declares a single-process deployment.
+- ``"cache"``: a buffer shared through Django's cache framework. Sequence
+  numbers come from ``cache.incr``, so it needs Redis or Memcached (see
+  polls/caching.py); other backends are refused, at startup by the
+  ``polls.E002`` check. Any process, including the ``flush_vote_buffer``
+  management command, can drain it.
+
+A cache item can go missing: its writer died between allocating a sequence
+number and storing the vote, or the cache evicted it. The drainer waits
+``GAP_TIMEOUT`` seconds for a missing item, then skips it with a warning so
+the votes behind it are not held up.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, namedtuple
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.db import IntegrityError, transaction
+from django.dispatch import receiver
+
+from .caching import counts_atomically
+from .counters import count_votes
+from .models import Vote
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ENABLED": False,
+    "BACKEND": "local",
+    # the "local" backend is only allowed when the site runs in one process
+    "SINGLE_PROCESS": False,
+    "CACHE_ALIAS": "default",
+    "BATCH_SIZE": 500,
+    # seconds between background flushes; 0 disables the background flusher
+    "FLUSH_INTERVAL": 1.0,
+    # seconds the "cache" backend waits for a missing item before skipping it
+    "GAP_TIMEOUT": 10,
+}
+
+BufferedVote = namedtuple("BufferedVote", ["poll_id", "option_id", "user_id", "shards"])
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "POLLS_VOTE_WRITE_BEHIND", {})}
+
+
+def is_enabled():
+    return get_config()["ENABLED"]
+
+
+class LocalVoteBuffer:
+    """In-process buffer guarded by a lock."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._votes = []
+        self._pending = set()
+
+    def reserve(self, poll_id, user_id):
+        """Claim (poll, user); False if a vote for it is already buffered."""
+        with self._lock:
+            if (poll_id, user_id) in self._pending:
+                return False
+            self._pending.add((poll_id, user_id))
+            return True
+
+    def push(self, vote):
+        with self._lock:
+            self._votes.append(vote)
+            return len(self._votes)
+
+    def drain(self, limit):
+        with self._lock:
+            votes, self._votes = self._votes[:limit], self._votes[limit:]
+            return votes
+
+    def requeue(self, votes):
+        with self._lock:
+            self._votes[:0] = votes
+
+    def release(self, votes):
+        with self._lock:
+            for vote in votes:
+                self._pending.discard((vote.poll_id, vote.user_id))
+
+
+class CacheVoteBuffer:
+    """
+    Buffer shared through Django's cache framework.
+
+    Votes are stored under sequential keys allocated with ``cache.incr``;
+    drainers take a short lock and advance a head pointer.
+    """
+    prefix = "polls:vote-buffer"
+
+    def __init__(self, alias, gap_timeout=DEFAULTS["GAP_TIMEOUT"]):
+        self.cache = caches[alias]
+        if not counts_atomically(self.cache):
+            raise ImproperlyConfigured(
+                f"The \"cache\" vote buffer needs Redis or Memcached; "
+                f"CACHES[{alias!r}] is {type(self.cache).__name__}."
+            )
+        self.gap_timeout = gap_timeout
+
+    def _key(self, *parts):
+        return ":".join([self.prefix, *map(str, parts)])
+
+    def reserve(self, poll_id, user_id):
+        return self.cache.add(self._key("pending", poll_id, user_id), 1, timeout=None)
+
+    def push(self, vote):
+        try:
+            seq = self.cache.incr(self._key("tail"))
+        except ValueError:
+            # first push, or the tail was evicted: continue after what was drained
+            self.cache.add(self._key("tail"), self.cache.get(self._key("head")) or 0, timeout=None)
+            seq = self.cache.incr(self._key("tail"))
+        self.cache.set(self._key("item", seq), tuple(vote), timeout=None)
+        return seq - (self.cache.get(self._key("head")) or 0)
+
+    def drain(self, limit):
+        if not self.cache.add(self._key("lock"), 1, timeout=30):
+            return []
+        try:
+            head = self.cache.get(self._key("head")) or 0
+            tail = self.cache.get(self._key("tail")) or 0
+            keys = [self._key("item", seq) for seq in range(head + 1, min(tail, head + limit) + 1)]
+            items = self.cache.get_many(keys)
+            votes = []
+            consumed = 0
+            # stop at the first gap: its writer has incremented tail but not stored the item yet
+            for seq, key in enumerate(keys, start=head + 1):
+                if key in items:
+                    votes.append(BufferedVote(*items[key]))
+                elif consumed or not self._gap_expired(seq):
+                    break
+                else:
+                    logger.warning("Skipping vote buffer item %s: missing for %ss", seq, self.gap_timeout)
+                consumed += 1
+            if consumed:
+                self.cache.set(self._key("head"), head + consumed, timeout=None)
+                self.cache.delete_many(keys[:consumed] + [self._key("gap")])
+            return votes
+        finally:
+            self.cache.delete(self._key("lock"))
+
+    def _gap_expired(self, seq):
+        """True once item ``seq`` has been missing for ``gap_timeout`` seconds."""
+        now = time.time()
+        gap = self.cache.get(self._key("gap"))
+        if gap is None or gap[0] != seq:
+            self.cache.set(self._key("gap"), (seq, now), timeout=None)
+            return False
+        return now - gap[1] >= self.gap_timeout
+
+    def requeue(self, votes):
+        for vote in votes:
+            self.push(vote)
+
+    def release(self, votes):
+        self.cache.delete_many([self._key("pending", v.poll_id, v.user_id) for v in votes])
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+_flusher = None
+
+
+def get_vote_buffer():
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            config = get_config()
+            if config["BACKEND"] == "cache":
+                _buffer = CacheVoteBuffer(config["CACHE_ALIAS"], config["GAP_TIMEOUT"])
+            else:
+                _buffer = LocalVoteBuffer()
+        return _buffer
+
+
+@checks.register()
+def check_vote_buffer(app_configs, **kwargs):
+    """Duplicates must be seen by every process; the "cache" buffer counts with ``cache.incr``."""
+    config = get_config()
+    if not config["ENABLED"]:
+        return []
+    if config["BACKEND"] != "cache":
+        if config["SINGLE_PROCESS"]:
+            return []
+        return [checks.Error(
+            "The \"local\" vote buffer only knows the votes pending in its own process: with several "
+            "workers, duplicate votes are acknowledged and then dropped at flush.",
+            hint="Use BACKEND \"cache\", or set SINGLE_PROCESS if the site runs in a single process.",
+            id="polls.E003",
+        )]
+    cache = caches[config["CACHE_ALIAS"]]
+    if counts_atomically(cache):
+        return []
+    return [checks.Error(
+        f"The vote buffer allocates sequence numbers in CACHES[{config['CACHE_ALIAS']!r}], "
+        f"a {type(cache).__name__}, whose incr is not atomic across processes and resets the key's expiry.",
+        hint="Point POLLS_VOTE_WRITE_BEHIND[\"CACHE_ALIAS\"] at a Redis or Memcached cache.",
+        id="polls.E002",
+    )]
+
+
+@receiver(setting_changed)
+def _reset_buffer(setting, **kwargs):
+    global _buffer
+    if setting == "POLLS_VOTE_WRITE_BEHIND":
+        _buffer = None
+
+
+def enqueue_vote(poll, option, user):
+    """
+    Accept a validated vote into the buffer.
+
+    Returns False if the user already has a vote for this poll waiting in the
+    buffer; the caller is responsible for checking persisted votes.
+    """
+    buffer = get_vote_buffer()
+    if not buffer.reserve(poll.pk, user.pk):
+        return False
+    size = buffer.push(BufferedVote(poll.pk, option.pk, user.pk, poll.vote_counter_shards))
+    config = get_config()
+    if config["FLUSH_INTERVAL"]:
+        _ensure_flusher(config["FLUSH_INTERVAL"])
+    if size >= config["BATCH_SIZE"]:
+        _wake_flusher()
+    return True
+
+
+def _write_batch(votes):
+    """Persist one batch of votes and bump the counters; returns the votes written."""
+    objs = [Vote(poll_id=v.poll_id, option_id=v.option_id, user_id=v.user_id) for v in votes]
+    written = votes
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                Vote.objects.bulk_create(objs)
+        except IntegrityError:
+            # a vote slipped in through another path; insert row by row and drop duplicates
+            written = []
+            for vote, obj in zip(votes, objs):
+                try:
+                    with transaction.atomic():
+                        obj.save(force_insert=True)
+                    written.append(vote)
+                except IntegrityError:
+                    logger.warning("Dropping duplicate buffered vote poll=%s user=%s", vote.poll_id, vote.user_id)
+
+        per_option = Counter((v.poll_id, v.option_id, v.shards) for v in written)
+        for (poll_id, option_id, shards), amount in per_option.items():
+            count_votes(poll_id, option_id, shards=shards, amount=amount)
+    return written
+
+
+def flush_vote_buffer(batch_size=None):
+    """Drain the buffer completely in batches; returns the number of votes written."""
+    buffer = get_vote_buffer()
+    batch_size = batch_size or get_config()["BATCH_SIZE"]
+    total = 0
+    while True:
+        votes = buffer.drain(batch_size)
+        if not votes:
+            return total
+        try:
+            total += len(_write_batch(votes))
+        except Exception:
+            buffer.requeue(votes)
+            raise
+        buffer.release(votes)
+
+
+class _Flusher(threading.Thread):
+    def __init__(self, interval):
+        super().__init__(name="vote-buffer-flusher", daemon=True)
+        self.interval = interval
+        self.wake = threading.Event()
+
+    def run(self):
+        from django.db import connection
+
+        while True:
+            self.wake.wait(self.interval)
+            self.wake.clear()
+            try:
+                flush_vote_buffer()
+            except Exception:
+                logger.exception("Vote buffer flush failed")
+            finally:
+                connection.close_if_unusable_or_obsolete()
+
+
+def _ensure_flusher(interval):
+    global _flusher
+    with _buffer_lock:
+        if _flusher is None:
+            _flusher = _Flusher(interval)
+            _flusher.start()
+
+
+def _wake_flusher():
+    if _flusher is not None:
+        _flusher.wake.set()
+
+
+@atexit.register
+def _drain_on_exit():
+    if _buffer is not None:
+        try:
+            flush_vote_buffer()
+        except Exception:
+            logger.exception("Could not drain vote buffer on exit")
@@ -0,0 +1,347 @@
+# polls/vote_events.py
+"""
+Vote event log and tally aggregator.
+
+What happens at vote time depends on ``POLLS_VOTE_COUNTING["MODE"]``:
+
+- ``"sharded"`` (default): the vote bumps a counter shard and the poll total
+  right away (see polls/counters.py). It is only appended to ``VoteEvent``,
+  marked ``counted``, with ``LOG_SHARDED_VOTES``: that costs one more insert
+  per vote and a log row that is kept for good, and it is what the timeline
+  and ``rebuild()`` need, so both are unavailable without it.
+- ``"event_log"``: the vote is only appended (two inserts, no row locks on
+  hot counters). ``aggregate()`` folds new events into ``Option.vote_count``
+  and ``Poll.total_votes``, so results are eventually consistent: they lag
+  by about the aggregator's ``INTERVAL``.
+
+The aggregator keeps a high-water mark (``AggregationCheckpoint``): the id of
+the last event folded. Ids are allocated before commit, so an event can
+become visible after a higher id did. The aggregator therefore stops at a
+gap in the ids and waits up to ``GAP_TIMEOUT`` seconds for it to fill. Then
+it moves on, but keeps the skipped ids in the checkpoint's ``gaps``: events
+that show up there later (a long import, a slow vote) are folded when they
+do. A gap is forgotten after ``GAP_RETENTION`` seconds, by which time its
+transactions have been rolled back.
+
+In either mode the aggregator also adds every event to the ``VoteRollup``
+rows of its minute, hour and day, which serve the poll timeline without
+touching the raw votes.
+
+``rebuild()`` recomputes tallies and rollups from the log, replacing drift
+fixing with ``recompute_vote_counts`` in "event_log" mode. Run both through
+the ``aggregate_votes`` management command.
+"""
+import logging
+import time
+from collections import Counter
+from datetime import timedelta, timezone as dt_timezone
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+from django.db.models import F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Trunc
+from django.utils import timezone
+
+from .models import AggregationCheckpoint, Option, OptionVoteShard, Poll, VoteEvent, VoteRollup
+from .results_cache import get_results_cache
+from .streaming import results_changed
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "MODE": "sharded",
+    # events folded per transaction
+    "BATCH_SIZE": 5000,
+    # seconds the worker sleeps once it has caught up
+    "INTERVAL": 1.0,
+    "GAP_TIMEOUT": 10,
+    # seconds skipped ids are watched for late commits
+    "GAP_RETENTION": 86400,
+    # "sharded" mode: also log each counted vote (timeline rollups, rebuild);
+    # one more insert per vote
+    "LOG_SHARDED_VOTES": False,
+}
+
+MODES = ("sharded", "event_log")
+CHECKPOINT = "tallies"
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "POLLS_VOTE_COUNTING", {})}
+
+
+def counting_mode():
+    mode = get_config()["MODE"]
+    if mode not in MODES:
+        raise ImproperlyConfigured(f"POLLS_VOTE_COUNTING['MODE'] must be one of {MODES}, not {mode!r}.")
+    return mode
+
+
+def logs_votes():
+    """Whether every vote is appended to the log (always so in "event_log" mode)."""
+    return counting_mode() == "event_log" or get_config()["LOG_SHARDED_VOTES"]
+
+
+def append(poll_id, option_id, amount=1, counted=False):
+    VoteEvent.objects.create(poll_id=poll_id, option_id=option_id, amount=amount, counted=counted)
+
+
+def first_position():
+    # a new checkpoint starts before the oldest event (ids need not start at 1)
+    oldest = VoteEvent.objects.order_by("pk").values_list("pk", flat=True).first()
+    return (oldest or 1) - 1
+
+
+def lock_checkpoint():
+    """The aggregator's checkpoint row, locked until the transaction ends."""
+    checkpoint, _ = AggregationCheckpoint.objects.select_for_update().get_or_create(
+        name=CHECKPOINT, defaults={"position": first_position}
+    )
+    return checkpoint
+
+
+def settled(events, position, skip_gap=False):
+    """
+    The leading events of ``events`` (id order) that can be folded after
+    ``position``: up to the first gap in the ids, since a missing id may
+    belong to a transaction that has not committed yet. ``skip_gap`` skips a
+    gap right after ``position``.
+    """
+    ready = []
+    expected = position + 1
+    for event in events:
+        if event.pk != expected and (ready or not skip_gap):
+            break
+        ready.append(event)
+        expected = event.pk + 1
+    return ready
+
+
+def in_gaps(gaps):
+    """Q matching the event ids in ``gaps``."""
+    condition = Q(pk__in=[])
+    for first, last, _ in gaps:
+        condition |= Q(pk__range=(first, last))
+    return condition
+
+
+def without(gaps, ids):
+    """``gaps`` minus the event ids ``ids``."""
+    ids = sorted(ids)
+    remaining = []
+    for first, last, since in gaps:
+        start = first
+        for pk in ids:
+            if first <= pk <= last:
+                if pk > start:
+                    remaining.append([start, pk - 1, since])
+                start = pk + 1
+        if start <= last:
+            remaining.append([start, last, since])
+    return remaining
+
+
+def late_events(checkpoint, now, config):
+    """Events that committed into ``checkpoint.gaps``; expired gaps are dropped."""
+    horizon = (now - timedelta(seconds=config["GAP_RETENTION"])).isoformat()
+    expired = [gap for gap in checkpoint.gaps if gap[2] < horizon]
+    for first, last, _ in expired:
+        logger.warning("Gave up on vote event ids %s-%s", first, last)
+    checkpoint.gaps = [gap for gap in checkpoint.gaps if gap[2] >= horizon]
+    if not checkpoint.gaps:
+        return []
+    return list(
+        VoteEvent.objects.filter(in_gaps(checkpoint.gaps)).order_by("pk")
+        .only("id", "poll_id", "option_id", "amount", "counted", "created_at")
+    )
+
+
+def fold(events):
+    """Add the uncounted events to the option and poll tallies; returns {(poll, option): votes}."""
+    per_option = Counter()
+    for event in events:
+        if not event.counted:
+            per_option[(event.poll_id, event.option_id)] += event.amount
+    per_poll = Counter()
+    # options first, then polls, in id order: the same lock order as counters.count_votes
+    for (poll_id, option_id), amount in sorted(per_option.items(), key=lambda item: item[0][1]):
+        Option.objects.filter(pk=option_id).update(vote_count=F("vote_count") + amount)
+        per_poll[poll_id] += amount
+    for poll_id, amount in sorted(per_poll.items()):
+        Poll.objects.filter(pk=poll_id).update(total_votes=F("total_votes") + amount)
+    return per_option
+
+
+def bucket_start(moment, bucket):
+    """Start of the UTC minute, hour or day containing ``moment``."""
+    moment = moment.astimezone(dt_timezone.utc).replace(second=0, microsecond=0)
+    if bucket in (VoteRollup.HOUR, VoteRollup.DAY):
+        moment = moment.replace(minute=0)
+    if bucket == VoteRollup.DAY:
+        moment = moment.replace(hour=0)
+    return moment
+
+
+def roll_up(events):
+    """Add ``events`` to the rollups of their minute, hour and day."""
+    increments = Counter()
+    for event in events:
+        for bucket, _ in VoteRollup.BUCKETS:
+            increments[(event.poll_id, event.option_id, bucket, bucket_start(event.created_at, bucket))] += event.amount
+    if not increments:
+        return
+    if connection.vendor not in ("postgresql", "sqlite"):
+        for (poll_id, option_id, bucket, start), votes in increments.items():
+            rollup, _ = VoteRollup.objects.get_or_create(poll_id=poll_id, option_id=option_id, bucket=bucket, start=start)
+            VoteRollup.objects.filter(pk=rollup.pk).update(votes=F("votes") + votes)
+        return
+
+    qn = connection.ops.quote_name
+    table = qn(VoteRollup._meta.db_table)
+    start_field = VoteRollup._meta.get_field("start")
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {table} (poll_id, option_id, bucket, start, votes) VALUES (%s, %s, %s, %s, %s) "
+            f"ON CONFLICT (option_id, bucket, start) DO UPDATE SET votes = {table}.votes + EXCLUDED.votes",
+            [
+                (poll_id, option_id, bucket, start_field.get_db_prep_save(start, connection), votes)
+                for (poll_id, option_id, bucket, start), votes in sorted(increments.items())
+            ],
+        )
+
+
+def publish(changes):
+    """Update cached results and notify live results watchers of folded votes."""
+    cache = get_results_cache()
+    for (poll_id, option_id), amount in changes.items():
+        cache.apply_vote(poll_id, option_id, amount)
+    for poll_id in {poll_id for poll_id, _ in changes}:
+        results_changed(poll_id)
+
+
+def aggregate(batch_size=None):
+    """Fold the next batch of settled events; returns the number of events consumed."""
+    config = get_config()
+    with transaction.atomic():
+        checkpoint = lock_checkpoint()
+        now = timezone.now()
+        gaps = list(checkpoint.gaps)
+        late = late_events(checkpoint, now, config)
+        events = list(
+            VoteEvent.objects.filter(pk__gt=checkpoint.position).order_by("pk")
+            .only("id", "poll_id", "option_id", "amount", "counted", "created_at")[:batch_size or config["BATCH_SIZE"]]
+        )
+        waited = checkpoint.waiting_since is not None and (
+            checkpoint.waiting_since <= now - timedelta(seconds=config["GAP_TIMEOUT"])
+        )
+        ready = settled(events, checkpoint.position, skip_gap=waited)
+        if not ready and not late:
+            changed = checkpoint.gaps != gaps
+            if events and checkpoint.waiting_since is None:
+                checkpoint.waiting_since = now
+                changed = True
+            if changed:
+                checkpoint.save(update_fields=["waiting_since", "gaps", "updated_at"])
+            return 0
+        if late:
+            logger.info("Folding %s vote events that committed late", len(late))
+            checkpoint.gaps = without(checkpoint.gaps, [event.pk for event in late])
+        if ready and ready[0].pk != checkpoint.position + 1:
+            logger.warning("Skipped vote event ids %s-%s for now", checkpoint.position + 1, ready[0].pk - 1)
+            checkpoint.gaps.append([checkpoint.position + 1, ready[0].pk - 1, now.isoformat()])
+        changes = fold(late + ready)
+        roll_up(late + ready)
+        if ready:
+            checkpoint.position = ready[-1].pk
+            checkpoint.waiting_since = None
+        checkpoint.save(update_fields=["position", "waiting_since", "gaps", "updated_at"])
+        if changes:
+            transaction.on_commit(lambda: publish(changes))
+    return len(late) + len(ready)
+
+
+def aggregate_all(batch_size=None):
+    """Fold until caught up; returns the number of events consumed."""
+    total = 0
+    while consumed := aggregate(batch_size):
+        total += consumed
+    return total
+
+
+def rebuild(poll_ids=None):
+    """
+    Recompute option and poll tallies from the log: counted events plus the
+    events the aggregator has folded. Counter shards are folded away, and
+    the rollups are rebuilt from the folded events. Returns the number of
+    options rebuilt.
+
+    The checkpoint stays locked meanwhile, so the aggregator cannot fold
+    concurrently. In "sharded" mode, votes counted during the rebuild can be
+    lost with the shards: run it while the polls are not taking votes.
+    """
+    if not logs_votes():
+        raise ImproperlyConfigured("Sharded votes are not logged (LOG_SHARDED_VOTES): the log cannot rebuild tallies.")
+    options = Option.objects.all() if poll_ids is None else Option.objects.filter(poll_id__in=poll_ids)
+    polls = Poll.objects.all() if poll_ids is None else Poll.objects.filter(pk__in=poll_ids)
+    with transaction.atomic():
+        checkpoint = lock_checkpoint()
+        folded_ids = Q(pk__lte=checkpoint.position) & ~in_gaps(checkpoint.gaps)
+        folded = (
+            VoteEvent.objects.filter(Q(counted=True) | folded_ids, option=OuterRef("pk"))
+            .values("option").annotate(total=Sum("amount")).values("total")
+        )
+        rebuilt = options.update(vote_count=Coalesce(Subquery(folded), Value(0)))
+        OptionVoteShard.objects.filter(option__in=options.values("pk")).delete()
+        totals = Option.objects.filter(poll=OuterRef("pk")).values("poll").annotate(total=Sum("vote_count")).values("total")
+        polls.update(total_votes=Coalesce(Subquery(totals), Value(0)))
+        rebuild_rollups(poll_ids, folded_ids)
+        transaction.on_commit(lambda: invalidate(poll_ids))
+    return rebuilt
+
+
+def rebuild_rollups(poll_ids, folded_ids, batch_size=5000):
+    """Replace the rollups of ``poll_ids`` (None: all) with sums of the events matching ``folded_ids``."""
+    rollups = VoteRollup.objects.all() if poll_ids is None else VoteRollup.objects.filter(poll_id__in=poll_ids)
+    rollups.delete()
+    events = VoteEvent.objects.filter(folded_ids)
+    if poll_ids is not None:
+        events = events.filter(poll_id__in=poll_ids)
+    for bucket, _ in VoteRollup.BUCKETS:
+        rows = (
+            events.annotate(start=Trunc("created_at", bucket, tzinfo=dt_timezone.utc))
+            .values("poll_id", "option_id", "start").annotate(votes=Sum("amount")).order_by()
+        )
+        rows = rows.iterator(chunk_size=batch_size)
+        while batch := [VoteRollup(bucket=bucket, **row) for row in islice(rows, batch_size)]:
+            VoteRollup.objects.bulk_create(batch)
+
+
+def invalidate(poll_ids):
+    cache = get_results_cache()
+    if poll_ids is None:
+        cache.clear()
+        return
+    for poll_id in poll_ids:
+        cache.invalidate(poll_id)
+        results_changed(poll_id)
+
+
+def run(interval=None, batch_size=None, stop=None):
+    """Worker loop: fold events as they arrive until ``stop`` (an Event) is set."""
+    interval = get_config()["INTERVAL"] if interval is None else interval
+    while stop is None or not stop.is_set():
+        try:
+            consumed = aggregate(batch_size)
+        except Exception:
+            logger.exception("Vote aggregation failed")
+            consumed = 0
+        finally:
+            connection.close_if_unusable_or_obsolete()
+        # a full batch means more are waiting
+        if consumed < (batch_size or get_config()["BATCH_SIZE"]):
+            if stop is not None:
+                stop.wait(interval)
+            else:
+                time.sleep(interval)